@@ -0,0 +1,78 @@
+"""Compare the vectorized, parallel cleaner with the original per-review loop.
+
+Writes synthetic `<app>_reviews.json` files to a temp dir and times both:
+
+    python -m benchmarks.bench_cleaner --reviews 300000 --workers 3
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+import pandas as pd
+
+from src.preprocessor.cleaner import BANK_MAP, clean_review_data
+
+
+def legacy_clean(raw_dir):
+    """The pre-vectorization cleaner loop, kept here as the baseline."""
+    all_reviews = []
+    for filename in os.listdir(raw_dir):
+        if filename.endswith(".json") and filename in BANK_MAP:
+            with open(os.path.join(raw_dir, filename), "r", encoding="utf-8") as f:
+                reviews_json = json.load(f)
+            for entry in reviews_json:
+                date_raw = entry.get("at", None)
+                all_reviews.append({
+                    "review": entry.get("content", "").strip(),
+                    "rating": entry.get("score", None),
+                    "date": pd.to_datetime(date_raw).strftime("%Y-%m-%d") if date_raw else None,
+                    "bank": BANK_MAP[filename],
+                    "source": "Google Play"
+                })
+    df = pd.DataFrame(all_reviews)
+    df.dropna(subset=["review", "rating", "date"], inplace=True)
+    return df
+
+
+def write_raw_files(raw_dir, total, seed=0):
+    rng = random.Random(seed)
+    per_file = total // len(BANK_MAP)
+    for filename in BANK_MAP:
+        records = [
+            {"reviewId": f"{filename}-{i}", "content": " good app " * rng.randint(1, 5),
+             "score": rng.randint(1, 5),
+             "at": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d} 10:{i % 60:02d}:00"}
+            for i in range(per_file)
+        ]
+        with open(os.path.join(raw_dir, filename), "w", encoding="utf-8") as f:
+            json.dump(records, f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--reviews", type=int, default=60000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_raw_files(tmp, args.reviews)
+
+        start = time.perf_counter()
+        expected = legacy_clean(tmp)
+        legacy = time.perf_counter() - start
+
+        start = time.perf_counter()
+        df = clean_review_data(tmp, os.path.join(tmp, "out", "cleaned.csv"), args.workers)
+        batched = time.perf_counter() - start
+
+    assert len(df) == len(expected), "Cleaners disagree on row count"
+    print(f"\nlegacy loop: {legacy:.2f}s ({len(expected) / legacy:,.0f} reviews/s)")
+    print(f"vectorized:  {batched:.2f}s ({len(df) / batched:,.0f} reviews/s, "
+          f"{legacy / batched:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Sparse top-k keyword extraction vs the original per-row dense loop.
+
+Builds random TF-IDF-like CSR matrices (1000 features, ~8 terms per review)
+and times both extractors:
+
+    python -m benchmarks.bench_keywords --sizes 10000 100000 1000000
+"""
+import argparse
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+from src.analyzer.keyword_models import top_keywords_sparse
+
+
+def legacy_top_keywords(X, feature_names, top_n=3):
+    """The original get_top_keywords loop, kept here as the baseline."""
+    def get_top_keywords(row_idx):
+        row = X[row_idx].toarray().flatten()
+        top_indices = row.argsort()[-top_n:][::-1]
+        return [feature_names[i] for i in top_indices if row[i] > 0]
+    return [get_top_keywords(i) for i in range(X.shape[0])]
+
+
+def make_matrix(rows, features=1000, terms_per_row=8, seed=0):
+    return sp.random(rows, features, density=terms_per_row / features, format='csr',
+                     random_state=seed, dtype=np.float64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--legacy-limit', type=int, default=100_000,
+                        help="skip the slow loop above this many rows (extrapolated instead)")
+    args = parser.parse_args()
+
+    feature_names = np.array([f'term{i}' for i in range(1000)], dtype=object)
+    legacy_rate = None
+    for rows in args.sizes:
+        X = make_matrix(rows)
+
+        start = time.perf_counter()
+        top_keywords_sparse(X, feature_names)
+        sparse_time = time.perf_counter() - start
+
+        if rows <= args.legacy_limit:
+            start = time.perf_counter()
+            legacy_top_keywords(X, feature_names)
+            legacy_time = time.perf_counter() - start
+            legacy_rate = legacy_time / rows
+            note = ''
+        else:
+            legacy_time = legacy_rate * rows if legacy_rate else float('nan')
+            note = ' (extrapolated)'
+
+        print(f"{rows:>9,} rows: sparse {sparse_time:7.2f}s | per-row loop {legacy_time:8.2f}s"
+              f"{note} | {legacy_time / sparse_time:6.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,224 @@
+"""Time every pipeline stage on a synthetic corpus and compare with a saved baseline.
+
+For each corpus size a deterministic corpus (benchmarks.synthetic) is
+written as NDJSON shards, then clean → sentiment → themes → insights → load
+(SQLite) each run in a fresh process, so the peak RSS recorded for a stage
+is its own. Throughput and peak memory go to a JSON baseline; later runs
+are compared with it and exit non-zero on a regression, or when there is
+no matching baseline to compare against:
+
+    python -m benchmarks.bench_pipeline --stub-model --stub-nlp --save-baseline
+    python -m benchmarks.bench_pipeline --stub-model --stub-nlp             # compare
+    python -m benchmarks.bench_pipeline --sizes 1000000 --stages clean sentiment --stub-model
+
+--stub-model replaces the transformers classifier and --stub-nlp the spaCy
+pipeline with trivial stand-ins, which isolates the pipeline's own overhead
+and runs without either model installed.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from collections import namedtuple
+
+from benchmarks.synthetic import SyntheticCorpus
+
+STAGES = ['clean', 'sentiment', 'themes', 'insights', 'load']
+BASELINE_PATH = 'benchmarks/baseline.json'
+
+Token = namedtuple('Token', ['lemma_', 'is_stop', 'is_alpha'])
+
+
+def stub_classifier(texts, **kwargs):
+    """Keyword rule in place of the transformers pipeline."""
+    negative = ('bad', 'slow', 'crash', 'error', 'worst', 'fail', 'not')
+    return [{'label': 'NEGATIVE' if any(w in t.lower() for w in negative) else 'POSITIVE',
+             'score': 0.99} for t in texts]
+
+
+class StubNLP:
+    """Whitespace tokenizer with spaCy's stop words in place of en_core_web_sm."""
+
+    def __init__(self):
+        from spacy.lang.en.stop_words import STOP_WORDS
+
+        self.stop_words = STOP_WORDS
+
+    def pipe(self, texts, batch_size=1000, n_process=1):
+        for text in texts:
+            yield [Token(w, w in self.stop_words, w.isalpha()) for w in text.split()]
+
+
+def stage_paths(workdir):
+    from src.pipeline.columnar import STAGE_FORMAT
+
+    return {name: os.path.join(workdir, f"{name}.{STAGE_FORMAT}")
+            for name in ['cleaned_reviews', 'reviews_with_sentiment', 'reviews_with_themes']}
+
+
+def run_stage(stage, workdir, stub_model=False, stub_nlp=False):
+    """Run one stage on the files in `workdir`; returns the seconds it took."""
+    paths = stage_paths(workdir)
+    start = time.perf_counter()
+    if stage == 'clean':
+        from src.preprocessor.cleaner import clean_shards
+
+        clean_shards(os.path.join(workdir, 'raw'), paths['cleaned_reviews'])
+    elif stage == 'sentiment':
+        from src.analyzer.sentiment_analysis import SentimentEngine, run_sentiment_analysis
+
+        engine = SentimentEngine(classifier=stub_classifier if stub_model else None)
+        run_sentiment_analysis(paths['cleaned_reviews'], paths['reviews_with_sentiment'], engine)
+    elif stage == 'themes':
+        from src.analyzer.thematic_analysis import run_thematic_analysis
+
+        run_thematic_analysis(paths['reviews_with_sentiment'], paths['reviews_with_themes'],
+                              nlp=StubNLP() if stub_nlp else None)
+    elif stage == 'insights':
+        from src.analysis.generate_insights import main as insights
+
+        insights(paths['reviews_with_themes'], os.path.join(workdir, 'insights_report.json'))
+    elif stage == 'load':
+        from src.database.backends import SQLiteBackend
+        from src.database.load_to_oracle import load_reviews
+
+        with SQLiteBackend(os.path.join(workdir, 'reviews.sqlite')) as backend:
+            load_reviews(backend, paths['reviews_with_themes'])
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+    return time.perf_counter() - start
+
+
+def measure_stage(stage, workdir, rows, stub_model, stub_nlp):
+    """Run `stage` in a fresh interpreter; return rows, seconds, rows/s and peak RSS."""
+    command = [sys.executable, '-m', 'benchmarks.bench_pipeline', '--run-stage', stage,
+               '--workdir', workdir]
+    command += ['--stub-model'] * stub_model + ['--stub-nlp'] * stub_nlp
+    result = subprocess.run(command, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"{stage} failed:\n{result.stderr}")
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    return {'rows': rows, 'seconds': round(measured['seconds'], 3),
+            'rows_per_s': round(rows / max(measured['seconds'], 1e-9), 1),
+            'peak_rss_mb': round(measured['peak_rss_mb'], 1)}
+
+
+def run_suite(sizes, stages=STAGES, stub_model=False, stub_nlp=False, seed=0):
+    """{'<stage>@<rows>': measurement} for every size and stage."""
+    results = {}
+    for rows in sizes:
+        with tempfile.TemporaryDirectory() as workdir:
+            start = time.perf_counter()
+            SyntheticCorpus(seed).write_shards(os.path.join(workdir, 'raw'), rows)
+            print(f"\n{rows:,} reviews (generated in {time.perf_counter() - start:.1f}s)")
+            # Stages read their predecessor's output, so each run needs the ones before it
+            for stage in STAGES[:max(STAGES.index(s) for s in stages) + 1]:
+                measured = measure_stage(stage, workdir, rows, stub_model, stub_nlp)
+                if stage in stages:
+                    results[f"{stage}@{rows}"] = measured
+                    print(f"  {stage:<10} {measured['seconds']:8.2f}s "
+                          f"{measured['rows_per_s']:>12,.0f} rows/s "
+                          f"{measured['peak_rss_mb']:8.0f} MiB peak")
+    return results
+
+
+def compare(results, baseline, time_tolerance=0.25, memory_tolerance=0.25):
+    """Regression messages for throughput/memory worse than the baseline by more than the tolerance."""
+    regressions = []
+    for key, now in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if now['rows_per_s'] < before['rows_per_s'] * (1 - time_tolerance):
+            regressions.append(f"{key}: {now['rows_per_s']:,.0f} rows/s vs "
+                               f"{before['rows_per_s']:,.0f} in the baseline")
+        if now['peak_rss_mb'] > before['peak_rss_mb'] * (1 + memory_tolerance):
+            regressions.append(f"{key}: peak {now['peak_rss_mb']:.0f} MiB vs "
+                               f"{before['peak_rss_mb']:.0f} MiB in the baseline")
+    return regressions
+
+
+def load_baseline(path=BASELINE_PATH):
+    if not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_baseline(config, results, path=BASELINE_PATH):
+    """Write `results` into the baseline, keeping entries for sizes/stages not rerun."""
+    baseline = load_baseline(path)
+    if baseline is None or baseline['config'] != config:
+        baseline = {'config': config, 'results': {}}
+    baseline['results'].update(results)
+    baseline['machine'] = f"{platform.machine()} {platform.system()}, {os.cpu_count()} CPUs, " \
+                          f"Python {platform.python_version()}"
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                        help="corpus sizes, e.g. 10000 100000 1000000")
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=STAGES)
+    parser.add_argument('--stub-model', action='store_true', help="stub sentiment classifier")
+    parser.add_argument('--stub-nlp', action='store_true', help="stub spaCy lemmatizer")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true',
+                        help="record this run as the baseline instead of comparing")
+    parser.add_argument('--time-tolerance', type=float, default=0.25,
+                        help="allowed throughput drop before flagging a regression")
+    parser.add_argument('--memory-tolerance', type=float, default=0.25,
+                        help="allowed peak-memory growth before flagging a regression")
+    parser.add_argument('--run-stage', choices=STAGES, help=argparse.SUPPRESS)
+    parser.add_argument('--workdir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_stage:
+        from src.pipeline.chunked import peak_rss_mb
+
+        # The stage's own progress output would hide the measurement line
+        with contextlib.redirect_stdout(io.StringIO()):
+            seconds = run_stage(args.run_stage, args.workdir, args.stub_model, args.stub_nlp)
+        print(json.dumps({'seconds': seconds, 'peak_rss_mb': peak_rss_mb()}))
+        return
+
+    config = {'stub_model': args.stub_model, 'stub_nlp': args.stub_nlp, 'seed': args.seed,
+              'format': os.environ.get('PIPELINE_FORMAT', 'csv')}
+    results = run_suite(args.sizes, args.stages, args.stub_model, args.stub_nlp, args.seed)
+
+    if args.save_baseline:
+        save_baseline(config, results, args.baseline)
+        print(f"\nBaseline saved to {args.baseline}")
+        return
+
+    # Comparing is the point of this run, so having nothing to compare against fails it
+    baseline = load_baseline(args.baseline)
+    if baseline is None:
+        raise SystemExit(f"\nNo baseline at {args.baseline}; run with --save-baseline to record one.")
+    if baseline['config'] != config:
+        raise SystemExit(f"\nBaseline was recorded with {baseline['config']}, not {config}; "
+                         f"run with --save-baseline to replace it.")
+    if not results.keys() & baseline['results'].keys():
+        raise SystemExit(f"\nNone of {sorted(results)} is in the baseline; "
+                         f"run with --save-baseline to add them.")
+    regressions = compare(results, baseline['results'], args.time_tolerance, args.memory_tolerance)
+    if regressions:
+        print("\nRegressions against the baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        raise SystemExit(1)
+    print(f"\nNo regressions against {args.baseline}.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""Wall-clock comparison of the sequential scrape loop and scrape_all.
+
+Uses a local fake of google_play_scraper.reviews with a fixed per-page
+latency, so no network is needed:
+
+    python -m benchmarks.bench_scraper --apps 6 --pages 5 --latency 0.2
+"""
+import argparse
+import tempfile
+import time
+
+from src.scraper.playstore_scraper import scrape_all, scrape_reviews
+from src.scraper.rate_limiter import AdaptiveTokenBucket
+
+
+def make_fake_reviews(pages, page_size=200, latency=0.2):
+    """Return a reviews()-compatible fake serving `pages` pages per app."""
+    def fake_reviews(app_package, continuation_token=None, count=200, **kwargs):
+        time.sleep(latency)
+        page = continuation_token or 0
+        batch = [
+            {"reviewId": f"{app_package}-{page}-{i}", "content": "good app",
+             "score": 5, "at": "2025-06-01"}
+            for i in range(page_size)
+        ]
+        next_token = page + 1 if page + 1 < pages else None
+        return batch, next_token
+    return fake_reviews
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--apps", type=int, default=6)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="seconds per fake request")
+    parser.add_argument("--pause", type=float, default=0.25, help="sequential sleep between pages")
+    parser.add_argument("--workers", type=int, default=6)
+    args = parser.parse_args()
+
+    fetch = make_fake_reviews(args.pages, latency=args.latency)
+    packages = {f"app{i}": f"com.fake.app{i}" for i in range(args.apps)}
+    total = args.pages * 200
+
+    with tempfile.TemporaryDirectory() as out_dir:
+        start = time.perf_counter()
+        for name, package in packages.items():
+            scrape_reviews(name, package, total, fetch=fetch, pause=args.pause, out_dir=out_dir)
+        sequential = time.perf_counter() - start
+
+        # Start the shared bucket at the same request rate as the fixed pause
+        limiter = AdaptiveTokenBucket(rate=1 / args.pause, capacity=args.workers,
+                                      max_rate=4 / args.pause)
+        start = time.perf_counter()
+        scrape_all(packages, total, args.workers, fetch=fetch, limiter=limiter, out_dir=out_dir)
+        concurrent = time.perf_counter() - start
+
+    print(f"\nsequential: {sequential:.2f}s")
+    print(f"concurrent: {concurrent:.2f}s ({sequential / concurrent:.1f}x faster)")
+
+
+if __name__ == "__main__":
+    main()
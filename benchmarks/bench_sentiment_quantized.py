@@ -0,0 +1,78 @@
+"""Accuracy/latency comparison of fp32 and int8-quantized sentiment scoring.
+
+Scores a sample of data/processed/reviews_with_sentiment.csv with both
+modes and reports label agreement with the fp32 path (the stored labels and
+a live fp32 run), score drift, batch latency and throughput:
+
+    python -m benchmarks.bench_sentiment_quantized --sample 1000 --threads 4
+    python -m benchmarks.bench_sentiment_quantized --model ./models/sst2 --offline
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.analyzer.sentiment_analysis import MODEL_NAME, SentimentEngine
+
+INPUT_PATH = 'data/processed/reviews_with_sentiment.csv'
+
+
+def profile(engine, texts):
+    """Score `texts` batch by batch; return labels, scores and per-batch latencies."""
+    engine.classifier  # load outside the timed region
+    labels, scores, latencies = [], [], []
+    for i in range(0, len(texts), engine.batch_size):
+        start = time.perf_counter()
+        batch_labels, batch_scores = engine.score(texts[i:i + engine.batch_size])
+        latencies.append(time.perf_counter() - start)
+        labels.extend(batch_labels)
+        scores.extend(batch_scores)
+    return labels, np.array(scores), np.array(latencies)
+
+
+def summarize(name, latencies, n):
+    return {
+        'mode': name,
+        'reviews_per_s': round(n / latencies.sum(), 1),
+        'batch_p50_ms': round(float(np.percentile(latencies, 50)) * 1000, 1),
+        'batch_p95_ms': round(float(np.percentile(latencies, 95)) * 1000, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--model', default=MODEL_NAME)
+    parser.add_argument('--offline', action='store_true')
+    parser.add_argument('--sample', type=int, default=1000)
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=None)
+    args = parser.parse_args()
+
+    df = pd.read_csv(INPUT_PATH)
+    df = df.sample(min(args.sample, len(df)), random_state=0)
+    texts = df['review'].astype(str).tolist()
+    stored = df['sentiment_label'].tolist()
+
+    common = dict(model=args.model, batch_size=args.batch_size, num_threads=args.threads,
+                  local_files_only=args.offline or None)
+    fp32_labels, fp32_scores, fp32_lat = profile(SentimentEngine(**common), texts)
+    int8_labels, int8_scores, int8_lat = profile(SentimentEngine(quantize=True, **common), texts)
+
+    fp32_labels, int8_labels, stored = map(np.array, (fp32_labels, int8_labels, stored))
+    report = {
+        'reviews': len(texts),
+        'fp32': summarize('fp32', fp32_lat, len(texts)),
+        'int8': summarize('int8', int8_lat, len(texts)),
+        'agreement_int8_vs_fp32': round(float((int8_labels == fp32_labels).mean()), 4),
+        'agreement_int8_vs_stored': round(float((int8_labels == stored).mean()), 4),
+        'agreement_fp32_vs_stored': round(float((fp32_labels == stored).mean()), 4),
+        'mean_abs_score_diff': round(float(np.abs(int8_scores - fp32_scores).mean()), 4),
+        'speedup': round(float(fp32_lat.sum() / int8_lat.sum()), 2),
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
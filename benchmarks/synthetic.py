@@ -0,0 +1,143 @@
+"""Deterministic synthetic Play Store reviews for benchmarks.
+
+The corpus mimics the scraped data: a heavy tail of review lengths (median
+~20 characters, a few near the 500-character cap), stock short reviews
+("good", "Good", "nice app", ...) that together with colliding short
+reviews repeat ~20-25% of rows, ratings skewed to 5 and 1 stars,
+negative wording on low ratings and a roughly even bank mix over a year of
+dates. The same seed always yields the same reviews:
+
+    python -m benchmarks.synthetic --reviews 1000000 --out-dir /tmp/raw
+"""
+import argparse
+from datetime import date, timedelta
+
+import numpy as np
+
+from src.preprocessor.cleaner import SHARD_BANK_MAP
+from src.scraper.ndjson_shards import ShardWriter
+
+# app name → share of reviews (observed: CBE 34%, BOA 34%, Dashen 32%)
+BANK_MIX = {'cbe': 0.34, 'boa': 0.34, 'dashen': 0.32}
+# share of 1..5 star ratings in the scraped data
+RATING_MIX = [0.205, 0.034, 0.051, 0.066, 0.644]
+START_DATE = date(2024, 5, 31)
+END_DATE = date(2025, 6, 19)
+# share of rows drawn from STOCK_REVIEWS
+DUPLICATE_RATE = 0.1
+MAX_CHARS = 500
+
+# Short stock reviews that make up the repeated share, most common first
+STOCK_REVIEWS = ['good', 'Good', 'nice', 'ok', 'Best', 'wow', 'best app', 'best', 'Nice', 'Ok',
+                 'Best app', 'good app', 'excellent', 'Wow', 'very good', 'Good app', 'nice app',
+                 'great', 'bad', 'worst app', 'not working', 'Excellent application', '👍',
+                 'ቆንጆ ነው', 'Very nice app']
+
+POSITIVE_WORDS = ['good', 'great', 'best', 'excellent', 'easy', 'fast', 'nice', 'love', 'helpful',
+                  'simple', 'smooth', 'reliable', 'amazing', 'convenient', 'thanks']
+NEGATIVE_WORDS = ['bad', 'slow', 'crash', 'error', 'worst', 'fail', 'stuck', 'problem', 'bug',
+                  'freeze', 'annoying', 'useless', 'terrible', 'disappointed', 'poor']
+TOPIC_WORDS = ['app', 'transfer', 'login', 'otp', 'update', 'balance', 'account', 'money',
+               'bank', 'service', 'network', 'password', 'transaction', 'airtime', 'screen',
+               'version', 'customer', 'support', 'branch', 'payment', 'feature', 'time']
+FILLER_WORDS = ['the', 'is', 'it', 'i', 'to', 'and', 'my', 'this', 'very', 'not', 'can', 'please',
+                'when', 'always', 'even', 'now', 'every', 'after', 'but', 'so', 'of', 'for']
+TONE_WORDS = {True: NEGATIVE_WORDS, False: POSITIVE_WORDS}
+VOCABULARY = np.array(NEGATIVE_WORDS + POSITIVE_WORDS + TOPIC_WORDS + FILLER_WORDS, dtype=object)
+
+
+def _zipf_weights(n, s=1.1):
+    weights = 1 / np.arange(1, n + 1) ** s
+    return weights / weights.sum()
+
+
+class SyntheticCorpus:
+    """Generates raw scraper records ({reviewId, content, score, at}) per app."""
+
+    def __init__(self, seed=0, bank_mix=BANK_MIX, duplicate_rate=DUPLICATE_RATE,
+                 start=START_DATE, end=END_DATE):
+        self.seed = seed
+        self.bank_mix = bank_mix
+        self.duplicate_rate = duplicate_rate
+        self.start = start
+        self.days = (end - start).days + 1
+
+    def bank_counts(self, total):
+        """Reviews per app for a corpus of `total`, summing exactly to `total`."""
+        apps = list(self.bank_mix)
+        counts = [int(total * self.bank_mix[app]) for app in apps]
+        counts[0] += total - sum(counts)
+        return dict(zip(apps, counts))
+
+    def _texts(self, rng, ratings, n_words):
+        """One review per rating: tone words match the rating, mixed with topic and filler words."""
+        total = int(n_words.sum())
+        negative = np.repeat(ratings <= 2, n_words)
+        kinds = rng.choice(3, size=total, p=[0.25, 0.35, 0.4])
+        u = rng.random(total)
+        # Index into VOCABULARY = negative | positive | topic | filler words
+        sizes = np.array([len(TONE_WORDS[True]), len(TOPIC_WORDS), len(FILLER_WORDS)])
+        offsets = np.where(kinds == 0, np.where(negative, 0, sizes[0]),
+                           np.where(kinds == 1, 2 * sizes[0], 2 * sizes[0] + sizes[1]))
+        words = VOCABULARY[offsets + (u * sizes[kinds]).astype(int)]
+        ends = np.cumsum(n_words)
+        return [' '.join(words[end - n:end]).capitalize()[:MAX_CHARS]
+                for end, n in zip(ends, n_words)]
+
+    def records(self, app, count):
+        """Yield `count` raw records for one app, lazily."""
+        # One stream per app keeps each app's reviews independent of the others' sizes
+        rng = np.random.default_rng([self.seed, list(self.bank_mix).index(app)])
+        stock_weights = _zipf_weights(len(STOCK_REVIEWS))
+        batch = 10_000
+        for offset in range(0, count, batch):
+            n = min(batch, count - offset)
+            ratings = rng.choice(5, size=n, p=RATING_MIX) + 1
+            duplicate = rng.random(n) < self.duplicate_rate
+            stock = rng.choice(len(STOCK_REVIEWS), size=n, p=stock_weights)
+            # Log-normal word counts: median ~5 words, long tail up to the character cap
+            n_words = np.clip(rng.lognormal(1.1, 1.3, size=n).astype(int) + 2, 2, 100)
+            days = rng.integers(self.days, size=n)
+            seconds = rng.integers(86_400, size=n)
+            texts = self._texts(rng, ratings, n_words)
+            for i in range(n):
+                day = self.start + timedelta(days=int(days[i]))
+                yield {
+                    'reviewId': f"{app}-{self.seed}-{offset + i:08d}",
+                    'content': STOCK_REVIEWS[stock[i]] if duplicate[i]
+                    else texts[i],
+                    'score': int(ratings[i]),
+                    'at': f"{day.isoformat()} {seconds[i] // 3600:02d}:"
+                          f"{seconds[i] // 60 % 60:02d}:{seconds[i] % 60:02d}",
+                }
+
+    def write_shards(self, raw_dir, total):
+        """Write `total` reviews as NDJSON shards under `raw_dir/<app>/`; returns per-app counts.
+
+        Shards already there are replaced (ShardWriter's default), so
+        rerunning with the same `raw_dir` never mixes corpora.
+        """
+        counts = self.bank_counts(total)
+        for app, count in counts.items():
+            with ShardWriter(raw_dir, app) as writer:
+                page = []
+                for record in self.records(app, count):
+                    page.append(record)
+                    if len(page) == 10_000:
+                        writer.write_many(page)
+                        page = []
+                writer.write_many(page)
+        return counts
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--reviews', type=int, default=100_000)
+    parser.add_argument('--out-dir', required=True, help="raw dir to write <app>/part-*.ndjson into")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--duplicate-rate', type=float, default=DUPLICATE_RATE)
+    args = parser.parse_args()
+
+    counts = SyntheticCorpus(args.seed, duplicate_rate=args.duplicate_rate).write_shards(
+        args.out_dir, args.reviews)
+    print(', '.join(f"{SHARD_BANK_MAP[app]}: {n:,}" for app, n in counts.items()))
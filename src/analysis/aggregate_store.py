@@ -0,0 +1,297 @@
+import argparse
+import os
+import sqlite3
+from datetime import date, timedelta
+
+import pandas as pd
+
+from src.pipeline.columnar import read_stage, review_keys, stage_columns, stage_path
+
+STORE_PATH = 'data/cache/aggregates.sqlite'
+
+STORE_COLUMNS = ['bank', 'date', 'review', 'rating', 'sentiment_label', 'sentiment_score',
+                 'identified_theme(s)', 'keywords']
+
+
+class AggregateStore:
+    """Persistent per bank × day counters behind the insights and trend plots.
+
+    `add` folds processed reviews into the tables (counts and sums are
+    added, never recomputed). Every folded review's key is recorded, so
+    reviews already counted are skipped and keeping the store current costs
+    O(new reviews) even when handed the whole stage file. Queries read the
+    small aggregate tables and take an optional rolling window: `days=30`
+    means the 30 days up to and including `until` (default: the latest day
+    in the store).
+    """
+
+    def __init__(self, path=STORE_PATH):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS daily_stats (
+                bank TEXT NOT NULL,
+                day TEXT NOT NULL,
+                sentiment_label TEXT NOT NULL,
+                review_count INTEGER NOT NULL,
+                rating_sum REAL NOT NULL,
+                rating_count INTEGER NOT NULL,
+                score_sum REAL NOT NULL,
+                score_count INTEGER NOT NULL,
+                PRIMARY KEY (bank, day, sentiment_label)
+            );
+            CREATE TABLE IF NOT EXISTS rating_counts (
+                bank TEXT NOT NULL,
+                day TEXT NOT NULL,
+                rating INTEGER NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (bank, day, rating)
+            );
+            CREATE TABLE IF NOT EXISTS keyword_counts (
+                bank TEXT NOT NULL,
+                day TEXT NOT NULL,
+                sentiment_label TEXT NOT NULL,
+                keyword TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (bank, day, sentiment_label, keyword)
+            );
+            CREATE TABLE IF NOT EXISTS theme_counts (
+                bank TEXT NOT NULL,
+                day TEXT NOT NULL,
+                theme TEXT NOT NULL,
+                n INTEGER NOT NULL,
+                PRIMARY KEY (bank, day, theme)
+            );
+            CREATE TABLE IF NOT EXISTS applied_batches (
+                batch TEXT PRIMARY KEY
+            );
+            CREATE TABLE IF NOT EXISTS folded_reviews (
+                review_id TEXT PRIMARY KEY
+            );
+        """)
+        self._conn.commit()
+
+    # --- updates -----------------------------------------------------------
+
+    def _upsert(self, table, keys, values, rows):
+        columns = keys + values
+        updates = ', '.join(f"{c} = {c} + excluded.{c}" for c in values)
+        self._conn.executemany(
+            f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))}) "
+            f"ON CONFLICT({', '.join(keys)}) DO UPDATE SET {updates}",
+            rows)
+
+    def _unseen(self, keys):
+        """Mask of the keys not folded in yet (first occurrence only)."""
+        self._conn.execute("CREATE TEMP TABLE IF NOT EXISTS incoming (review_id TEXT PRIMARY KEY)")
+        self._conn.execute("DELETE FROM incoming")
+        self._conn.executemany("INSERT OR IGNORE INTO incoming (review_id) VALUES (?)",
+                               ((k,) for k in keys))
+        known = {k for (k,) in self._conn.execute(
+            "SELECT review_id FROM incoming JOIN folded_reviews USING (review_id)")}
+        return ~keys.isin(known) & ~keys.duplicated()
+
+    def add(self, df, batch=None):
+        """Fold a frame of processed reviews into the store; return the rows added.
+
+        Reviews are identified by review_id (or review_keys' content hash
+        when the frame has none), and reviews folded in before are skipped,
+        so overlapping or repeated inputs never double count. With a `batch`
+        name, a batch that was already applied is skipped without looking at
+        its rows.
+        """
+        if batch is not None and self._conn.execute(
+                "SELECT 1 FROM applied_batches WHERE batch = ?", (batch,)).fetchone():
+            return 0
+
+        df = df.dropna(subset=['date'])
+        keys = None
+        if 'review_id' in df.columns or 'review' in df.columns:
+            keys = review_keys(df).reset_index(drop=True)
+            fresh = self._unseen(keys).to_numpy()
+            df, keys = df[fresh], keys[fresh]
+        df = pd.DataFrame({
+            'bank': df['bank'].astype(str),
+            'day': pd.to_datetime(df['date']).dt.strftime('%Y-%m-%d'),
+            'sentiment_label': df['sentiment_label'].astype(str),
+            'rating': df['rating'],
+            'sentiment_score': df['sentiment_score'],
+            'theme': df['identified_theme(s)'],
+            'keywords': df['keywords'],
+        })
+
+        daily = df.groupby(['bank', 'day', 'sentiment_label']).agg(
+            review_count=('bank', 'size'),
+            rating_sum=('rating', 'sum'), rating_count=('rating', 'count'),
+            score_sum=('sentiment_score', 'sum'), score_count=('sentiment_score', 'count'))
+        ratings = df.dropna(subset=['rating']).astype({'rating': int}).groupby(
+            ['bank', 'day', 'rating']).size()
+        themes = df.dropna(subset=['theme']).groupby(['bank', 'day', 'theme']).size()
+        keywords = (df[['bank', 'day', 'sentiment_label', 'keywords']].explode('keywords')
+                    .dropna(subset=['keywords'])
+                    .groupby(['bank', 'day', 'sentiment_label', 'keywords']).size())
+
+        def rows(series_or_frame):
+            frame = series_or_frame.reset_index()
+            return [tuple(v.item() if hasattr(v, 'item') else v for v in row)
+                    for row in frame.itertuples(index=False, name=None)]
+
+        with self._conn:
+            self._upsert('daily_stats', ['bank', 'day', 'sentiment_label'],
+                         ['review_count', 'rating_sum', 'rating_count', 'score_sum', 'score_count'],
+                         rows(daily))
+            self._upsert('rating_counts', ['bank', 'day', 'rating'], ['n'], rows(ratings))
+            self._upsert('theme_counts', ['bank', 'day', 'theme'], ['n'], rows(themes))
+            self._upsert('keyword_counts', ['bank', 'day', 'sentiment_label', 'keyword'], ['n'],
+                         rows(keywords))
+            if keys is not None:
+                self._conn.executemany("INSERT INTO folded_reviews (review_id) VALUES (?)",
+                                       ((k,) for k in keys))
+            if batch is not None:
+                self._conn.execute("INSERT INTO applied_batches (batch) VALUES (?)", (batch,))
+        return len(df)
+
+    # --- queries -----------------------------------------------------------
+
+    def latest_day(self):
+        day = self._conn.execute("SELECT MAX(day) FROM daily_stats").fetchone()[0]
+        return date.fromisoformat(day) if day else None
+
+    def _window(self, days=None, until=None):
+        """WHERE clause and parameters for the rolling window."""
+        if days is None and until is None:
+            return "1 = 1", []
+        until = until or self.latest_day() or date.today()
+        if isinstance(until, str):
+            until = date.fromisoformat(until)
+        start = until - timedelta(days=days - 1) if days else date.min
+        return "day BETWEEN ? AND ?", [start.isoformat(), until.isoformat()]
+
+    def _frame(self, sql, params):
+        cursor = self._conn.execute(sql, params)
+        return pd.DataFrame(cursor.fetchall(), columns=[d[0] for d in cursor.description])
+
+    def daily(self, days=None, until=None):
+        where, params = self._window(days, until)
+        return self._frame(f"SELECT * FROM daily_stats WHERE {where} ORDER BY day, bank, sentiment_label",
+                           params)
+
+    def summary(self, days=None, until=None):
+        """Per bank × sentiment: review count, mean rating and mean sentiment score."""
+        where, params = self._window(days, until)
+        return self._frame(f"""
+            SELECT bank, sentiment_label,
+                   SUM(review_count) AS review_count,
+                   SUM(rating_sum) AS rating_sum, SUM(rating_count) AS rating_count,
+                   SUM(score_sum) AS score_sum, SUM(score_count) AS score_count,
+                   SUM(rating_sum) / SUM(rating_count) AS mean_rating,
+                   SUM(score_sum) / SUM(score_count) AS mean_score
+            FROM daily_stats WHERE {where}
+            GROUP BY bank, sentiment_label
+            ORDER BY bank, sentiment_label
+        """, params)
+
+    def monthly_sentiment(self, days=None, until=None):
+        """Review counts per month ('YYYY-MM') × bank × sentiment, for trend plots."""
+        where, params = self._window(days, until)
+        return self._frame(f"""
+            SELECT substr(day, 1, 7) AS month, bank, sentiment_label,
+                   SUM(review_count) AS review_count
+            FROM daily_stats WHERE {where}
+            GROUP BY month, bank, sentiment_label
+            ORDER BY month, bank, sentiment_label
+        """, params)
+
+    def rating_histogram(self, days=None, until=None):
+        """Review counts per bank × star rating."""
+        where, params = self._window(days, until)
+        return self._frame(f"""
+            SELECT bank, rating, SUM(n) AS review_count
+            FROM rating_counts WHERE {where}
+            GROUP BY bank, rating
+            ORDER BY bank, rating
+        """, params)
+
+    def top_keywords(self, days=None, until=None, top_n=3):
+        """{(bank, sentiment_label): [(keyword, count), ...]}, most common first."""
+        where, params = self._window(days, until)
+        rows = self._conn.execute(f"""
+            SELECT bank, sentiment_label, keyword, total FROM (
+                SELECT bank, sentiment_label, keyword, SUM(n) AS total,
+                       ROW_NUMBER() OVER (PARTITION BY bank, sentiment_label
+                                          ORDER BY SUM(n) DESC, keyword) AS pos
+                FROM keyword_counts WHERE {where}
+                GROUP BY bank, sentiment_label, keyword
+            ) WHERE pos <= ? ORDER BY bank, sentiment_label, pos
+        """, params + [top_n])
+        out = {}
+        for bank, sentiment, keyword, total in rows:
+            out.setdefault((bank, sentiment), []).append((keyword, total))
+        return out
+
+    def top_themes(self, days=None, until=None, top_n=3):
+        """{bank: [(theme, count), ...]}, most common first."""
+        where, params = self._window(days, until)
+        rows = self._conn.execute(f"""
+            SELECT bank, theme, total FROM (
+                SELECT bank, theme, SUM(n) AS total,
+                       ROW_NUMBER() OVER (PARTITION BY bank ORDER BY SUM(n) DESC, theme) AS pos
+                FROM theme_counts WHERE {where}
+                GROUP BY bank, theme
+            ) WHERE pos <= ? ORDER BY bank, pos
+        """, params + [top_n])
+        out = {}
+        for bank, theme, total in rows:
+            out.setdefault(bank, []).append((theme, total))
+        return out
+
+    def theme_totals(self, days=None, until=None, top_n=10):
+        """Review counts of the `top_n` most common themes across all banks."""
+        where, params = self._window(days, until)
+        frame = self._frame(f"""
+            SELECT theme, SUM(n) AS review_count
+            FROM theme_counts WHERE {where}
+            GROUP BY theme
+            ORDER BY review_count DESC, theme
+            LIMIT ?
+        """, params + [top_n])
+        return frame.set_index('theme')['review_count']
+
+    def keyword_frequencies(self, days=None, until=None, top_n=50):
+        """{bank: {keyword: count}} of the `top_n` most common keywords per bank."""
+        where, params = self._window(days, until)
+        rows = self._conn.execute(f"""
+            SELECT bank, keyword, total FROM (
+                SELECT bank, keyword, SUM(n) AS total,
+                       ROW_NUMBER() OVER (PARTITION BY bank ORDER BY SUM(n) DESC, keyword) AS pos
+                FROM keyword_counts WHERE {where}
+                GROUP BY bank, keyword
+            ) WHERE pos <= ? ORDER BY bank, pos
+        """, params + [top_n])
+        out = {}
+        for bank, keyword, total in rows:
+            out.setdefault(bank, {})[keyword] = total
+        return out
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fold processed reviews into the aggregate store")
+    parser.add_argument("input", nargs="?", default=stage_path('reviews_with_themes'))
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--batch", help="name of this delta; a batch already applied is skipped")
+    args = parser.parse_args()
+
+    columns = STORE_COLUMNS + (['review_id'] if 'review_id' in stage_columns(args.input) else [])
+    with AggregateStore(args.store) as store:
+        added = store.add(read_stage(args.input, columns=columns), batch=args.batch)
+        print(f"Added {added} reviews to {args.store} (latest day: {store.latest_day()})")
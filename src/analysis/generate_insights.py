@@ -1,196 +1,326 @@
 # will generate insights
+import argparse
 import pandas as pd
 import numpy as np
-from collections import Counter
 import json
 
-# Load the data
-df = pd.read_csv('data/processed/reviews_with_themes.csv')
+from src.analysis.aggregate_store import AggregateStore
+from src.pipeline.columnar import read_stage, stage_path
+
+INPUT_PATH = stage_path('reviews_with_themes')
+REPORT_PATH = 'reports/insights_report.json'
+
+# Load only the columns used below
+INSIGHT_COLUMNS = ['bank', 'rating', 'sentiment_label', 'sentiment_score',
+                   'identified_theme(s)', 'keywords']
 
 # Bank name mapping
-bank_names = {
+BANK_NAMES = {
     'CBE': 'Commercial Bank of Ethiopia',
-    'BOA': 'Bank of Abyssinia', 
+    'BOA': 'Bank of Abyssinia',
     'Dashen': 'Dashen Bank'
 }
-df['bank_name'] = df['bank'].map(bank_names)
-
-print("=" * 60)
-print("FINANCIAL APP EXPERIENCE ANALYTICS - INSIGHTS REPORT")
-print("=" * 60)
-
-# 1. OVERALL PERFORMANCE SUMMARY
-print("\n OVERALL PERFORMANCE SUMMARY")
-print("-" * 40)
-
-total_reviews = len(df)
-print(f"Total Reviews Analyzed: {total_reviews:,}")
-
-# Average ratings by bank
-avg_ratings = df.groupby('bank_name')['rating'].agg(['mean', 'count']).round(2)
-print("\nAverage Ratings by Bank:")
-for bank, stats in avg_ratings.iterrows():
-    print(f"  {bank}: {stats['mean']} stars ({stats['count']} reviews)")
-
-# Sentiment distribution
-sentiment_dist = df['sentiment_label'].value_counts()
-print(f"\nOverall Sentiment Distribution:")
-for sentiment, count in sentiment_dist.items():
-    percentage = (count / total_reviews) * 100
-    print(f"  {sentiment}: {count} reviews ({percentage:.1f}%)")
-
-# 2. DRIVERS AND PAIN POINTS ANALYSIS
-print("\n DRIVERS AND PAIN POINTS ANALYSIS")
-print("-" * 40)
-
-def analyze_bank_performance(bank_code, bank_name):
-    """Analyze performance for a specific bank"""
-    bank_data = df[df['bank'] == bank_code]
-    
-    print(f"\n{bank_name} ({bank_code}):")
-    print(f"  Total Reviews: {len(bank_data)}")
-    print(f"  Average Rating: {bank_data['rating'].mean():.2f} stars")
-    print(f"  Average Sentiment Score: {bank_data['sentiment_score'].mean():.3f}")
-    
-    # Sentiment breakdown
-    sentiment_breakdown = bank_data['sentiment_label'].value_counts()
-    positive_pct = (sentiment_breakdown.get('POSITIVE', 0) / len(bank_data)) * 100
-    print(f"  Positive Reviews: {positive_pct:.1f}%")
-    
-    # Top themes
-    themes = bank_data['identified_theme(s)'].value_counts().head(3)
-    print(f"  Top Themes: {', '.join(themes.index.tolist())}")
-    
-    # Extract keywords for analysis
-    all_keywords = []
-    for keywords_str in bank_data['keywords'].dropna():
-        if isinstance(keywords_str, str):
-            try:
-                keywords = eval(keywords_str) if keywords_str.startswith('[') else keywords_str.split(', ')
-                all_keywords.extend(keywords)
-            except:
-                continue
-    
-    # Analyze positive vs negative keywords
-    positive_reviews = bank_data[bank_data['sentiment_label'] == 'POSITIVE']
-    negative_reviews = bank_data[bank_data['sentiment_label'] == 'NEGATIVE']
-    
-    positive_keywords = []
-    negative_keywords = []
-    
-    for keywords_str in positive_reviews['keywords'].dropna():
-        if isinstance(keywords_str, str):
-            try:
-                keywords = eval(keywords_str) if keywords_str.startswith('[') else keywords_str.split(', ')
-                positive_keywords.extend(keywords)
-            except:
-                continue
-    
-    for keywords_str in negative_reviews['keywords'].dropna():
-        if isinstance(keywords_str, str):
-            try:
-                keywords = eval(keywords_str) if keywords_str.startswith('[') else keywords_str.split(', ')
-                negative_keywords.extend(keywords)
-            except:
-                continue
-    
-    # Top drivers (positive keywords)
-    positive_counter = Counter(positive_keywords)
-    top_drivers = positive_counter.most_common(3)
-    
-    # Top pain points (negative keywords)
-    negative_counter = Counter(negative_keywords)
-    top_pain_points = negative_counter.most_common(3)
-    
-    print(f"  Top Drivers: {', '.join([kw for kw, _ in top_drivers])}")
-    print(f"  Top Pain Points: {', '.join([kw for kw, _ in top_pain_points])}")
-    
+
+# Per bank: rating below which it is flagged, theme-triggered actions and the saved summaries
+RECOMMENDATION_RULES = {
+    'CBE': {
+        'min_rating': 4.0,
+        'low_rating': " Priority: Address low ratings - focus on user experience improvements",
+        'themes': [('Account Access Issues', " Priority: Fix login and authentication issues"),
+                   ('Transaction Performance', " Medium: Optimize transaction processing speed")],
+        'saved_low': ['Address low ratings', 'Fix login issues'],
+        'saved_ok': ['Maintain current performance'],
+    },
+    'BOA': {
+        'min_rating': 3.0,
+        'low_rating': " Critical: Major UX overhaul needed - ratings are very low",
+        'themes': [('User Interface & Experience', " Priority: Redesign user interface for better usability"),
+                   ('Customer Support', " Medium: Improve customer support response times")],
+        'saved_low': ['Major UX overhaul', 'Improve customer support'],
+        'saved_ok': ['Focus on specific improvements'],
+    },
+    'Dashen': {
+        'min_rating': 4.0,
+        'low_rating': " Medium: Focus on specific pain points to improve ratings",
+        'themes': [('Feature Requests', " Opportunity: Consider adding requested features")],
+        'saved_low': ['Address pain points', 'Consider feature requests'],
+        'saved_ok': ['Maintain and enhance'],
+    },
+}
+
+ETHICS_NOTES = [
+    "Review bias: Negative reviews may be overrepresented as dissatisfied users are more likely to leave reviews",
+    "Sample bias: Reviews are from Google Play Store users only, may not represent all customer segments",
+    "Language bias: Analysis focused on English reviews, may miss feedback in local languages",
+    "Temporal bias: Reviews collected at a specific time may not reflect current app performance",
+]
+
+
+def _ranked(frame, group, key, top_n):
+    """Top `top_n` `key` values per `group` by row count.
+
+    Ties keep first-appearance order, as Counter.most_common and
+    value_counts do on the per-bank slices.
+    """
+    counts = frame.groupby(group + [key], sort=False, observed=True).size().rename('count').reset_index()
+    counts = counts.sort_values('count', ascending=False, kind='stable')
+    return counts.groupby(group, sort=False, observed=True).head(top_n)
+
+
+def _pairs(ranked, group, key, value):
+    """{group: [(key, count), ...]} from a _ranked table."""
+    out = {}
+    groups = zip(*(ranked[g] for g in group))
+    for group_key, item, count in zip(groups, ranked[key], ranked[value]):
+        out.setdefault(group_key, []).append((item, int(count)))
+    return out
+
+
+def compute_bank_analyses(df, bank_names=BANK_NAMES, top_n=3):
+    """Per-bank metrics, top themes, drivers and pain points in one grouped pass.
+
+    Keywords are exploded once; drivers are the most common keywords of a
+    bank's POSITIVE reviews and pain points those of its NEGATIVE reviews.
+    """
+    grouped = df.groupby('bank', observed=True)
+    ratings = grouped['rating'].mean()
+    scores = grouped['sentiment_score'].mean()
+    sizes = grouped.size()
+    positives = df['sentiment_label'].eq('POSITIVE').groupby(df['bank'], observed=True).sum()
+
+    themes = _pairs(_ranked(df, ['bank'], 'identified_theme(s)', top_n),
+                    ['bank'], 'identified_theme(s)', 'count')
+
+    keywords = (df[['bank', 'sentiment_label', 'keywords']]
+                .explode('keywords').dropna(subset=['keywords']))
+    keywords = keywords[keywords['sentiment_label'].isin(['POSITIVE', 'NEGATIVE'])]
+    top_keywords = _pairs(_ranked(keywords, ['bank', 'sentiment_label'], 'keywords', top_n),
+                          ['bank', 'sentiment_label'], 'keywords', 'count')
+
+    analyses = {}
+    for bank_code in bank_names:
+        analyses[bank_code] = {
+            'total_reviews': int(sizes.get(bank_code, 0)),
+            'rating': ratings.get(bank_code, np.nan),
+            'sentiment_score': scores.get(bank_code, np.nan),
+            'positive_pct': (positives.get(bank_code, 0) / sizes[bank_code]) * 100
+                            if sizes.get(bank_code, 0) else np.nan,
+            'top_drivers': top_keywords.get((bank_code, 'POSITIVE'), []),
+            'top_pain_points': top_keywords.get((bank_code, 'NEGATIVE'), []),
+            'top_themes': [theme for theme, _ in themes.get((bank_code,), [])],
+        }
+    return analyses
+
+
+def recommendations(bank_analyses):
+    """Printed recommendation lines per bank and the short lists saved to JSON.
+
+    Only banks with reviews (e.g. in the chosen --days window) get recommendations.
+    """
+    lines, saved = {}, {}
+    for bank_code, rules in RECOMMENDATION_RULES.items():
+        analysis = bank_analyses.get(bank_code)
+        if analysis is None or not analysis['total_reviews']:
+            continue
+        low = analysis['rating'] < rules['min_rating']
+        lines[bank_code] = [rules['low_rating']] if low else []
+        lines[bank_code] += [line for theme, line in rules['themes']
+                             if theme in analysis['top_themes']]
+        saved[bank_code.lower()] = rules['saved_low'] if low else rules['saved_ok']
+    return lines, saved
+
+
+def generate_insights(df, bank_names=BANK_NAMES):
+    """Everything the report prints and saves, computed from a reviews_with_themes frame."""
+    df = df.copy()
+    df['bank_name'] = df['bank'].map(bank_names)
+
+    bank_analyses = compute_bank_analyses(df, bank_names)
+    lines, saved = recommendations(bank_analyses)
     return {
-        'rating': bank_data['rating'].mean(),
-        'sentiment_score': bank_data['sentiment_score'].mean(),
-        'positive_pct': positive_pct,
-        'top_drivers': top_drivers,
-        'top_pain_points': top_pain_points,
-        'top_themes': themes.index.tolist()
+        'total_reviews': len(df),
+        # Average ratings by bank
+        'average_ratings': df.groupby('bank_name', observed=True)['rating'].agg(['mean', 'count']).round(2),
+        # Sentiment distribution
+        'sentiment_distribution': df['sentiment_label'].value_counts(),
+        'bank_analyses': bank_analyses,
+        'recommendation_lines': lines,
+        'recommendations': saved,
     }
 
-# Analyze each bank
-bank_analyses = {}
-for bank_code, bank_name in bank_names.items():
-    bank_analyses[bank_code] = analyze_bank_performance(bank_code, bank_name)
-
-# 3. COMPARATIVE ANALYSIS
-print("\n COMPARATIVE ANALYSIS")
-print("-" * 40)
-
-# Best performing bank by rating
-best_rating_bank = max(bank_analyses.items(), key=lambda x: x[1]['rating'])
-print(f"Highest Rated Bank: {bank_names[best_rating_bank[0]]} ({best_rating_bank[1]['rating']:.2f} stars)")
-
-# Best performing bank by sentiment
-best_sentiment_bank = max(bank_analyses.items(), key=lambda x: x[1]['sentiment_score'])
-print(f"Most Positive Sentiment: {bank_names[best_sentiment_bank[0]]} (score: {best_sentiment_bank[1]['sentiment_score']:.3f})")
-
-# Most positive reviews
-most_positive_bank = max(bank_analyses.items(), key=lambda x: x[1]['positive_pct'])
-print(f"Highest % Positive Reviews: {bank_names[most_positive_bank[0]]} ({most_positive_bank[1]['positive_pct']:.1f}%)")
-
-# 4. RECOMMENDATIONS
-print("\n ACTIONABLE RECOMMENDATIONS")
-print("-" * 40)
-
-print("\nFor Commercial Bank of Ethiopia (CBE):")
-cbe_analysis = bank_analyses['CBE']
-if cbe_analysis['rating'] < 4.0:
-    print(" Priority: Address low ratings - focus on user experience improvements")
-if 'Account Access Issues' in cbe_analysis['top_themes']:
-    print(" Priority: Fix login and authentication issues")
-if 'Transaction Performance' in cbe_analysis['top_themes']:
-    print(" Medium: Optimize transaction processing speed")
-
-print("\nFor Bank of Abyssinia (BOA):")
-boa_analysis = bank_analyses['BOA']
-if boa_analysis['rating'] < 3.0:
-    print(" Critical: Major UX overhaul needed - ratings are very low")
-if 'User Interface & Experience' in boa_analysis['top_themes']:
-    print(" Priority: Redesign user interface for better usability")
-if 'Customer Support' in boa_analysis['top_themes']:
-    print(" Medium: Improve customer support response times")
-
-print("\nFor Dashen Bank:")
-dashen_analysis = bank_analyses['Dashen']
-if dashen_analysis['rating'] < 4.0:
-    print(" Medium: Focus on specific pain points to improve ratings")
-if 'Feature Requests' in dashen_analysis['top_themes']:
-    print(" Opportunity: Consider adding requested features")
-
-# 5. ETHICS CONSIDERATIONS
-print("\n ETHICS CONSIDERATIONS")
-print("-" * 40)
-print("• Review bias: Negative reviews may be overrepresented as dissatisfied users are more likely to leave reviews")
-print("• Sample bias: Reviews are from Google Play Store users only, may not represent all customer segments")
-print("• Language bias: Analysis focused on English reviews, may miss feedback in local languages")
-print("• Temporal bias: Reviews collected at a specific time may not reflect current app performance")
-
-# 6. SAVE INSIGHTS TO FILE
-insights_data = {
-    'summary': {
-        'total_reviews': total_reviews,
-        'average_ratings': avg_ratings.to_dict(),
-        'sentiment_distribution': sentiment_dist.to_dict()
-    },
-    'bank_analyses': bank_analyses,
-    'recommendations': {
-        'cbe': ['Address low ratings', 'Fix login issues'] if cbe_analysis['rating'] < 4.0 else ['Maintain current performance'],
-        'boa': ['Major UX overhaul', 'Improve customer support'] if boa_analysis['rating'] < 3.0 else ['Focus on specific improvements'],
-        'dashen': ['Address pain points', 'Consider feature requests'] if dashen_analysis['rating'] < 4.0 else ['Maintain and enhance']
+
+def insights_from_store(store, days=None, until=None, bank_names=BANK_NAMES, top_n=3):
+    """Same insights as generate_insights, read from an AggregateStore.
+
+    Costs O(aggregate rows) instead of a pass over every review, and can be
+    limited to a rolling window (e.g. days=90). Keyword and theme ties are
+    broken alphabetically rather than by first appearance.
+    """
+    summary = store.summary(days, until)
+    per_bank = summary.groupby('bank')[['review_count', 'rating_sum', 'rating_count',
+                                        'score_sum', 'score_count']].sum()
+    positives = summary[summary['sentiment_label'] == 'POSITIVE'].set_index('bank')['review_count']
+    keywords = store.top_keywords(days, until, top_n)
+    themes = store.top_themes(days, until, top_n)
+
+    bank_analyses = {}
+    for bank_code in bank_names:
+        stats = per_bank.loc[bank_code] if bank_code in per_bank.index else None
+        total = int(stats['review_count']) if stats is not None else 0
+        bank_analyses[bank_code] = {
+            'total_reviews': total,
+            'rating': stats['rating_sum'] / stats['rating_count'] if total else np.nan,
+            'sentiment_score': stats['score_sum'] / stats['score_count'] if total else np.nan,
+            'positive_pct': (positives.get(bank_code, 0) / total) * 100 if total else np.nan,
+            'top_drivers': keywords.get((bank_code, 'POSITIVE'), []),
+            'top_pain_points': keywords.get((bank_code, 'NEGATIVE'), []),
+            'top_themes': [theme for theme, _ in themes.get(bank_code, [])],
+        }
+
+    average_ratings = pd.DataFrame({
+        'mean': per_bank['rating_sum'] / per_bank['rating_count'],
+        'count': per_bank['rating_count'],
+    }).round(2)
+    average_ratings.index = average_ratings.index.map(bank_names)
+    average_ratings = average_ratings.sort_index()
+    average_ratings.index.name = 'bank_name'
+
+    sentiment_distribution = (summary.groupby('sentiment_label')['review_count'].sum()
+                              .sort_values(ascending=False).rename('count'))
+    lines, saved = recommendations(bank_analyses)
+    return {
+        'total_reviews': int(per_bank['review_count'].sum()),
+        'average_ratings': average_ratings,
+        'sentiment_distribution': sentiment_distribution,
+        'bank_analyses': bank_analyses,
+        'recommendation_lines': lines,
+        'recommendations': saved,
     }
-}
 
-with open('reports/insights_report.json', 'w') as f:
-    json.dump(insights_data, f, indent=2, default=str)
 
-print(f"\n Insights saved to: reports/insights_report.json")
-print("\n" + "=" * 60)
-print("ANALYSIS COMPLETE")
-print("=" * 60) 
\ No newline at end of file
+def print_report(insights, bank_names=BANK_NAMES):
+    total_reviews = insights['total_reviews']
+    bank_analyses = insights['bank_analyses']
+
+    print("=" * 60)
+    print("FINANCIAL APP EXPERIENCE ANALYTICS - INSIGHTS REPORT")
+    print("=" * 60)
+
+    # 1. OVERALL PERFORMANCE SUMMARY
+    print("\n OVERALL PERFORMANCE SUMMARY")
+    print("-" * 40)
+    print(f"Total Reviews Analyzed: {total_reviews:,}")
+
+    print("\nAverage Ratings by Bank:")
+    for bank, stats in insights['average_ratings'].iterrows():
+        print(f"  {bank}: {stats['mean']} stars ({stats['count']} reviews)")
+
+    print(f"\nOverall Sentiment Distribution:")
+    for sentiment, count in insights['sentiment_distribution'].items():
+        percentage = (count / total_reviews) * 100
+        print(f"  {sentiment}: {count} reviews ({percentage:.1f}%)")
+
+    # 2. DRIVERS AND PAIN POINTS ANALYSIS
+    print("\n DRIVERS AND PAIN POINTS ANALYSIS")
+    print("-" * 40)
+    for bank_code, bank_name in bank_names.items():
+        analysis = bank_analyses[bank_code]
+        print(f"\n{bank_name} ({bank_code}):")
+        if not analysis['total_reviews']:
+            print("  No reviews")
+            continue
+        print(f"  Total Reviews: {analysis['total_reviews']}")
+        print(f"  Average Rating: {analysis['rating']:.2f} stars")
+        print(f"  Average Sentiment Score: {analysis['sentiment_score']:.3f}")
+        print(f"  Positive Reviews: {analysis['positive_pct']:.1f}%")
+        print(f"  Top Themes: {', '.join(analysis['top_themes'])}")
+        print(f"  Top Drivers: {', '.join([kw for kw, _ in analysis['top_drivers']])}")
+        print(f"  Top Pain Points: {', '.join([kw for kw, _ in analysis['top_pain_points']])}")
+
+    # 3. COMPARATIVE ANALYSIS
+    print("\n COMPARATIVE ANALYSIS")
+    print("-" * 40)
+
+    reviewed = {bank: a for bank, a in bank_analyses.items() if a['total_reviews']}
+
+    # Best performing bank by rating
+    best_rating_bank = max(reviewed.items(), key=lambda x: x[1]['rating'])
+    print(f"Highest Rated Bank: {bank_names[best_rating_bank[0]]} ({best_rating_bank[1]['rating']:.2f} stars)")
+
+    # Best performing bank by sentiment
+    best_sentiment_bank = max(reviewed.items(), key=lambda x: x[1]['sentiment_score'])
+    print(f"Most Positive Sentiment: {bank_names[best_sentiment_bank[0]]} (score: {best_sentiment_bank[1]['sentiment_score']:.3f})")
+
+    # Most positive reviews
+    most_positive_bank = max(reviewed.items(), key=lambda x: x[1]['positive_pct'])
+    print(f"Highest % Positive Reviews: {bank_names[most_positive_bank[0]]} ({most_positive_bank[1]['positive_pct']:.1f}%)")
+
+    # 4. RECOMMENDATIONS
+    print("\n ACTIONABLE RECOMMENDATIONS")
+    print("-" * 40)
+    headings = {
+        'CBE': "For Commercial Bank of Ethiopia (CBE):",
+        'BOA': "For Bank of Abyssinia (BOA):",
+        'Dashen': "For Dashen Bank:",
+    }
+    for bank_code, heading in headings.items():
+        if bank_code not in insights['recommendation_lines']:
+            continue
+        print(f"\n{heading}")
+        for line in insights['recommendation_lines'][bank_code]:
+            print(line)
+
+    # 5. ETHICS CONSIDERATIONS
+    print("\n ETHICS CONSIDERATIONS")
+    print("-" * 40)
+    for note in ETHICS_NOTES:
+        print(f"• {note}")
+
+
+def insights_json(insights):
+    """The reports/insights_report.json payload."""
+    return {
+        'summary': {
+            'total_reviews': insights['total_reviews'],
+            'average_ratings': insights['average_ratings'].to_dict(),
+            'sentiment_distribution': insights['sentiment_distribution'].to_dict()
+        },
+        'bank_analyses': {
+            bank: {k: v for k, v in analysis.items() if k != 'total_reviews'}
+            for bank, analysis in insights['bank_analyses'].items()
+        },
+        'recommendations': insights['recommendations'],
+    }
+
+
+def save_insights(insights, path=REPORT_PATH):
+    with open(path, 'w') as f:
+        json.dump(insights_json(insights), f, indent=2, default=str)
+
+
+def main(input_path=INPUT_PATH, report_path=REPORT_PATH, store_path=None, days=None):
+    if store_path:
+        with AggregateStore(store_path) as store:
+            insights = insights_from_store(store, days)
+    else:
+        df = read_stage(input_path, columns=INSIGHT_COLUMNS)
+        insights = generate_insights(df)
+    print_report(insights)
+
+    # 6. SAVE INSIGHTS TO FILE
+    save_insights(insights, report_path)
+    print(f"\n Insights saved to: {report_path}")
+    print("\n" + "=" * 60)
+    print("ANALYSIS COMPLETE")
+    print("=" * 60)
+    return insights
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the insights report")
+    parser.add_argument("--input", default=INPUT_PATH)
+    parser.add_argument("--output", default=REPORT_PATH)
+    parser.add_argument("--store", help="read aggregates from this AggregateStore instead of --input")
+    parser.add_argument("--days", type=int, help="with --store: only the last N days")
+    args = parser.parse_args()
+    main(args.input, args.output, args.store, args.days)
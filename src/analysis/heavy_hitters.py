@@ -0,0 +1,180 @@
+import heapq
+import json
+import math
+import os
+
+SKETCH_PATH = 'data/cache/heavy_hitters.json'
+
+
+class SpaceSaving:
+    """Approximate top-k counter in at most `capacity` entries (Space-Saving).
+
+    Every item's estimated count is within `error_bound` of its true count,
+    so any item seen more than that many times is guaranteed to be tracked.
+    On a single stream the bound is the smallest counter, at most
+    total / capacity, and estimates only overestimate;
+    `SpaceSaving.for_error(0.001)` sizes the sketch for 0.1% of the stream.
+    Merged sketches can also underestimate by up to `slack` and their bound
+    is at most 2 * total / capacity.
+    """
+
+    def __init__(self, capacity=1000):
+        self.capacity = capacity
+        self.total = 0
+        self.slack = 0     # max underestimate, from counts lost in merges
+        self.counts = {}   # item -> estimated count
+        self.errors = {}   # item -> max overestimate of that count
+        self._heap = []    # (count, item), may hold stale entries
+
+    @classmethod
+    def for_error(cls, epsilon):
+        return cls(capacity=math.ceil(1 / epsilon))
+
+    def _floor(self):
+        """Upper bound on the count of an untracked item (0 until the sketch is full)."""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    @property
+    def error_bound(self):
+        # Tracked items are off by at most their error, untracked ones by the floor
+        return max(self._floor(), max(self.errors.values(), default=0)) + self.slack
+
+    def _min_entry(self):
+        # Drop heap entries whose count has since been raised
+        while True:
+            count, item = self._heap[0]
+            if self.counts.get(item) == count:
+                return count, item
+            heapq.heappop(self._heap)
+
+    def _push(self, item):
+        heapq.heappush(self._heap, (self.counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(c, i) for i, c in self.counts.items()]
+            heapq.heapify(self._heap)
+
+    def update(self, item, count=1, error=0):
+        """Add `count` occurrences of `item`; `error` is how much `count` may overestimate."""
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+            self.errors[item] += error
+        elif len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = error
+        else:
+            # Replace the smallest counter; the newcomer inherits its count as error
+            floor, evicted = self._min_entry()
+            heapq.heappop(self._heap)
+            del self.counts[evicted], self.errors[evicted]
+            self.counts[item] = floor + count
+            self.errors[item] = floor + error
+        self._push(item)
+
+    def update_many(self, items):
+        for item in items:
+            self.update(item)
+
+    def merge(self, other):
+        """Combine with a sketch of another shard.
+
+        `other`'s counters are replayed into a copy of this sketch as
+        weighted updates, so the counters keep summing to the combined total
+        and the smallest stays below total / capacity. Occurrences `other`
+        had already dropped (at most its floor per item) become `slack`.
+        """
+        merged = SpaceSaving.from_dict(dict(self.to_dict(),
+                                            capacity=max(self.capacity, other.capacity)))
+        for item, count in sorted(other.counts.items(), key=lambda kv: (-kv[1], kv[0])):
+            merged.update(item, count, other.errors[item])
+        merged.total = self.total + other.total
+        merged.slack = self.slack + other.slack + other._floor()
+        return merged
+
+    def top(self, k=3):
+        """[(item, estimated_count), ...] for the `k` largest counts, ties alphabetical."""
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], kv[0]))
+        return ranked[:k]
+
+    def guaranteed(self, k=3):
+        """Items of top(k) whose rank is certain despite the estimation error."""
+        ranked = self.top(len(self.counts))
+        out = []
+        for i, (item, count) in enumerate(ranked[:k]):
+            next_count = ranked[i + 1][1] if i + 1 < len(ranked) else self._floor()
+            if count - self.errors[item] < next_count + self.slack:
+                break
+            out.append((item, count))
+        return out
+
+    def to_dict(self):
+        return {'capacity': self.capacity, 'total': self.total, 'slack': self.slack,
+                'items': [[item, self.counts[item], self.errors[item]] for item in self.counts]}
+
+    @classmethod
+    def from_dict(cls, state):
+        sketch = cls(state['capacity'])
+        sketch.total = state['total']
+        sketch.slack = state.get('slack', 0)
+        for item, count, error in state['items']:
+            sketch.counts[item] = count
+            sketch.errors[item] = error
+        sketch._heap = [(c, i) for i, c in sketch.counts.items()]
+        heapq.heapify(sketch._heap)
+        return sketch
+
+
+class KeywordHeavyHitters:
+    """One SpaceSaving sketch of keywords per bank × sentiment label.
+
+    Replaces Counter(...).most_common over every keyword occurrence: memory
+    is capped at `capacity` entries per group regardless of corpus size.
+    Sketches from different shards or runs combine with `merge`. The chunked
+    pipeline (src.pipeline.chunked) keeps one up to date; `update` must only
+    see each review once.
+    """
+
+    def __init__(self, capacity=1000, sketches=None):
+        self.capacity = capacity
+        self.sketches = sketches or {}
+
+    def sketch(self, bank, sentiment):
+        key = (str(bank), str(sentiment))
+        if key not in self.sketches:
+            self.sketches[key] = SpaceSaving(self.capacity)
+        return self.sketches[key]
+
+    def update(self, df):
+        """Add the keywords of a frame with bank, sentiment_label and list-valued keywords."""
+        for bank, sentiment, keywords in zip(df['bank'], df['sentiment_label'], df['keywords']):
+            self.sketch(bank, sentiment).update_many(keywords)
+
+    def merge(self, other):
+        merged = KeywordHeavyHitters(max(self.capacity, other.capacity))
+        for key in self.sketches.keys() | other.sketches.keys():
+            if key in self.sketches and key in other.sketches:
+                merged.sketches[key] = self.sketches[key].merge(other.sketches[key])
+            else:
+                sketch = self.sketches.get(key) or other.sketches[key]
+                merged.sketches[key] = SpaceSaving.from_dict(sketch.to_dict())
+        return merged
+
+    def top(self, bank, sentiment, k=3):
+        key = (str(bank), str(sentiment))
+        return self.sketches[key].top(k) if key in self.sketches else []
+
+    def save(self, path=SKETCH_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'capacity': self.capacity,
+                       'sketches': [[bank, sentiment, sketch.to_dict()]
+                                    for (bank, sentiment), sketch in self.sketches.items()]},
+                      f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=SKETCH_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        return cls(state['capacity'], {(bank, sentiment): SpaceSaving.from_dict(sketch)
+                                       for bank, sentiment, sketch in state['sketches']})
+
@@ -0,0 +1,176 @@
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction import FeatureHasher
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfVectorizer
+from sklearn.preprocessing import normalize
+
+VOCAB_PATH = 'data/cache/keyword_vocab.json'
+HASHING_STATE_PATH = 'data/cache/keyword_hashing_state.npz'
+
+
+def top_keywords_sparse(X, feature_names, top_n=3):
+    """Top `top_n` terms of every row of a CSR matrix, highest score first.
+
+    Works on the CSR data/indices/indptr arrays directly: nonzeros are ranked
+    within their row in one vectorized lexsort and the first `top_n` per row
+    are kept, so cost scales with the number of nonzeros, not rows × features.
+    Ties go to the higher feature index, as with a stable dense argsort.
+    """
+    X = X.tocsr()
+    n_rows = X.shape[0]
+    rows = np.repeat(np.arange(n_rows), np.diff(X.indptr))
+    keep = X.data > 0
+    data, indices, rows = X.data[keep], X.indices[keep], rows[keep]
+
+    order = np.lexsort((-indices, -data, rows))
+    row_counts = np.bincount(rows, minlength=n_rows)
+    row_starts = np.cumsum(row_counts) - row_counts
+    sorted_rows = rows[order]
+    top = np.arange(len(order)) - row_starts[sorted_rows] < top_n
+
+    terms = np.asarray(feature_names, dtype=object)[indices[order[top]]].tolist()
+    bounds = np.concatenate(([0], np.cumsum(np.minimum(row_counts, top_n)))).tolist()
+    return [terms[bounds[i]:bounds[i + 1]] for i in range(n_rows)]
+
+
+def _chunks(texts, chunk_size):
+    texts = list(texts)
+    for start in range(0, len(texts), chunk_size):
+        yield texts[start:start + chunk_size]
+
+
+class FittedKeywordExtractor:
+    """TF-IDF keywords from a vocabulary and IDF weights fitted once.
+
+    `fit` learns the vocabulary (same settings as the original
+    TfidfVectorizer); `save`/`load` persist it as JSON so later runs only
+    transform, which keeps each review's keywords stable between runs.
+    """
+
+    def __init__(self, vectorizer):
+        self.vectorizer = vectorizer
+        self.feature_names = vectorizer.get_feature_names_out()
+
+    @classmethod
+    def fit(cls, texts, ngram_range=(1, 2), max_features=1000):
+        return cls(TfidfVectorizer(ngram_range=ngram_range, max_features=max_features).fit(texts))
+
+    def save(self, path=VOCAB_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({
+                'ngram_range': list(self.vectorizer.ngram_range),
+                'terms': self.feature_names.tolist(),
+                'idf': self.vectorizer.idf_.tolist(),
+            }, f, ensure_ascii=False)
+
+    @classmethod
+    def load(cls, path=VOCAB_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+        vectorizer = TfidfVectorizer(ngram_range=tuple(state['ngram_range']),
+                                     vocabulary=state['terms'])
+        vectorizer.idf_ = np.asarray(state['idf'])
+        return cls(vectorizer)
+
+    def keywords(self, texts, top_n=3, chunk_size=50_000):
+        """Top keywords per text, transformed `chunk_size` rows at a time."""
+        out = []
+        for chunk in _chunks(texts, chunk_size):
+            out.extend(top_keywords_sparse(self.vectorizer.transform(chunk),
+                                           self.feature_names, top_n))
+        return out
+
+
+class StreamingKeywordExtractor:
+    """Hashing-based TF-IDF keywords with incrementally updated document frequencies.
+
+    Terms are hashed into `n_features` buckets, so there is no vocabulary to
+    fit or hold in memory. Each chunk first adds its documents to the running
+    document-frequency counts, then is scored against the IDF of everything
+    seen so far. State is a fixed-size array regardless of corpus size.
+
+    When texts come with `keys` (review IDs), a 64-bit hash of every counted
+    key is kept (8 bytes per review) and documents already counted on an
+    earlier chunk or run are scored without being counted again, so feeding
+    the same reviews twice leaves the IDF unchanged.
+    """
+
+    def __init__(self, n_features=2 ** 18, ngram_range=(1, 2), doc_freq=None, n_docs=0,
+                 seen=None):
+        self.n_features = n_features
+        self.ngram_range = tuple(ngram_range)
+        self.doc_freq = np.zeros(n_features, dtype=np.int64) if doc_freq is None else doc_freq
+        self.n_docs = n_docs
+        self.seen = np.array([], dtype=np.uint64) if seen is None else seen  # sorted key hashes
+        self._analyzer = HashingVectorizer(ngram_range=self.ngram_range).build_analyzer()
+        self._hasher = FeatureHasher(n_features=n_features, input_type='string',
+                                     alternate_sign=False)
+
+    def _idf(self):
+        # Same smoothed IDF as TfidfVectorizer
+        return np.log((1 + self.n_docs) / (1 + self.doc_freq)) + 1
+
+    def unseen(self, keys):
+        """Mask of the first occurrence of every key not counted before; records them."""
+        hashes = pd.util.hash_array(np.asarray(keys, dtype=object))
+        first = np.zeros(len(hashes), dtype=bool)
+        first[np.unique(hashes, return_index=True)[1]] = True
+        fresh = first & ~np.isin(hashes, self.seen)
+        self.seen = np.union1d(self.seen, hashes[fresh])
+        return fresh
+
+    def process_chunk(self, texts, top_n=3, keys=None, counted=None):
+        """Update document frequencies with `texts` and return their keywords.
+
+        With `keys`, only documents whose key was not counted before update
+        the frequencies; all of them are scored. `counted` is the same kind
+        of mask for callers that already took it from `unseen`.
+        """
+        terms = [self._analyzer(str(t)) for t in texts]
+        counts = self._hasher.transform(terms).tocsr()
+        counts.sum_duplicates()
+
+        if keys is not None:
+            counted = self.unseen(keys)
+        counted = counts if counted is None else counts[np.asarray(counted, dtype=bool)]
+        self.doc_freq += np.bincount(counted.indices, minlength=self.n_features)
+        self.n_docs += counted.shape[0]
+
+        tfidf = sp.csr_matrix(normalize(counts.multiply(self._idf()).tocsr()))
+        top_buckets = top_keywords_sparse(tfidf, np.arange(self.n_features), top_n)
+
+        # Name each winning bucket after the term of *that* review which hashed
+        # there, so collisions with other reviews' terms can't leak in
+        unique_terms = list(dict.fromkeys(term for doc in terms for term in doc))
+        bucket_of = dict(zip(unique_terms, self._hasher.transform(
+            [[t] for t in unique_terms]).indices)) if unique_terms else {}
+        keywords = []
+        for doc, buckets in zip(terms, top_buckets):
+            names = {bucket_of[t]: t for t in doc}
+            keywords.append([names[b] for b in buckets])
+        return keywords
+
+    def keywords(self, texts, top_n=3, chunk_size=50_000, keys=None):
+        key_chunks = _chunks(keys, chunk_size) if keys is not None else itertools.repeat(None)
+        out = []
+        for chunk, chunk_keys in zip(_chunks(texts, chunk_size), key_chunks):
+            out.extend(self.process_chunk(chunk, top_n, chunk_keys))
+        return out
+
+    def save(self, path=HASHING_STATE_PATH):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        np.savez_compressed(path, doc_freq=self.doc_freq, n_docs=self.n_docs,
+                            ngram_range=np.array(self.ngram_range), seen=self.seen)
+
+    @classmethod
+    def load(cls, path=HASHING_STATE_PATH):
+        state = np.load(path)
+        return cls(n_features=len(state['doc_freq']), ngram_range=tuple(state['ngram_range']),
+                   doc_freq=state['doc_freq'], n_docs=int(state['n_docs']),
+                   seen=state['seen'] if 'seen' in state else None)
@@ -1,24 +1,194 @@
-import pandas as pd
-from transformers import pipeline
+import argparse
+import os
+import time
 
-# Load cleaned reviews
-input_path = 'data/processed/cleaned_reviews.csv'
-df = pd.read_csv(input_path)
 
-# Initialize sentiment analysis pipeline
-sentiment_pipeline = pipeline('sentiment-analysis', model='distilbert-base-uncased-finetuned-sst-2-english')
+from src.analyzer.sentiment_cache import CACHE_PATH, SentimentCache
+from src.analyzer.text_dedup import CollapsedTexts
+from src.pipeline.columnar import read_stage, stage_path, write_stage
 
-# Run sentiment analysis
-results = sentiment_pipeline(df['review'].astype(str).tolist(), truncation=True)
+MODEL_NAME = 'distilbert-base-uncased-finetuned-sst-2-english'
 
-# Add results to DataFrame
-sentiment_labels = [r['label'] for r in results]
-sentiment_scores = [r['score'] for r in results]
-df['sentiment_label'] = sentiment_labels
-df['sentiment_score'] = sentiment_scores
 
-# Save enriched data
-output_path = 'data/processed/reviews_with_sentiment.csv'
-df.to_csv(output_path, index=False)
+class SentimentEngine:
+    """Batched sentiment scorer around a Hugging Face text-classification pipeline.
 
-print(f"Sentiment analysis complete. Results saved to {output_path}") 
\ No newline at end of file
+    Reviews are sorted by token length before batching so each batch pads to
+    a similar length, then results are put back in input order. The model is
+    only loaded on first use; pass `classifier` to score with any callable
+    that takes a list of texts and returns [{'label', 'score'}, ...]. An
+    optional SentimentCache skips texts scored on earlier runs.
+
+    `model` may be a hub name or a local directory; local directories (or
+    `local_files_only=True`) never touch the network. `quantize=True` applies
+    int8 dynamic quantization to the Linear layers for faster CPU inference.
+    """
+
+    def __init__(self, model=MODEL_NAME, batch_size=32, num_threads=None,
+                 max_length=512, classifier=None, revision=None, cache=None,
+                 quantize=False, local_files_only=None):
+        self.model = model
+        self.revision = revision
+        self.quantize = quantize
+        self.local_files_only = os.path.isdir(model) if local_files_only is None else local_files_only
+        self.cache = cache
+        self.cache_hits = 0
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.max_length = max_length
+        self._classifier = classifier
+        self.last_throughput = None
+        self.collapsed = None
+
+    @property
+    def classifier(self):
+        if self._classifier is None:
+            import torch
+            from transformers import AutoModelForSequenceClassification, AutoTokenizer, pipeline
+
+            if self.num_threads:
+                torch.set_num_threads(self.num_threads)
+            options = {'revision': self.revision, 'local_files_only': self.local_files_only}
+            tokenizer = AutoTokenizer.from_pretrained(self.model, **options)
+            model = AutoModelForSequenceClassification.from_pretrained(self.model, **options)
+            model.eval()
+            if self.quantize:
+                model = torch.ao.quantization.quantize_dynamic(
+                    model, {torch.nn.Linear}, dtype=torch.qint8)
+            self._classifier = pipeline('sentiment-analysis', model=model, tokenizer=tokenizer,
+                                        device=-1)
+        return self._classifier
+
+    @property
+    def model_id(self):
+        """Identifies the scoring model for caches and checkpoints."""
+        return f"{self.model}+int8" if self.quantize else self.model
+
+    def _lengths(self, texts):
+        tokenizer = getattr(self.classifier, 'tokenizer', None)
+        if tokenizer is None:
+            return [len(t) for t in texts]
+        encoded = tokenizer(texts, add_special_tokens=False, truncation=True,
+                            max_length=self.max_length)
+        return [len(ids) for ids in encoded['input_ids']]
+
+    def _run_model(self, texts):
+        """Score `texts` in length-sorted batches; returns (labels, scores) in order."""
+        if not texts:
+            return [], []  # e.g. everything was cached: don't load the model
+        order = sorted(range(len(texts)), key=self._lengths(texts).__getitem__)
+        labels = [None] * len(texts)
+        scores = [None] * len(texts)
+        for i in range(0, len(order), self.batch_size):
+            idx = order[i:i + self.batch_size]
+            results = self.classifier([texts[j] for j in idx], truncation=True,
+                                      max_length=self.max_length, batch_size=self.batch_size)
+            for j, r in zip(idx, results):
+                labels[j] = r['label']
+                scores[j] = r['score']
+        return labels, scores
+
+    def score(self, texts):
+        """Return (labels, scores) for `texts`, in input order.
+
+        With a cache, only texts it has not seen (once per distinct key) go
+        to the model; `cache_hits` reports how many rows were served from it.
+        """
+        texts = [str(t) for t in texts]
+        start = time.perf_counter()
+
+        if self.cache is None:
+            labels, scores = self._run_model(texts)
+            self.cache_hits = 0
+        else:
+            keys = [self.cache.key(t) for t in texts]
+            known = self.cache.get_many(keys)
+            misses = {}
+            for i, k in enumerate(keys):
+                if k not in known:
+                    misses.setdefault(k, i)
+
+            new_labels, new_scores = self._run_model([texts[i] for i in misses.values()])
+            fresh = {k: (label, score) for k, label, score in zip(misses, new_labels, new_scores)}
+            self.cache.put_many((k, label, score) for k, (label, score) in fresh.items())
+
+            known.update(fresh)
+            labels = [known[k][0] for k in keys]
+            scores = [known[k][1] for k in keys]
+            self.cache_hits = len(texts) - len(misses)
+
+        elapsed = time.perf_counter() - start
+        self.last_throughput = len(texts) / elapsed if elapsed > 0 else float('inf')
+        return labels, scores
+
+    def annotate(self, df, text_column='review', dedup=True):
+        """Add sentiment_label / sentiment_score columns to a copy of `df`.
+
+        With `dedup`, rows whose text normalizes to the same string are
+        scored once and the result is copied to every such row.
+        """
+        if dedup:
+            self.collapsed = CollapsedTexts(df[text_column])
+            labels, scores = self.score(self.collapsed.unique)
+            labels, scores = self.collapsed.expand(labels), self.collapsed.expand(scores)
+        else:
+            self.collapsed = None
+            labels, scores = self.score(df[text_column].astype(str).tolist())
+        df = df.copy()
+        df['sentiment_label'] = labels
+        df['sentiment_score'] = scores
+        return df
+
+
+def run_sentiment_analysis(input_path=None, output_path=None, engine=None):
+    input_path = input_path or stage_path('cleaned_reviews')
+    output_path = output_path or stage_path('reviews_with_sentiment')
+    engine = engine or SentimentEngine()
+
+    # Load cleaned reviews
+    df = read_stage(input_path)
+
+    # Run sentiment analysis and save enriched data
+    df = engine.annotate(df)
+    write_stage(df, output_path)
+
+    if engine.collapsed is not None:
+        print(f"Dedup: {engine.collapsed}")
+    print(f"Scored {len(df)} reviews at {engine.last_throughput:.1f} reviews/s "
+          f"(batch_size={engine.batch_size}, cache hits={engine.cache_hits})")
+    print(f"Sentiment analysis complete. Results saved to {output_path}")
+    return df
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Score review sentiment")
+    parser.add_argument('--batch-size', type=int, default=32)
+    parser.add_argument('--threads', type=int, default=None,
+                        help="torch intra-op threads, per worker with --workers "
+                             "(default: torch's choice, or the cores split between workers)")
+    parser.add_argument('--cache', default=CACHE_PATH, help="SQLite result cache")
+    parser.add_argument('--no-cache', action='store_true', help="re-score every review")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="score shards in N processes with checkpoint/resume")
+    parser.add_argument('--shard-size', type=int, default=5000)
+    parser.add_argument('--model', default=MODEL_NAME, help="hub name or local model directory")
+    parser.add_argument('--revision', help="hub revision (branch, tag or commit) to pin")
+    parser.add_argument('--quantize', action='store_true', help="int8 dynamic quantization (CPU)")
+    parser.add_argument('--offline', action='store_true', help="never download model files")
+    args = parser.parse_args()
+
+    engine_kwargs = {'model': args.model, 'revision': args.revision, 'batch_size': args.batch_size,
+                     'quantize': args.quantize, 'local_files_only': args.offline or None}
+    if args.workers > 1:
+        from src.analyzer.sentiment_shards import run_sharded_sentiment
+
+        if args.threads:
+            engine_kwargs['num_threads'] = args.threads
+        run_sharded_sentiment(num_workers=args.workers, shard_size=args.shard_size,
+                              engine_kwargs=engine_kwargs,
+                              cache_path=None if args.no_cache else args.cache)
+    else:
+        engine = SentimentEngine(num_threads=args.threads, **engine_kwargs)
+        if not args.no_cache:
+            engine.cache = SentimentCache(args.cache, engine.model_id, engine.revision)
+        run_sentiment_analysis(engine=engine)
@@ -0,0 +1,96 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+CACHE_PATH = 'data/cache/sentiment.sqlite'
+
+# SQLite caps bound parameters per statement; stay well below it
+_QUERY_CHUNK = 500
+
+
+def normalize_text(text):
+    """Case- and whitespace-insensitive form used for cache keys (the model is uncased)."""
+    return ' '.join(str(text).lower().split())
+
+
+class SentimentCache:
+    """On-disk cache of (sentiment_label, sentiment_score) per review text.
+
+    Keys are SHA-1 hashes of the normalized text plus model name and
+    revision, so switching models never serves stale scores. Entries carry a
+    last-used timestamp and the least recently used ones are evicted once
+    the cache grows past `max_entries`.
+    """
+
+    def __init__(self, path=CACHE_PATH, model='', revision=None, max_entries=2_000_000):
+        self.path = path
+        self.max_entries = max_entries
+        self._prefix = f"{model}\0{revision or 'main'}\0"
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS sentiment_cache (
+                key TEXT PRIMARY KEY,
+                label TEXT NOT NULL,
+                score REAL NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_sentiment_cache_last_used ON sentiment_cache (last_used)")
+        self._conn.commit()
+        # Running row count so evict() needs no COUNT(*) per batch; it can only
+        # overestimate (a replaced key counts as new) and is rechecked before evicting
+        self._rows = len(self)
+
+    def key(self, text):
+        return hashlib.sha1((self._prefix + normalize_text(text)).encode('utf-8')).hexdigest()
+
+    def get_many(self, keys):
+        """Return {key: (label, score)} for the keys that are cached."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for i in range(0, len(keys), _QUERY_CHUNK):
+            chunk = keys[i:i + _QUERY_CHUNK]
+            marks = ','.join('?' * len(chunk))
+            rows = self._conn.execute(
+                f"SELECT key, label, score FROM sentiment_cache WHERE key IN ({marks})", chunk)
+            found.update((k, (label, score)) for k, label, score in rows)
+        if found:
+            now = int(time.time())
+            self._conn.executemany("UPDATE sentiment_cache SET last_used = ? WHERE key = ?",
+                                   ((now, k) for k in found))
+            self._conn.commit()
+        return found
+
+    def put_many(self, entries):
+        """Store an iterable of (key, label, score)."""
+        now = int(time.time())
+        cursor = self._conn.executemany(
+            "INSERT OR REPLACE INTO sentiment_cache (key, label, score, last_used) VALUES (?, ?, ?, ?)",
+            ((k, label, float(score), now) for k, label, score in entries))
+        self._conn.commit()
+        self._rows += max(cursor.rowcount, 0)
+        if self._rows > self.max_entries:
+            self.evict()
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM sentiment_cache").fetchone()[0]
+
+    def evict(self):
+        """Drop least recently used entries beyond `max_entries`."""
+        self._rows = len(self)
+        excess = self._rows - self.max_entries
+        if excess > 0:
+            self._conn.execute("""
+                DELETE FROM sentiment_cache WHERE key IN (
+                    SELECT key FROM sentiment_cache ORDER BY last_used LIMIT ?
+                )
+            """, (excess,))
+            self._conn.commit()
+            self._rows = self.max_entries
+        return max(excess, 0)
+
+    def close(self):
+        self._conn.close()
@@ -0,0 +1,103 @@
+import glob
+import hashlib
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from src.analyzer.sentiment_analysis import SentimentEngine
+from src.analyzer.sentiment_cache import SentimentCache
+from src.analyzer.text_dedup import CollapsedTexts
+from src.pipeline.columnar import read_stage, stage_path, write_stage
+
+CHECKPOINT_DIR = 'data/cache/sentiment_shards'
+
+_engine = None  # one per worker process
+
+
+def _init_worker(engine_kwargs, cache_path):
+    global _engine
+    _engine = SentimentEngine(**engine_kwargs)
+    if cache_path:
+        _engine.cache = SentimentCache(cache_path, _engine.model_id, _engine.revision)
+
+
+def _score_shard(texts, path):
+    labels, scores = _engine.score(texts)
+    shard = pd.DataFrame({'sentiment_label': labels, 'sentiment_score': scores})
+    # Write then rename, so a crash never leaves a half-written checkpoint
+    tmp_path = os.path.join(os.path.dirname(path), 'tmp-' + os.path.basename(path))
+    write_stage(shard, tmp_path)
+    os.replace(tmp_path, path)
+    return path
+
+
+def _run_fingerprint(texts, model):
+    digest = hashlib.sha1(model.encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(texts, index=False).values.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def score_sharded(texts, num_workers=None, shard_size=5000, checkpoint_dir=CHECKPOINT_DIR,
+                  engine_kwargs=None, keep_checkpoints=False, cache_path=None):
+    """Score `texts` (a Series) across worker processes with per-shard checkpoints.
+
+    Rows are split into shards of `shard_size`; each worker process builds its
+    own SentimentEngine from `engine_kwargs` and writes every finished shard
+    to `checkpoint_dir`. Checkpoints are tied to a fingerprint of the input
+    texts and model, so rerunning after a crash only scores missing shards.
+    With `cache_path` every worker also reads and fills that SentimentCache.
+    Returns (labels, scores) in input order.
+    """
+    texts = texts.astype(str).reset_index(drop=True)
+    num_workers = num_workers or os.cpu_count() or 1
+    engine_kwargs = dict(engine_kwargs or {})
+    # Split the cores between workers instead of letting each grab them all
+    engine_kwargs.setdefault('num_threads', max(1, (os.cpu_count() or 1) // num_workers))
+
+    model_id = SentimentEngine(**engine_kwargs).model_id
+    run_dir = os.path.join(checkpoint_dir, _run_fingerprint(texts, model_id))
+    os.makedirs(run_dir, exist_ok=True)
+    for stale in glob.glob(os.path.join(run_dir, 'tmp-*')):
+        os.remove(stale)
+
+    num_shards = -(-len(texts) // shard_size)
+    shard_paths = [os.path.join(run_dir, f'shard-{i:05d}.parquet') for i in range(num_shards)]
+    pending = [(i, path) for i, path in enumerate(shard_paths) if not os.path.exists(path)]
+    print(f"{len(shard_paths) - len(pending)}/{len(shard_paths)} shards already done, "
+          f"scoring {len(pending)} with {num_workers} workers...")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=num_workers, initializer=_init_worker,
+                                 initargs=(engine_kwargs, cache_path)) as pool:
+            futures = [
+                pool.submit(_score_shard,
+                            texts.iloc[i * shard_size:(i + 1) * shard_size].tolist(), path)
+                for i, path in pending
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                future.result()
+                print(f"⏳ {done}/{len(pending)} shards scored")
+
+    results = pd.concat([read_stage(path) for path in shard_paths], ignore_index=True) \
+        if shard_paths else pd.DataFrame(columns=['sentiment_label', 'sentiment_score'])
+    if not keep_checkpoints:
+        shutil.rmtree(run_dir, ignore_errors=True)
+    return results['sentiment_label'].astype(str).tolist(), results['sentiment_score'].tolist()
+
+
+def run_sharded_sentiment(input_path=None, output_path=None, **kwargs):
+    input_path = input_path or stage_path('cleaned_reviews')
+    output_path = output_path or stage_path('reviews_with_sentiment')
+
+    df = read_stage(input_path)
+    collapsed = CollapsedTexts(df['review'])
+    print(f"Dedup: {collapsed}")
+    labels, scores = score_sharded(pd.Series(collapsed.unique, dtype=object), **kwargs)
+    df['sentiment_label'] = collapsed.expand(labels)
+    df['sentiment_score'] = collapsed.expand(scores)
+    write_stage(df, output_path)
+
+    print(f"Sentiment analysis complete. Results saved to {output_path}")
+    return df
@@ -0,0 +1,62 @@
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+# Zero-width joiner, variation selectors and skin-tone modifiers don't change meaning
+_EMOJI_MODIFIERS = {'\u200d', '\ufe0e', '\ufe0f'} | {chr(c) for c in range(0x1F3FB, 0x1F400)}
+
+
+def normalize_review(text):
+    """Dedup key for a review: case, whitespace, punctuation and emoji folded.
+
+    "Nice app!!", "nice   app" and "NICE APP." all map to "nice app";
+    "👍👍👍" and "👍🏽" both map to "👍".
+    """
+    text = unicodedata.normalize('NFKC', str(text)).casefold()
+    out = []
+    last_symbol = None
+    for ch in text:
+        if ch in _EMOJI_MODIFIERS or unicodedata.category(ch).startswith('P'):
+            continue
+        if unicodedata.category(ch) == 'So':
+            if ch == last_symbol:
+                continue  # fold repeated emoji
+            last_symbol = ch
+        elif not ch.isspace():
+            last_symbol = None
+        out.append(ch)
+    return ' '.join(''.join(out).split())
+
+
+class CollapsedTexts:
+    """Distinct reviews of a column plus the index array that maps them back.
+
+    `unique` holds the first original text of every normalized group (that
+    is what the models see); `inverse[i]` is the group of row i, so results
+    computed on `unique` are spread back to all rows with `expand`.
+    """
+
+    def __init__(self, texts):
+        texts = pd.Series(texts, dtype=object).astype(str).reset_index(drop=True)
+        # Exact duplicates are dropped before the per-character normalization
+        raw_codes, raw_unique = pd.factorize(texts)
+        keys = [normalize_review(t) for t in raw_unique]
+        key_codes, _ = pd.factorize(pd.Series(keys, dtype=object))
+
+        self.inverse = key_codes[raw_codes]
+        first_raw = pd.Series(np.arange(len(raw_unique))).groupby(key_codes).first().to_numpy()
+        self.unique = [raw_unique[i] for i in first_raw]
+        self.total = len(texts)
+
+    @property
+    def ratio(self):
+        """Share of rows that need no model call (0 = nothing collapsed)."""
+        return 1 - len(self.unique) / self.total if self.total else 0.0
+
+    def expand(self, values):
+        """Map one result per unique text back to one result per row."""
+        return np.asarray(values, dtype=object)[self.inverse].tolist()
+
+    def __repr__(self):
+        return f"{self.total} rows → {len(self.unique)} unique ({self.ratio:.1%} collapsed)"
@@ -1,66 +1,129 @@
-import pandas as pd
+import argparse
+import os
 import spacy
 from sklearn.feature_extraction.text import TfidfVectorizer
-import re
-import os
+
+from src.analyzer.keyword_models import (
+    HASHING_STATE_PATH, VOCAB_PATH, FittedKeywordExtractor, StreamingKeywordExtractor,
+    top_keywords_sparse)
+from src.analyzer.text_dedup import CollapsedTexts
+from src.analyzer.theme_matcher import THEMES_PATH, ThemeMatcher
+from src.pipeline.columnar import read_stage, review_keys, stage_path, write_stage
+
+SPACY_MODEL = 'en_core_web_sm'
+
+# Only lemma_, is_stop and is_alpha are read, so the parser and NER never need to run
+DISABLED_COMPONENTS = ['parser', 'ner']
 
 # Load spaCy English model
-try:
-    nlp = spacy.load('en_core_web_sm')
-except OSError:
-    import subprocess
-    subprocess.run(['python', '-m', 'spacy', 'download', 'en_core_web_sm'])
-    nlp = spacy.load('en_core_web_sm')
-
-# Theme keyword mapping
-theme_keywords = {
-    'Account Access Issues': ['login', 'password', 'access', 'authentication', 'error'],
-    'Transaction Performance': ['transfer', 'transaction', 'delay', 'slow', 'fast', 'processing'],
-    'User Interface & Experience': ['ui', 'design', 'navigation', 'easy', 'difficult', 'layout'],
-    'Customer Support': ['support', 'help', 'service', 'response', 'contact'],
-    'Feature Requests': ['feature', 'add', 'request', 'missing', 'new', 'update']
-}
-
-# Preprocessing function
-def preprocess(text):
-    doc = nlp(str(text).lower())
-    tokens = [token.lemma_ for token in doc if not token.is_stop and token.is_alpha]
-    return ' '.join(tokens)
-
-# Load sentiment-enriched reviews
-input_path = 'data/processed/reviews_with_sentiment.csv'
-df = pd.read_csv(input_path)
-
-# Preprocess review text
-df['processed_review'] = df['review'].apply(preprocess)
-
-# Extract keywords using TF-IDF
-vectorizer = TfidfVectorizer(ngram_range=(1,2), max_features=1000)
-X = vectorizer.fit_transform(df['processed_review'])
-feature_names = vectorizer.get_feature_names_out()
+def load_nlp(model=SPACY_MODEL):
+    try:
+        return spacy.load(model, disable=DISABLED_COMPONENTS)
+    except OSError:
+        import subprocess
+        subprocess.run(['python', '-m', 'spacy', 'download', model])
+        return spacy.load(model, disable=DISABLED_COMPONENTS)
+
+# Preprocessing
+def iter_preprocessed(texts, nlp=None, batch_size=1000, n_process=1):
+    """Yield the lemmatized, stop-word-free text of each review, in order.
+
+    Reviews are streamed through `nlp.pipe` in batches of `batch_size`
+    across `n_process` worker processes.
+    """
+    nlp = nlp or load_nlp()
+    docs = nlp.pipe((str(text).lower() for text in texts),
+                    batch_size=batch_size, n_process=n_process)
+    for doc in docs:
+        yield ' '.join(token.lemma_ for token in doc if not token.is_stop and token.is_alpha)
+
+def preprocess(text, nlp=None):
+    return next(iter_preprocessed([text], nlp))
 
 # Get top keywords for each review
-def get_top_keywords(row_idx, top_n=3):
-    row = X[row_idx].toarray().flatten()
-    top_indices = row.argsort()[-top_n:][::-1]
-    return [feature_names[i] for i in top_indices if row[i] > 0]
-
-df['keywords'] = [get_top_keywords(i) for i in range(len(df))]
-
-# Assign themes based on keywords
-def assign_themes(keywords):
-    themes = set()
-    for theme, kw_list in theme_keywords.items():
-        for kw in kw_list:
-            if any(re.search(rf'\b{re.escape(kw)}\b', k) for k in keywords):
-                themes.add(theme)
-    return ', '.join(themes) if themes else 'Other'
-
-df['identified_theme(s)'] = df['keywords'].apply(assign_themes)
-
-# Save results
-output_path = 'data/processed/reviews_with_themes.csv'
-os.makedirs(os.path.dirname(output_path), exist_ok=True)
-df.to_csv(output_path, index=False)
-
-print(f"Thematic analysis complete. Results saved to {output_path}") 
\ No newline at end of file
+def extract_keywords(processed_reviews, top_n=3):
+    """Fit TF-IDF on the corpus and return each review's top keywords."""
+    vectorizer = TfidfVectorizer(ngram_range=(1,2), max_features=1000)
+    X = vectorizer.fit_transform(processed_reviews)
+    return top_keywords_sparse(X, vectorizer.get_feature_names_out(), top_n)
+
+def extract_keywords_incremental(processed_reviews, mode, state_path=None, chunk_size=50_000,
+                                 keys=None):
+    """Keywords from a persisted model instead of a per-run refit.
+
+    'fit-once' loads the saved vocabulary and IDF (fitting and saving it on
+    the first run) and only transforms. 'hashing' continues the document
+    frequencies saved at `state_path`, counting only reviews whose `keys`
+    (review IDs) it has not counted before, so rerunning on the full stage
+    file leaves the IDF as it was. Without `keys` new reviews can't be told
+    apart, so the state is rebuilt from this input. Chunks are scored as
+    they are counted and the updated state is saved afterwards.
+    """
+    if mode == 'fit-once':
+        state_path = state_path or VOCAB_PATH
+        if os.path.exists(state_path):
+            extractor = FittedKeywordExtractor.load(state_path)
+        else:
+            extractor = FittedKeywordExtractor.fit(processed_reviews)
+            extractor.save(state_path)
+        return extractor.keywords(processed_reviews, chunk_size=chunk_size)
+
+    if mode == 'hashing':
+        state_path = state_path or HASHING_STATE_PATH
+        resume = keys is not None and os.path.exists(state_path)
+        extractor = StreamingKeywordExtractor.load(state_path) if resume \
+            else StreamingKeywordExtractor()
+        keywords = extractor.keywords(processed_reviews, chunk_size=chunk_size, keys=keys)
+        extractor.save(state_path)
+        return keywords
+
+    raise ValueError(f"Unknown keyword mode: {mode}")
+
+def run_thematic_analysis(input_path=None, output_path=None, nlp=None,
+                          batch_size=1000, n_process=1, themes_path=THEMES_PATH,
+                          keyword_mode='refit', keyword_state=None):
+    input_path = input_path or stage_path('reviews_with_sentiment')
+    output_path = output_path or stage_path('reviews_with_themes')
+    matcher = ThemeMatcher.from_yaml(themes_path)
+
+    # Load sentiment-enriched reviews
+    df = read_stage(input_path)
+
+    # Preprocess review text, once per distinct normalized review
+    collapsed = CollapsedTexts(df['review'])
+    print(f"Dedup: {collapsed}")
+    processed = list(iter_preprocessed(collapsed.unique, nlp, batch_size, n_process))
+    df['processed_review'] = collapsed.expand(processed)
+
+    # Extract keywords using TF-IDF
+    if keyword_mode == 'refit':
+        df['keywords'] = extract_keywords(df['processed_review'])
+    else:
+        # Same keys as the chunked pipeline; rows without a review_id get a content hash
+        keys = review_keys(df).tolist()
+        df['keywords'] = extract_keywords_incremental(df['processed_review'], keyword_mode,
+                                                      keyword_state, keys=keys)
+
+    # Assign themes based on keywords
+    df['identified_theme(s)'] = matcher.assign_many(df['keywords'])
+
+    # Save results
+    write_stage(df, output_path)
+
+    print(f"Thematic analysis complete. Results saved to {output_path}")
+    return df
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Extract keywords and themes")
+    parser.add_argument('--batch-size', type=int, default=1000, help="docs per nlp.pipe batch")
+    parser.add_argument('--n-process', type=int, default=1, help="spaCy worker processes")
+    parser.add_argument('--themes', default=THEMES_PATH, help="theme → keywords YAML")
+    parser.add_argument('--keyword-mode', choices=['refit', 'fit-once', 'hashing'], default='refit',
+                        help="refit TF-IDF every run, reuse a saved vocabulary, or stream with hashing")
+    parser.add_argument('--keyword-state', default=None,
+                        help="saved vocabulary / hashing state (default under data/cache/)")
+    args = parser.parse_args()
+
+    run_thematic_analysis(batch_size=args.batch_size, n_process=args.n_process,
+                          themes_path=args.themes, keyword_mode=args.keyword_mode,
+                          keyword_state=args.keyword_state)
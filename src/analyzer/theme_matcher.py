@@ -0,0 +1,59 @@
+import yaml
+
+THEMES_PATH = 'data/processed/themes_mapping.yml'
+NO_THEME = 'Other'
+
+
+class ThemeMatcher:
+    """Assign themes to keyword lists through a precompiled phrase index.
+
+    Every theme keyword (single word or multi-word phrase) is compiled once
+    into a dict of phrase → theme ids. A review's extracted keywords are
+    split into their word n-grams (up to the longest theme phrase) and looked
+    up directly, so per-row cost does not grow with the number of themes or
+    theme keywords. Matching is whole-word, like the old `\\bkw\\b` regex.
+    """
+
+    def __init__(self, themes):
+        self.themes = list(themes)
+        self._index = {}
+        for theme_id, keywords in enumerate(themes.values()):
+            for kw in keywords or []:
+                phrase = tuple(str(kw).lower().split())
+                if phrase:
+                    self._index.setdefault(phrase, set()).add(theme_id)
+        self._max_len = max((len(p) for p in self._index), default=0)
+
+    @classmethod
+    def from_yaml(cls, path=THEMES_PATH):
+        with open(path, 'r', encoding='utf-8') as f:
+            themes = yaml.safe_load(f) or {}
+        if not themes:
+            raise ValueError(f"No themes defined in {path}")
+        return cls(themes)
+
+    def match(self, keywords):
+        """Theme ids hit by one review's keyword list."""
+        hits = set()
+        for keyword in keywords:
+            words = str(keyword).lower().split()
+            for n in range(1, min(self._max_len, len(words)) + 1):
+                for i in range(len(words) - n + 1):
+                    hits.update(self._index.get(tuple(words[i:i + n]), ()))
+        return hits
+
+    def assign(self, keywords):
+        """Comma-joined theme names in declaration order, or 'Other'."""
+        hits = self.match(keywords)
+        return ', '.join(self.themes[i] for i in sorted(hits)) if hits else NO_THEME
+
+    def assign_many(self, keyword_lists):
+        """Batch version of assign(); identical keyword lists are matched once."""
+        memo = {}
+        out = []
+        for keywords in keyword_lists:
+            key = tuple(keywords)
+            if key not in memo:
+                memo[key] = self.assign(keywords)
+            out.append(memo[key])
+        return out
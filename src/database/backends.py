@@ -0,0 +1,255 @@
+import sqlite3
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+# Column order shared by every backend's review upsert
+REVIEW_COLUMNS = [
+    'review_id', 'bank_id', 'review_text', 'rating', 'review_date',
+    'sentiment_label', 'sentiment_score', 'identified_themes', 'source'
+]
+
+
+THEMES_INDEX = REVIEW_COLUMNS.index('identified_themes')
+
+
+def split_themes(value):
+    """'Account Access Issues, Customer Support' → ['Account Access Issues', 'Customer Support']."""
+    if not isinstance(value, str):
+        return []
+    return list(dict.fromkeys(t.strip() for t in value.split(',') if t.strip()))
+
+
+def theme_rows(chunk):
+    """Distinct (review_id, theme) pairs of the review_themes bridge table for `chunk`."""
+    return list(dict.fromkeys(
+        (row[0], theme) for row in chunk for theme in split_themes(row[THEMES_INDEX])))
+
+
+def _chunks(rows, chunk_size):
+    for start in range(0, len(rows), chunk_size):
+        yield rows[start:start + chunk_size]
+
+
+class StorageBackend(ABC):
+    """Where cleaned, enriched reviews are stored.
+
+    Implementations upsert banks by name and reviews by their stable
+    `review_id`, so loading the same data twice leaves the tables unchanged
+    and a refresh only needs to send new or changed reviews.
+    """
+
+    @abstractmethod
+    def ensure_schema(self):
+        """Create the tables and indexes that don't exist yet."""
+
+    @abstractmethod
+    def upsert_banks(self, banks):
+        """Insert missing banks; return {key: bank_id} for `banks` ({key: {name, package}})."""
+
+    @abstractmethod
+    def upsert_reviews(self, rows, chunk_size=5000):
+        """Insert or update review tuples in REVIEW_COLUMNS order; return the row count.
+
+        Each chunk's rows in review_themes are replaced along with it.
+        """
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SQLiteBackend(StorageBackend):
+    """Local SQLite store with the same tables as schema.sql."""
+
+    def __init__(self, path='data/reviews.sqlite'):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+
+    def ensure_schema(self):
+        self.connection.executescript("""
+            CREATE TABLE IF NOT EXISTS banks (
+                bank_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                bank_name TEXT NOT NULL UNIQUE,
+                app_package_id TEXT UNIQUE
+            );
+            CREATE TABLE IF NOT EXISTS reviews (
+                review_id TEXT PRIMARY KEY,
+                bank_id INTEGER REFERENCES banks(bank_id),
+                review_text TEXT,
+                rating INTEGER,
+                review_date TEXT,
+                sentiment_label TEXT,
+                sentiment_score REAL,
+                identified_themes TEXT,
+                source TEXT
+            );
+            CREATE TABLE IF NOT EXISTS review_themes (
+                review_id TEXT NOT NULL REFERENCES reviews(review_id) ON DELETE CASCADE,
+                theme TEXT NOT NULL,
+                PRIMARY KEY (review_id, theme)
+            );
+            CREATE INDEX IF NOT EXISTS idx_reviews_bank_date ON reviews (bank_id, review_date);
+            CREATE INDEX IF NOT EXISTS idx_review_themes_theme ON review_themes (theme, review_id);
+        """)
+        self.connection.commit()
+
+    def upsert_banks(self, banks):
+        self.connection.executemany(
+            "INSERT OR IGNORE INTO banks (bank_name, app_package_id) VALUES (?, ?)",
+            [(info['name'], info['package']) for info in banks.values()])
+        self.connection.commit()
+        names = [info['name'] for info in banks.values()]
+        marks = ','.join('?' * len(names))
+        ids = dict(self.connection.execute(
+            f"SELECT bank_name, bank_id FROM banks WHERE bank_name IN ({marks})", names))
+        return {key: ids[info['name']] for key, info in banks.items()}
+
+    def upsert_reviews(self, rows, chunk_size=5000):
+        updates = ', '.join(f"{c} = excluded.{c}" for c in REVIEW_COLUMNS[1:])
+        sql = (f"INSERT INTO reviews ({', '.join(REVIEW_COLUMNS)}) "
+               f"VALUES ({', '.join('?' * len(REVIEW_COLUMNS))}) "
+               f"ON CONFLICT(review_id) DO UPDATE SET {updates}")
+        for chunk in _chunks(rows, chunk_size):
+            self.connection.executemany(sql, [
+                tuple(v.isoformat() if hasattr(v, 'isoformat') else v for v in row)
+                for row in chunk
+            ])
+            self.connection.executemany("DELETE FROM review_themes WHERE review_id = ?",
+                                        [(row[0],) for row in chunk])
+            self.connection.executemany("INSERT INTO review_themes (review_id, theme) VALUES (?, ?)",
+                                        theme_rows(chunk))
+            self.connection.commit()
+        return len(rows)
+
+    def close(self):
+        self.connection.close()
+
+
+def _merge_banks(connection, banks):
+    """MERGE `banks` in one executemany, then resolve every bank_id in one SELECT."""
+    with connection.cursor() as cursor:
+        # Use MERGE to insert if not exists, avoiding duplicates
+        cursor.executemany("""
+            MERGE INTO banks b
+            USING (SELECT :1 AS bank_name, :2 AS app_package_id FROM dual) s
+            ON (b.bank_name = s.bank_name)
+            WHEN NOT MATCHED THEN
+                INSERT (bank_name, app_package_id) VALUES (s.bank_name, s.app_package_id)
+        """, [(info['name'], info['package']) for info in banks.values()])
+        connection.commit()
+
+        names = [info['name'] for info in banks.values()]
+        binds = ', '.join(f':{i + 1}' for i in range(len(names)))
+        cursor.execute(f"SELECT bank_name, bank_id FROM banks WHERE bank_name IN ({binds})", names)
+        ids = dict(cursor.fetchall())
+    return {key: ids[info['name']] for key, info in banks.items()}
+
+
+def _replace_themes(cursor, chunk):
+    cursor.executemany("DELETE FROM review_themes WHERE review_id = :1", [(row[0],) for row in chunk])
+    pairs = theme_rows(chunk)
+    if pairs:
+        cursor.executemany("INSERT INTO review_themes (review_id, theme) VALUES (:1, :2)", pairs)
+
+
+def _review_merge_sql():
+    source = ', '.join(f':{i + 1} AS {c}' for i, c in enumerate(REVIEW_COLUMNS))
+    updates = ', '.join(f"r.{c} = s.{c}" for c in REVIEW_COLUMNS[1:])
+    return f"""
+        MERGE INTO reviews r
+        USING (SELECT {source} FROM dual) s
+        ON (r.review_id = s.review_id)
+        WHEN MATCHED THEN UPDATE SET {updates}
+        WHEN NOT MATCHED THEN
+            INSERT ({', '.join(REVIEW_COLUMNS)})
+            VALUES ({', '.join('s.' + c for c in REVIEW_COLUMNS)})
+    """
+
+
+class OracleBackend(StorageBackend):
+    """Oracle store; tables are created by src/database/schema.sql."""
+
+    def __init__(self, user, password, dsn):
+        import oracledb
+
+        self.connection = oracledb.connect(user=user, password=password, dsn=dsn)
+
+    def ensure_schema(self):
+        pass  # managed by schema.sql
+
+    def upsert_banks(self, banks):
+        return _merge_banks(self.connection, banks)
+
+    def upsert_reviews(self, rows, chunk_size=5000):
+        sql = _review_merge_sql()
+        with self.connection.cursor() as cursor:
+            for chunk in _chunks(rows, chunk_size):
+                cursor.executemany(sql, chunk)
+                _replace_themes(cursor, chunk)
+                self.connection.commit()
+        return len(rows)
+
+    def close(self):
+        self.connection.close()
+
+
+# Longest review_text (in bytes) bound as VARCHAR2; longer chunks bind as CLOB
+MAX_VARCHAR_BIND = 4000
+
+
+class OraclePoolBackend(StorageBackend):
+    """Oracle store that loads review chunks concurrently over a connection pool.
+
+    Each worker thread takes a pooled connection and upserts one chunk per
+    `executemany`. Bind types and sizes are declared before every chunk:
+    review_text is bound as VARCHAR2 sized to the chunk's longest review, or
+    as a CLOB if that exceeds MAX_VARCHAR_BIND, so the driver never has to
+    re-bind mid-batch when a longer review turns up.
+    """
+
+    def __init__(self, user=None, password=None, dsn=None, workers=4, pool=None):
+        import oracledb
+
+        self._oracledb = oracledb
+        self.workers = workers
+        self.pool = pool or oracledb.create_pool(user=user, password=password, dsn=dsn,
+                                                 min=1, max=workers, increment=1)
+
+    def ensure_schema(self):
+        pass  # managed by schema.sql
+
+    def upsert_banks(self, banks):
+        with self.pool.acquire() as connection:
+            return _merge_banks(connection, banks)
+
+    def _input_sizes(self, chunk):
+        db = self._oracledb
+        text_bytes = max((len(r[2].encode('utf-8')) for r in chunk if r[2] is not None), default=1)
+        text_type = text_bytes if text_bytes <= MAX_VARCHAR_BIND else db.DB_TYPE_CLOB
+        # Same order as REVIEW_COLUMNS
+        return [255, db.DB_TYPE_NUMBER, text_type, db.DB_TYPE_NUMBER, db.DB_TYPE_DATE,
+                20, db.DB_TYPE_BINARY_DOUBLE, 4000, 50]
+
+    def _load_chunk(self, sql, chunk):
+        with self.pool.acquire() as connection:
+            with connection.cursor() as cursor:
+                cursor.setinputsizes(*self._input_sizes(chunk))
+                cursor.executemany(sql, chunk)
+            with connection.cursor() as cursor:
+                _replace_themes(cursor, chunk)
+            connection.commit()
+        return len(chunk)
+
+    def upsert_reviews(self, rows, chunk_size=5000):
+        sql = _review_merge_sql()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            return sum(executor.map(lambda chunk: self._load_chunk(sql, chunk),
+                                    _chunks(rows, chunk_size)))
+
+    def close(self):
+        self.pool.close()
@@ -1,6 +1,11 @@
+import argparse
 import pandas as pd
 import oracledb
 import os
+import time
+
+from src.database.backends import REVIEW_COLUMNS, OracleBackend, OraclePoolBackend, SQLiteBackend
+from src.pipeline.columnar import read_stage, review_keys, stage_columns, stage_path
 
 # --- Database Credentials (Replace with your actual credentials) ---
 # It's recommended to use environment variables for sensitive data
@@ -9,8 +14,12 @@ DB_PASSWORD = os.environ.get("ORACLE_PASSWORD", "Oracle123!")
 # For Oracle XE, the connect string is often 'localhost:1521/XEPDB1'
 DB_DSN = os.environ.get("ORACLE_DSN", "localhost:1521/XEPDB1")
 
+SQLITE_PATH = 'data/reviews.sqlite'
+
 # --- Data and Configuration ---
-CSV_PATH = 'data/processed/reviews_with_themes.csv'
+CSV_PATH = stage_path('reviews_with_themes')
+LOAD_COLUMNS = ['review', 'rating', 'date', 'bank', 'sentiment_label',
+                'sentiment_score', 'identified_theme(s)', 'source']
 # This should match the app names and packages from my scraper
 BANK_MAPPING = {
     "cbe": {"name": "Commercial Bank of Ethiopia", "package": "com.combanketh"},
@@ -18,72 +27,61 @@ BANK_MAPPING = {
     "dashen": {"name": "Dashen Bank", "package": "com.tekln.dashentab"}
 }
 
-def load_data_to_oracle():
-    """Connects to Oracle, populates banks, and inserts review data."""
+def prepare_reviews(df, bank_ids):
+    """Turn a reviews_with_themes frame into tuples in REVIEW_COLUMNS order.
+
+    A review_id that occurs more than once (e.g. a review scraped twice)
+    keeps only its last row, as a later upsert would.
+    """
+    df = df.copy()
+    df['review_id'] = review_keys(df)
+    df = df.drop_duplicates('review_id', keep='last')
+    df['review_date'] = pd.to_datetime(df['date']).dt.date
+    # Map bank codes (CBE, BOA, Dashen) to their integer IDs
+    df['bank_id'] = df['bank'].astype(str).str.lower().map(bank_ids)
+    df = df.rename(columns={'review': 'review_text', 'identified_theme(s)': 'identified_themes'})
+
+    # --- FIX: Convert pandas NaN to None for Oracle ---
+    # Oracle driver cannot handle pandas.NA or numpy.nan for number columns.
+    rows = df[REVIEW_COLUMNS].astype(object)
+    rows = rows.where(rows.notna(), None)
+    return list(rows.itertuples(index=False, name=None))
+
+def load_reviews(backend, path=CSV_PATH, chunk_size=5000):
+    """Idempotently upsert banks and reviews from a stage output into `backend`."""
+    backend.ensure_schema()
+
+    # 1. Populate the 'banks' table
+    print("Populating 'banks' table...")
+    bank_ids = backend.upsert_banks(BANK_MAPPING)
+    print(f"Bank IDs fetched: {bank_ids}")
+
+    # 2. Prepare and upsert data into the 'reviews' table
+    print("Loading review data...")
+    columns = LOAD_COLUMNS + (['review_id'] if 'review_id' in stage_columns(path) else [])
+    rows = prepare_reviews(read_stage(path, columns=columns), bank_ids)
+
+    print(f"Upserting {len(rows)} reviews into 'reviews' table...")
+    start = time.perf_counter()
+    count = backend.upsert_reviews(rows, chunk_size)
+    elapsed = time.perf_counter() - start
+    print(f"Successfully upserted {count} reviews in {elapsed:.2f}s "
+          f"({count / max(elapsed, 1e-9):,.0f} rows/s).")
+    return count
+
+def load_data_to_oracle(chunk_size=5000, workers=1):
+    """Connects to Oracle, populates banks, and upserts review data.
+
+    With workers > 1 the chunks are loaded concurrently over a connection pool.
+    """
     try:
-        with oracledb.connect(user=DB_USER, password=DB_PASSWORD, dsn=DB_DSN) as connection:
-            with connection.cursor() as cursor:
-                print("Successfully connected to Oracle Database")
-
-                # 1. Populate the 'banks' table
-                print("Populating 'banks' table...")
-                bank_ids = {}
-                for key, info in BANK_MAPPING.items():
-                    # Use MERGE to insert if not exists, avoiding duplicates
-                    merge_sql = """
-                        MERGE INTO banks b
-                        USING (SELECT :name AS bank_name, :pkg AS app_package_id FROM dual) s
-                        ON (b.bank_name = s.bank_name)
-                        WHEN NOT MATCHED THEN
-                            INSERT (bank_name, app_package_id) VALUES (s.bank_name, s.app_package_id)
-                    """
-                    cursor.execute(merge_sql, name=info['name'], pkg=info['package'])
-                    
-                    # Fetch the bank_id
-                    cursor.execute("SELECT bank_id FROM banks WHERE bank_name = :name", name=info['name'])
-                    bank_ids[key] = cursor.fetchone()[0]
-                
-                print(f"Bank IDs fetched: {bank_ids}")
-                connection.commit()
-
-                # 2. Prepare and insert data into the 'reviews' table
-                print("Loading review data from CSV...")
-                df = pd.read_csv(CSV_PATH)
-                df['review_date'] = pd.to_datetime(df['date']).dt.date
-                # Map bank names (cbe, boa, dashen) to their new integer IDs
-                df['bank_id'] = df['bank'].map(bank_ids)
-                
-                # Generate unique review IDs
-                df['review_id'] = range(1, len(df) + 1)
-
-                # --- FIX: Convert pandas NaN to None for Oracle ---
-                # Oracle driver cannot handle pandas.NA or numpy.nan for number columns.
-                numeric_cols = ['bank_id', 'rating', 'sentiment_score']
-                for col in numeric_cols:
-                    # Using .astype(object) allows for `None` to be placed in the series.
-                    df[col] = df[col].astype(object).where(df[col].notna(), None)
-
-                # Prepare data for insertion
-                # Ensure columns match the 'reviews' table structure
-                reviews_to_insert = df[[
-                    'review_id', 'bank_id', 'review', 'rating', 'review_date', 
-                    'sentiment_label', 'sentiment_score', 'identified_theme(s)', 'source'
-                ]].copy()
-                # Rename columns to match table definition
-                reviews_to_insert.rename(columns={'review': 'review_text'}, inplace=True)
-                
-                # Convert DataFrame to list of tuples for executemany
-                data_tuples = [tuple(x) for x in reviews_to_insert.to_numpy()]
-
-                print(f"Inserting {len(data_tuples)} reviews into 'reviews' table...")
-                cursor.executemany("""
-                    INSERT INTO reviews (review_id, bank_id, review_text, rating, review_date, 
-                                         sentiment_label, sentiment_score, identified_themes, source)
-                    VALUES (:1, :2, :3, :4, :5, :6, :7, :8, :9)
-                """, data_tuples)
-                
-                connection.commit()
-                print(f"Successfully inserted {cursor.rowcount} reviews.")
+        if workers > 1:
+            backend = OraclePoolBackend(DB_USER, DB_PASSWORD, DB_DSN, workers=workers)
+        else:
+            backend = OracleBackend(DB_USER, DB_PASSWORD, DB_DSN)
+        with backend:
+            print("Successfully connected to Oracle Database")
+            load_reviews(backend, chunk_size=chunk_size)
 
     except oracledb.Error as e:
         print(f"Oracle Database error: {e}")
@@ -93,4 +91,16 @@ def load_data_to_oracle():
         print(f"An unexpected error occurred: {e}")
 
 if __name__ == "__main__":
-    load_data_to_oracle() 
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Load enriched reviews into a database")
+    parser.add_argument("--backend", choices=["oracle", "sqlite"], default="oracle")
+    parser.add_argument("--sqlite-path", default=SQLITE_PATH)
+    parser.add_argument("--chunk-size", type=int, default=5000, help="rows per executemany batch")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Oracle only: load chunks concurrently over a pool of this many connections")
+    args = parser.parse_args()
+
+    if args.backend == "sqlite":
+        with SQLiteBackend(args.sqlite_path) as backend:
+            load_reviews(backend, chunk_size=args.chunk_size)
+    else:
+        load_data_to_oracle(args.chunk_size, args.workers)
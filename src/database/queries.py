@@ -0,0 +1,89 @@
+import pandas as pd
+
+# The insights aggregations, computed by the database instead of pandas.
+# Queries only use SQL shared by Oracle and SQLite (named binds, window
+# functions), except for the month expression below.
+
+MONTH_EXPR = {
+    'oracle': "TO_CHAR(r.review_date, 'YYYY-MM')",
+    'sqlite': "strftime('%Y-%m', r.review_date)",
+}
+
+
+def _frame(connection, sql, params=None):
+    cursor = connection.cursor()
+    try:
+        cursor.execute(sql, params or {})
+        # Oracle reports column names in upper case
+        columns = [d[0].lower() for d in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+    finally:
+        cursor.close()
+
+
+def average_ratings(connection):
+    """Per bank: review count, average rating and average sentiment score."""
+    return _frame(connection, """
+        SELECT b.bank_name,
+               COUNT(*) AS review_count,
+               AVG(r.rating) AS avg_rating,
+               AVG(r.sentiment_score) AS avg_sentiment_score
+        FROM reviews r
+        JOIN banks b ON b.bank_id = r.bank_id
+        GROUP BY b.bank_name
+        ORDER BY b.bank_name
+    """)
+
+
+def sentiment_mix(connection):
+    """Per bank and sentiment label: review count and share of the bank's reviews (%)."""
+    return _frame(connection, """
+        SELECT b.bank_name,
+               r.sentiment_label,
+               COUNT(*) AS review_count,
+               100.0 * COUNT(*) / SUM(COUNT(*)) OVER (PARTITION BY b.bank_name) AS pct
+        FROM reviews r
+        JOIN banks b ON b.bank_id = r.bank_id
+        GROUP BY b.bank_name, r.sentiment_label
+        ORDER BY b.bank_name, r.sentiment_label
+    """)
+
+
+def top_themes(connection, limit=3):
+    """The `limit` most frequent themes per bank, from the review_themes table.
+
+    Unlike generate_insights.py, which ranks whole comma-joined theme
+    strings, each theme of a multi-theme review is counted separately.
+    """
+    return _frame(connection, """
+        SELECT bank_name, theme, review_count
+        FROM (
+            SELECT b.bank_name,
+                   t.theme,
+                   COUNT(*) AS review_count,
+                   ROW_NUMBER() OVER (PARTITION BY b.bank_name
+                                      ORDER BY COUNT(*) DESC, t.theme) AS theme_rank
+            FROM review_themes t
+            JOIN reviews r ON r.review_id = t.review_id
+            JOIN banks b ON b.bank_id = r.bank_id
+            GROUP BY b.bank_name, t.theme
+        ) ranked
+        WHERE theme_rank <= :top_n
+        ORDER BY bank_name, theme_rank
+    """, {'top_n': limit})
+
+
+def monthly_theme_counts(connection, dialect='sqlite'):
+    """Reviews per theme per bank per month ('YYYY-MM')."""
+    month = MONTH_EXPR[dialect]
+    return _frame(connection, f"""
+        SELECT b.bank_name,
+               {month} AS review_month,
+               t.theme,
+               COUNT(*) AS review_count
+        FROM review_themes t
+        JOIN reviews r ON r.review_id = t.review_id
+        JOIN banks b ON b.bank_id = r.bank_id
+        GROUP BY b.bank_name, {month}, t.theme
+        ORDER BY b.bank_name, review_month, t.theme
+    """)
@@ -1,4 +1,14 @@
 -- Drop tables if they exist to start fresh
+BEGIN
+   EXECUTE IMMEDIATE 'DROP TABLE review_themes';
+EXCEPTION
+   WHEN OTHERS THEN
+      IF SQLCODE != -942 THEN
+         RAISE;
+      END IF;
+END;
+/
+
 BEGIN
    EXECUTE IMMEDIATE 'DROP TABLE reviews';
 EXCEPTION
@@ -42,4 +52,19 @@ CREATE TABLE reviews (
         REFERENCES banks(bank_id)
 );
 
+-- One row per (review, theme); identified_themes keeps the joined string
+CREATE TABLE review_themes (
+    review_id VARCHAR2(255) NOT NULL,
+    theme VARCHAR2(100) NOT NULL,
+    CONSTRAINT pk_review_themes PRIMARY KEY (review_id, theme),
+    CONSTRAINT fk_review
+        FOREIGN KEY (review_id)
+        REFERENCES reviews(review_id)
+        ON DELETE CASCADE
+);
+
+-- Per-bank time-range scans and per-theme lookups
+CREATE INDEX idx_reviews_bank_date ON reviews (bank_id, review_date);
+CREATE INDEX idx_review_themes_theme ON review_themes (theme, review_id);
+
 COMMIT;
@@ -0,0 +1,161 @@
+import argparse
+import os
+import resource
+import sys
+import time
+
+from src.analysis.aggregate_store import STORE_PATH, AggregateStore
+from src.analysis.heavy_hitters import SKETCH_PATH, KeywordHeavyHitters
+from src.analyzer.keyword_models import HASHING_STATE_PATH, StreamingKeywordExtractor
+from src.analyzer.text_dedup import CollapsedTexts
+from src.analyzer.theme_matcher import THEMES_PATH, ThemeMatcher
+from src.pipeline.columnar import StageWriter, iter_stage, review_keys, stage_path
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far, in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+class ChunkProcessor:
+    """Sentiment → themes → aggregate/load for one batch of cleaned reviews at a time.
+
+    Everything carried from one chunk to the next is bounded: the hashing
+    keyword state (fixed-size document frequencies), the heavy-hitter
+    sketches (capped per bank × sentiment) and the sentiment cache, while
+    the aggregate store, database and stage output live on disk. Peak
+    memory therefore depends on `chunk_size`, not on the number of reviews.
+
+    Every chunk is enriched, loaded and written in full, but only reviews
+    not counted before (by review_keys) reach the keyword statistics, the
+    sketches and the aggregate store, so rerunning over the same input
+    leaves them unchanged. The keyword state remembers 8 bytes per review
+    for that; the store keeps its own record of folded reviews.
+
+    `preprocess` maps a list of review texts to their processed text; it
+    defaults to spaCy lemmatization via thematic_analysis.iter_preprocessed.
+    """
+
+    def __init__(self, engine, matcher=None, preprocess=None, keywords=None,
+                 store=None, hitters=None, backend=None, writer=None):
+        self.engine = engine
+        self.matcher = matcher or ThemeMatcher.from_yaml(THEMES_PATH)
+        self.preprocess = preprocess or _spacy_preprocess()
+        self.keywords = keywords or StreamingKeywordExtractor()
+        self.store = store
+        self.hitters = hitters
+        self.backend = backend
+        self.writer = writer
+        self.bank_ids = None
+        self.rows = 0
+        self.chunks = 0
+
+    def process(self, df):
+        """Enrich one chunk and hand it to every sink; returns the enriched chunk."""
+        df = self.engine.annotate(df.reset_index(drop=True))
+
+        # annotate already grouped the chunk's duplicate reviews
+        collapsed = self.engine.collapsed or CollapsedTexts(df['review'])
+        df['processed_review'] = collapsed.expand(self.preprocess(collapsed.unique))
+        # The sketches are saved together with the keyword state, so they share its record of new reviews
+        fresh = self.keywords.unseen(review_keys(df))
+        df['keywords'] = self.keywords.process_chunk(df['processed_review'].tolist(), counted=fresh)
+        df['identified_theme(s)'] = self.matcher.assign_many(df['keywords'])
+
+        if self.store is not None:
+            self.store.add(df)
+        if self.hitters is not None:
+            self.hitters.update(df[fresh])
+        if self.backend is not None:
+            self._load(df)
+        if self.writer is not None:
+            self.writer.write(df)
+
+        self.rows += len(df)
+        self.chunks += 1
+        return df
+
+    def _load(self, df):
+        from src.database.load_to_oracle import BANK_MAPPING, prepare_reviews
+
+        if self.bank_ids is None:
+            self.backend.ensure_schema()
+            self.bank_ids = self.backend.upsert_banks(BANK_MAPPING)
+        self.backend.upsert_reviews(prepare_reviews(df, self.bank_ids))
+
+    def run(self, chunks):
+        """Process every chunk of an iterable; return rows, chunks, seconds and peak RSS."""
+        start = time.perf_counter()
+        for df in chunks:
+            self.process(df)
+            print(f"  chunk {self.chunks}: {self.rows} reviews, peak RSS {peak_rss_mb():.0f} MiB")
+        return {'rows': self.rows, 'chunks': self.chunks,
+                'seconds': time.perf_counter() - start, 'peak_rss_mb': peak_rss_mb()}
+
+
+def _spacy_preprocess():
+    from src.analyzer.thematic_analysis import iter_preprocessed, load_nlp
+
+    nlp = load_nlp()
+    return lambda texts: list(iter_preprocessed(texts, nlp))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Stream reviews through sentiment, themes and aggregation in fixed-size chunks")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--input", default=stage_path('cleaned_reviews'), help="cleaned stage file")
+    source.add_argument("--ndjson", metavar="RAW_DIR", help="clean NDJSON shards on the fly instead")
+    parser.add_argument("--chunk-size", type=int, default=10000)
+    parser.add_argument("--output", default=stage_path('reviews_with_themes'),
+                        help="enriched stage output ('' to skip)")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--sketch", default=SKETCH_PATH)
+    parser.add_argument("--keyword-state", default=HASHING_STATE_PATH)
+    parser.add_argument("--sqlite", help="also upsert into this SQLite database")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="discard the store, sketch and keyword state and start from scratch")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        for path in (args.store, args.sketch, args.keyword_state):
+            if os.path.exists(path):
+                os.remove(path)
+
+    from src.analyzer.sentiment_analysis import SentimentEngine
+    from src.analyzer.sentiment_cache import SentimentCache
+    from src.database.backends import SQLiteBackend
+
+    engine = SentimentEngine()
+    engine.cache = SentimentCache(model=engine.model_id, revision=engine.revision)
+    keywords = StreamingKeywordExtractor.load(args.keyword_state) \
+        if os.path.exists(args.keyword_state) else StreamingKeywordExtractor()
+    hitters = KeywordHeavyHitters.load(args.sketch) if os.path.exists(args.sketch) \
+        else KeywordHeavyHitters()
+
+    if args.ndjson:
+        from src.preprocessor.cleaner import iter_clean_chunks
+
+        chunks = iter_clean_chunks(args.ndjson, args.chunk_size)
+    else:
+        chunks = iter_stage(args.input, args.chunk_size)
+
+    with AggregateStore(args.store) as store:
+        writer = StageWriter(args.output) if args.output else None
+        backend = SQLiteBackend(args.sqlite) if args.sqlite else None
+        try:
+            stats = ChunkProcessor(engine, keywords=keywords, store=store, hitters=hitters,
+                                   backend=backend, writer=writer).run(chunks)
+        finally:
+            if writer is not None:
+                writer.close()
+            if backend is not None:
+                backend.close()
+    keywords.save(args.keyword_state)
+    hitters.save(args.sketch)
+
+    print(f"Processed {stats['rows']} reviews in {stats['chunks']} chunks, "
+          f"{stats['seconds']:.1f}s ({stats['rows'] / max(stats['seconds'], 1e-9):,.0f} reviews/s), "
+          f"peak RSS {stats['peak_rss_mb']:.0f} MiB")
@@ -0,0 +1,191 @@
+import ast
+import hashlib
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+PROCESSED_DIR = "data/processed"
+
+# Interchange format between pipeline stages: "csv" (default) or "parquet"
+STAGE_FORMAT = os.environ.get("PIPELINE_FORMAT", "csv")
+
+CATEGORICAL_COLUMNS = ["bank", "source", "sentiment_label"]
+
+# Typed schema shared by every stage; each stage writes the subset it has
+SCHEMA = pa.schema([
+    ("review", pa.string()),
+    ("rating", pa.int8()),
+    ("date", pa.date32()),
+    ("bank", pa.dictionary(pa.int16(), pa.string())),
+    ("source", pa.dictionary(pa.int16(), pa.string())),
+    ("sentiment_label", pa.dictionary(pa.int16(), pa.string())),
+    ("sentiment_score", pa.float64()),
+    ("processed_review", pa.string()),
+    ("keywords", pa.list_(pa.string())),
+    ("identified_theme(s)", pa.string()),
+    ("review_id", pa.string()),
+])
+
+
+def stage_path(name, fmt=None):
+    """Path of a stage output, e.g. stage_path('cleaned_reviews')."""
+    fmt = fmt or STAGE_FORMAT
+    if fmt not in ("csv", "parquet"):
+        raise ValueError(f"Unknown stage format: {fmt}")
+    return os.path.join(PROCESSED_DIR, f"{name}.{fmt}")
+
+
+def parse_keywords(value):
+    """Turn a stored keywords value into a list without eval()."""
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str):
+        return []  # NaN / missing
+    if value.startswith("["):
+        try:
+            return list(ast.literal_eval(value))
+        except (ValueError, SyntaxError):
+            return []
+    return value.split(", ") if value else []
+
+
+def to_arrow(df):
+    """Convert a stage DataFrame to an Arrow table using SCHEMA types."""
+    arrays, fields = [], []
+    for name in df.columns:
+        col = df[name]
+        if name in SCHEMA.names:
+            field = SCHEMA.field(name)
+            if name == "date":
+                col = pd.to_datetime(col).dt.date
+            elif name == "keywords":
+                col = col.map(parse_keywords)
+            elif name == "rating":
+                # Ratings may arrive as floats (e.g. 5.0) after a CSV round trip
+                arrays.append(pa.array(col).cast(field.type))
+                fields.append(field)
+                continue
+            arrays.append(pa.array(col, type=field.type, from_pandas=True))
+        else:
+            field = pa.field(name, pa.array(col, from_pandas=True).type)
+            arrays.append(pa.array(col, type=field.type, from_pandas=True))
+        fields.append(field)
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def from_arrow(table):
+    """Arrow table → DataFrame with categoricals and a real list column."""
+    df = table.to_pandas(date_as_object=False)
+    if "keywords" in df.columns:
+        df["keywords"] = table.column("keywords").to_pylist()
+    return df
+
+
+def stage_columns(path):
+    """Column names of a stage output, without loading its rows."""
+    if path.endswith(".parquet"):
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_stage(path, columns=None):
+    """Read a stage output, loading only `columns` when given.
+
+    Works on both formats: categoricals for CATEGORICAL_COLUMNS and a
+    list-of-str `keywords` column either way. `date` differs: strings from
+    CSV, datetime64 from Parquet, so parse it before relying on either.
+    """
+    if path.endswith(".parquet"):
+        return from_arrow(pq.read_table(path, columns=columns))
+
+    df = pd.read_csv(path, usecols=columns)
+    for name in CATEGORICAL_COLUMNS:
+        if name in df.columns:
+            df[name] = df[name].astype("category")
+    if "keywords" in df.columns:
+        df["keywords"] = df["keywords"].map(parse_keywords)
+    return df
+
+
+def iter_stage(path, chunk_size=10000, columns=None):
+    """Yield a stage output as DataFrames of at most `chunk_size` rows.
+
+    Same dtypes as read_stage, `date` included; only one chunk is in memory
+    at a time.
+    """
+    if path.endswith(".parquet"):
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size, columns=columns):
+            yield from_arrow(pa.Table.from_batches([batch]))
+        return
+
+    for df in pd.read_csv(path, usecols=columns, chunksize=chunk_size):
+        for name in CATEGORICAL_COLUMNS:
+            if name in df.columns:
+                df[name] = df[name].astype("category")
+        if "keywords" in df.columns:
+            df["keywords"] = df["keywords"].map(parse_keywords)
+        yield df
+
+
+def review_keys(df):
+    """Stable review_id per row: the scraper's reviewId when known.
+
+    Rows without one get a SHA-1 of bank, date and text plus the row's
+    occurrence number among identical reviews, so reloading the same data
+    yields the same keys and genuine duplicates are still kept apart (the
+    occurrence number is per frame, so such keys are stable for whole stage
+    files, not for chunks of one).
+    """
+    if "review_id" in df.columns and df["review_id"].notna().all():
+        return df["review_id"].astype(str)
+    occurrence = df.groupby(["bank", "date", "review"], observed=True, sort=False).cumcount()
+    content = (df["bank"].astype(str) + "\x1f" + df["date"].astype(str) + "\x1f"
+               + df["review"].astype(str) + "\x1f" + occurrence.astype(str))
+    hashed = content.map(lambda s: hashlib.sha1(s.encode("utf-8")).hexdigest())
+    if "review_id" in df.columns:
+        return df["review_id"].where(df["review_id"].notna(), hashed).astype(str)
+    return hashed
+
+
+def write_stage(df, path):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    if path.endswith(".parquet"):
+        pq.write_table(to_arrow(df), path)
+    else:
+        df.to_csv(path, index=False)
+
+
+class StageWriter:
+    """Append DataFrame chunks to one stage output in either format."""
+
+    def __init__(self, path):
+        self.path = path
+        self.rows = 0
+        self._parquet = None
+        self._started = False
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def write(self, df):
+        if self.path.endswith(".parquet"):
+            table = to_arrow(df)
+            if self._parquet is None:
+                self._parquet = pq.ParquetWriter(self.path, table.schema)
+            self._parquet.write_table(table)
+        else:
+            df.to_csv(self.path, mode="a" if self._started else "w",
+                      header=not self._started, index=False)
+        self._started = True
+        self.rows += len(df)
+
+    def close(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._parquet = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,235 @@
+import ast
+import hashlib
+import importlib.util
+import inspect
+import json
+import os
+import textwrap
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+STATE_PATH = 'data/cache/pipeline_state.json'
+
+# Imports of this package are followed when fingerprinting a stage's code
+CODE_PACKAGE = 'src'
+
+
+class Stage:
+    """One pipeline step: a callable plus the paths it reads and writes.
+
+    `inputs` and `outputs` are files or directories; a stage depends on
+    every stage whose output contains one of its inputs. The fingerprint
+    covers the source of `run`, of the CODE_PACKAGE module defining it and
+    of every CODE_PACKAGE module they import, directly or through other
+    such modules; `code` adds modules used without being imported.
+    `params` holds any settings that change the result.
+    """
+
+    def __init__(self, name, run, inputs=(), outputs=(), code=(), params=None):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.code = list(code)
+        self.params = params or {}
+
+    def __repr__(self):
+        return f"Stage({self.name!r})"
+
+
+def _contains(output, path):
+    output, path = os.path.normpath(output), os.path.normpath(path)
+    return path == output or path.startswith(output + os.sep)
+
+
+def _hash_path(h, path):
+    if os.path.isdir(path):
+        for root, dirs, files in os.walk(path):
+            dirs.sort()
+            for name in sorted(files):
+                _hash_path(h, os.path.join(root, name))
+    elif os.path.exists(path):
+        h.update(path.encode('utf-8'))
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                h.update(block)
+    else:
+        h.update(f"missing:{path}".encode('utf-8'))
+
+
+def _module_source(module):
+    with open(importlib.util.find_spec(module).origin, 'rb') as f:
+        return f.read()
+
+
+def _imports(source, top_level=False):
+    """CODE_PACKAGE modules imported in `source`; inside functions too unless `top_level`."""
+    tree = ast.parse(source)
+    found = set()
+    for node in (tree.body if top_level else ast.walk(tree)):
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            # `from src.pkg import module` imports a submodule, not just the package
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names]
+        else:
+            continue
+        found.update(n for n in names if _in_package(n))
+    return found
+
+
+def _in_package(name):
+    return name == CODE_PACKAGE or name.startswith(CODE_PACKAGE + '.')
+
+
+def _is_module(name):
+    try:
+        return importlib.util.find_spec(name) is not None
+    except ModuleNotFoundError:  # a name imported from a module rather than a package
+        return False
+
+
+def _function_source(func):
+    try:
+        return textwrap.dedent(inspect.getsource(func))
+    except (OSError, TypeError):  # builtins, partials, interactively defined functions
+        return ''
+
+
+def code_modules(stage):
+    """Every CODE_PACKAGE module a stage's code can reach through imports, sorted."""
+    todo = set(stage.code) | _imports(_function_source(stage.run))
+    seen = set()
+    # The defining module's other functions belong to other stages; only follow its top-level imports
+    home = getattr(stage.run, '__module__', None)
+    if home and _in_package(home) and _is_module(home):
+        seen.add(home)
+        todo |= _imports(_module_source(home), top_level=True)
+    while todo:
+        module = todo.pop()
+        if module in seen or not _in_package(module) or not _is_module(module):
+            continue
+        seen.add(module)
+        todo |= _imports(_module_source(module)) - seen
+    return sorted(seen)
+
+
+class Pipeline:
+    """Runs stages in dependency order, skipping those that are up to date.
+
+    A stage's fingerprint hashes the contents of its inputs, the source of
+    its `code_modules` and its params. It is skipped when that matches the
+    fingerprint recorded after its last successful run (in `state_path`)
+    and all of its outputs exist. Stages whose dependencies are done run
+    concurrently on `max_workers` threads; when a stage fails, the stages
+    downstream of it are not run.
+    """
+
+    def __init__(self, stages, state_path=STATE_PATH):
+        self.stages = {stage.name: stage for stage in stages}
+        self.state_path = state_path
+        self._lock = threading.Lock()
+
+    def dependencies(self):
+        """{stage name: names of the stages producing its inputs}."""
+        deps = {}
+        for stage in self.stages.values():
+            deps[stage.name] = {
+                other.name for other in self.stages.values() if other is not stage
+                and any(_contains(out, path) for out in other.outputs for path in stage.inputs)
+            }
+        return deps
+
+    def fingerprint(self, stage):
+        h = hashlib.sha1()
+        for path in stage.inputs:
+            _hash_path(h, path)
+        h.update(_function_source(stage.run).encode('utf-8'))
+        for module in code_modules(stage):
+            h.update(module.encode('utf-8'))
+            h.update(_module_source(module))
+        h.update(json.dumps(stage.params, sort_keys=True, default=str).encode('utf-8'))
+        return h.hexdigest()
+
+    def _load_state(self):
+        if os.path.exists(self.state_path):
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        return {}
+
+    def _save_state(self, state):
+        os.makedirs(os.path.dirname(self.state_path) or '.', exist_ok=True)
+        tmp = self.state_path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(state, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.state_path)
+
+    def _selected(self, targets, deps):
+        """`targets` and everything upstream of them (all stages when None)."""
+        if targets is None:
+            return set(self.stages)
+        selected, todo = set(), list(targets)
+        while todo:
+            name = todo.pop()
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage: {name}")
+            if name not in selected:
+                selected.add(name)
+                todo.extend(deps[name])
+        return selected
+
+    def _execute(self, stage, state, force):
+        key = self.fingerprint(stage)
+        outputs_exist = all(os.path.exists(path) for path in stage.outputs)
+        if not force and state.get(stage.name) == key and outputs_exist:
+            return 'skipped', 0.0
+        start = time.perf_counter()
+        stage.run()
+        elapsed = time.perf_counter() - start
+        with self._lock:
+            state[stage.name] = key
+            self._save_state(state)
+        return 'ran', elapsed
+
+    def run(self, targets=None, force=False, max_workers=4, skip=()):
+        """Run the selected stages; return {name: (status, seconds)}.
+
+        Status is 'ran', 'skipped' (up to date, or listed in `skip`),
+        'failed' or 'blocked' (an upstream stage failed). `force` reruns
+        every selected stage.
+        """
+        deps = self.dependencies()
+        selected = self._selected(targets, deps)
+        state = self._load_state()
+        results = {name: ('skipped', 0.0) for name in skip if name in selected}
+        remaining = {name: deps[name] & selected for name in selected if name not in results}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while remaining or running:
+                ready = [n for n, waiting in remaining.items() if not waiting - set(results)]
+                if not ready and not running:
+                    raise ValueError(f"Dependency cycle between stages: {sorted(remaining)}")
+                for name in ready:
+                    del remaining[name]
+                    if any(results[d][0] in ('failed', 'blocked') for d in deps[name] & selected):
+                        results[name] = ('blocked', 0.0)
+                        print(f"[{name}] blocked by a failed upstream stage")
+                        continue
+                    print(f"[{name}] starting")
+                    running[executor.submit(self._execute, self.stages[name], state, force)] = name
+                if not running:
+                    continue
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                    except Exception as e:
+                        results[name] = ('failed', 0.0)
+                        print(f"[{name}] failed: {e}")
+                        continue
+                    status, seconds = results[name]
+                    print(f"[{name}] {'up to date, skipped' if status == 'skipped' else f'done in {seconds:.2f}s'}")
+        return results
@@ -0,0 +1,117 @@
+import argparse
+
+from src.pipeline.columnar import stage_path
+from src.pipeline.dag import STATE_PATH, Pipeline, Stage
+
+RAW_DIR = 'data/raw'
+THEMES_PATH = 'data/processed/themes_mapping.yml'
+REPORT_PATH = 'reports/insights_report.json'
+FIGURES_DIR = 'reports/figures'
+SQLITE_PATH = 'data/reviews.sqlite'
+
+# Stage functions import their module on call, so only the stages that run are loaded
+
+
+def scrape():
+    from src.scraper.playstore_scraper import scrape_all
+
+    scrape_all(out_dir=RAW_DIR, incremental=True)
+
+
+def clean():
+    from src.preprocessor.cleaner import clean_review_data
+
+    clean_review_data(RAW_DIR, stage_path('cleaned_reviews'))
+
+
+def sentiment():
+    from src.analyzer.sentiment_analysis import SentimentEngine, run_sentiment_analysis
+    from src.analyzer.sentiment_cache import SentimentCache
+
+    engine = SentimentEngine()
+    engine.cache = SentimentCache(model=engine.model_id, revision=engine.revision)
+    run_sentiment_analysis(stage_path('cleaned_reviews'), stage_path('reviews_with_sentiment'), engine)
+
+
+def themes():
+    from src.analyzer.thematic_analysis import run_thematic_analysis
+
+    run_thematic_analysis(stage_path('reviews_with_sentiment'), stage_path('reviews_with_themes'),
+                          themes_path=THEMES_PATH)
+
+
+def insights():
+    from src.analysis.generate_insights import main
+
+    main(stage_path('reviews_with_themes'), REPORT_PATH)
+
+
+def plots():
+    from src.visualization.create_plots import main
+
+    main(stage_path('reviews_with_themes'), FIGURES_DIR)
+
+
+def load_sqlite():
+    from src.database.backends import SQLiteBackend
+    from src.database.load_to_oracle import load_reviews
+
+    with SQLiteBackend(SQLITE_PATH) as backend:
+        load_reviews(backend, stage_path('reviews_with_themes'))
+
+
+def load_oracle():
+    from src.database.backends import OracleBackend
+    from src.database.load_to_oracle import DB_DSN, DB_PASSWORD, DB_USER, load_reviews
+
+    # Not load_data_to_oracle: it reports errors instead of raising, and a failed load must fail the stage
+    with OracleBackend(DB_USER, DB_PASSWORD, DB_DSN) as backend:
+        load_reviews(backend, stage_path('reviews_with_themes'))
+
+
+def build_pipeline(load_backend='sqlite', state_path=STATE_PATH):
+    """The review pipeline as a DAG: scrape → clean → sentiment → themes → insights/plots/load."""
+    themed = stage_path('reviews_with_themes')
+    stages = [
+        Stage('scrape', scrape, outputs=[RAW_DIR]),
+        Stage('clean', clean, inputs=[RAW_DIR], outputs=[stage_path('cleaned_reviews')]),
+        Stage('sentiment', sentiment, inputs=[stage_path('cleaned_reviews')],
+              outputs=[stage_path('reviews_with_sentiment')]),
+        Stage('themes', themes, inputs=[stage_path('reviews_with_sentiment'), THEMES_PATH],
+              outputs=[themed]),
+        Stage('insights', insights, inputs=[themed], outputs=[REPORT_PATH]),
+        Stage('plots', plots, inputs=[themed], outputs=[FIGURES_DIR]),
+    ]
+    if load_backend == 'sqlite':
+        stages.append(Stage('load', load_sqlite, inputs=[themed], outputs=[SQLITE_PATH]))
+    elif load_backend == 'oracle':
+        from src.database.load_to_oracle import DB_DSN, DB_USER
+
+        # Loading into another database must not count as up to date
+        stages.append(Stage('load', load_oracle, inputs=[themed],
+                            params={'backend': 'oracle', 'user': DB_USER, 'dsn': DB_DSN}))
+    return Pipeline(stages, state_path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the review pipeline, skipping up-to-date stages")
+    parser.add_argument("targets", nargs="*", help="stages to bring up to date (default: all)")
+    parser.add_argument("--scrape", action="store_true",
+                        help="fetch new reviews first (otherwise data/raw is used as is)")
+    parser.add_argument("--skip", nargs="*", default=[],
+                        help="stages to treat as done, e.g. when their outputs were produced elsewhere")
+    parser.add_argument("--force", action="store_true", help="rerun every selected stage")
+    parser.add_argument("--workers", type=int, default=3, help="stages run concurrently")
+    parser.add_argument("--load", choices=["sqlite", "oracle", "none"], default="sqlite",
+                        help="database the load stage writes to")
+    parser.add_argument("--state", default=STATE_PATH)
+    args = parser.parse_args()
+
+    pipeline = build_pipeline(args.load, args.state)
+    results = pipeline.run(args.targets or None, force=args.force, max_workers=args.workers,
+                           skip=args.skip + ([] if args.scrape else ['scrape']))
+    print("\nPipeline summary:")
+    for name, (status, seconds) in results.items():
+        print(f"  {name}: {status}" + (f" ({seconds:.2f}s)" if status == 'ran' else ""))
+    if any(status in ('failed', 'blocked') for status, _ in results.values()):
+        raise SystemExit(1)
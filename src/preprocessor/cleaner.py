@@ -1,12 +1,17 @@
+import argparse
 import os
 import json
 import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
+from src.pipeline.columnar import StageWriter, stage_path, write_stage
+from src.scraper.ndjson_shards import iter_shard_records
+
 # Paths
 RAW_DIR = "data/raw"
 PROCESSED_DIR = "data/processed"
-OUTPUT_CSV = os.path.join(PROCESSED_DIR, "cleaned_reviews.csv")
+OUTPUT_PATH = stage_path("cleaned_reviews")
 
 # Map file name → bank name
 BANK_MAP = {
@@ -15,45 +20,129 @@ BANK_MAP = {
     "dashen_reviews.json": "Dashen"
 }
 
-def clean_review_data():
-    all_reviews = []
-
-    for filename in os.listdir(RAW_DIR):
-        if filename.endswith(".json") and filename in BANK_MAP:
-            filepath = os.path.join(RAW_DIR, filename)
-            with open(filepath, "r", encoding="utf-8") as f:
-                reviews_json = json.load(f)
-
-            for entry in reviews_json:
-                review_text = entry.get("content", "").strip()
-                rating = entry.get("score", None)
-                date_raw = entry.get("at", None)
-
-                # Convert datetime to YYYY-MM-DD
-                if date_raw:
-                    date_clean = pd.to_datetime(date_raw).strftime("%Y-%m-%d")
-                else:
-                    date_clean = None
-
-                all_reviews.append({
-                    "review": review_text,
-                    "rating": rating,
-                    "date": date_clean,
-                    "bank": BANK_MAP[filename],
-                    "source": "Google Play"
-                })
+# Map NDJSON shard directory (data/raw/<app>/) → bank name
+SHARD_BANK_MAP = {
+    "cbe": "CBE",
+    "boa": "BOA",
+    "dashen": "Dashen"
+}
+
+COLUMNS = ["review", "rating", "date", "bank", "source", "review_id"]
+RAW_FIELDS = ["content", "score", "at", "reviewId"]
+
+def _to_date_strings(values):
+    """Convert a column of raw `at` values to YYYY-MM-DD in one vectorized call."""
+    dates = pd.to_datetime(values, errors="coerce", format="ISO8601")
+    # Anything that isn't ISO 8601 falls back to per-element format inference
+    retry = dates.isna() & values.notna() & (values.astype(str) != "")
+    if retry.any():
+        dates[retry] = pd.to_datetime(values[retry], errors="coerce", format="mixed")
+    return dates.dt.strftime("%Y-%m-%d")
+
+def reviews_to_frame(records, bank):
+    """Build the cleaned columns for a batch of raw review dicts."""
+    raw = pd.DataFrame(records, columns=RAW_FIELDS)
+    return pd.DataFrame({
+        "review": raw["content"].fillna("").astype(str).str.strip(),
+        "rating": raw["score"],
+        "date": _to_date_strings(raw["at"]),
+        "bank": bank,
+        "source": "Google Play",
+        # Scraper's reviewId: the stable identity used for database upserts
+        "review_id": raw["reviewId"]
+    }, columns=COLUMNS)
+
+def _load_raw_file(filepath, bank):
+    with open(filepath, "r", encoding="utf-8") as f:
+        return reviews_to_frame(json.load(f), bank)
+
+def clean_review_data(raw_dir=RAW_DIR, output_path=OUTPUT_PATH, max_workers=None):
+    """Clean every `<app>_reviews.json` into one stage output (CSV or Parquet).
+
+    Each file is parsed straight into columns by a pool of worker processes
+    (`max_workers=1` keeps everything in this process).
+    """
+    jobs = [
+        (os.path.join(raw_dir, filename), BANK_MAP[filename])
+        for filename in sorted(os.listdir(raw_dir))
+        if filename.endswith(".json") and filename in BANK_MAP
+    ]
+
+    if max_workers == 1 or len(jobs) <= 1:
+        frames = [_load_raw_file(path, bank) for path, bank in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            frames = list(pool.map(_load_raw_file, *zip(*jobs)))
 
     # Create DataFrame
-    df = pd.DataFrame(all_reviews)
+    df = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=COLUMNS)
 
     # Drop rows with missing reviews or ratings
     df.dropna(subset=["review", "rating", "date"], inplace=True)
 
-    # Save as CSV
-    os.makedirs(PROCESSED_DIR, exist_ok=True)
-    df.to_csv(OUTPUT_CSV, index=False)
-    print(f" Cleaned data saved to: {OUTPUT_CSV}")
+    # Save as CSV / Parquet
+    write_stage(df, output_path)
+    print(f" Cleaned data saved to: {output_path}")
     print(f" Total cleaned reviews: {len(df)}")
+    return df
+
+def iter_shard_reviews(raw_dir=RAW_DIR):
+    """Yield (bank, review) pairs from every app's NDJSON shards, lazily."""
+    for app_name, bank in SHARD_BANK_MAP.items():
+        shard_dir = os.path.join(raw_dir, app_name)
+        if os.path.isdir(shard_dir):
+            for entry in iter_shard_records(shard_dir):
+                yield bank, entry
+
+def iter_clean_chunks(raw_dir=RAW_DIR, chunk_size=10000):
+    """Yield cleaned DataFrames of at most `chunk_size` reviews from the NDJSON shards.
+
+    Each chunk holds a single bank; only one chunk is in memory at a time.
+    """
+    chunk = []
+    chunk_bank = None
+
+    def cleaned():
+        df = reviews_to_frame(chunk, chunk_bank)
+        df.dropna(subset=["review", "rating", "date"], inplace=True)
+        chunk.clear()
+        return df
+
+    for bank, entry in iter_shard_reviews(raw_dir):
+        if bank != chunk_bank and chunk:
+            yield cleaned()
+        chunk_bank = bank
+        chunk.append(entry)
+        if len(chunk) >= chunk_size:
+            yield cleaned()
+    if chunk:
+        yield cleaned()
+
+def clean_shards(raw_dir=RAW_DIR, output_path=OUTPUT_PATH, chunk_size=10000):
+    """Clean NDJSON shards into the stage output `chunk_size` reviews at a time.
+
+    Only one chunk is held in memory, so peak usage is independent of how
+    many reviews have been scraped.
+    """
+    with StageWriter(output_path) as writer:
+        for df in iter_clean_chunks(raw_dir, chunk_size):
+            writer.write(df)
+        if not writer.rows:
+            writer.write(reviews_to_frame([], None))
+
+    print(f" Cleaned data saved to: {output_path}")
+    print(f" Total cleaned reviews: {writer.rows}")
+    return writer.rows
 
 if __name__ == "__main__":
-    clean_review_data()
+    parser = argparse.ArgumentParser(description="Clean raw reviews into a CSV")
+    parser.add_argument("--ndjson", action="store_true",
+                        help="read streamed NDJSON shards instead of <app>_reviews.json")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="processes used to parse raw files (default: CPU count)")
+    args = parser.parse_args()
+
+    if args.ndjson:
+        clean_shards()
+    else:
+        clean_review_data(max_workers=args.workers)
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+from array import array
+
+
+def _id_hash(review_id):
+    """64-bit fingerprint of a reviewId (8 bytes per entry on disk)."""
+    digest = hashlib.blake2b(str(review_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class SeenIndex:
+    """Append-only set of review IDs already scraped for one app.
+
+    IDs are stored as 64-bit hashes in a flat binary file, so loading the
+    index touches 8 bytes per known review instead of the raw review JSON,
+    and membership checks / inserts are O(1).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._hashes = set()
+        if os.path.exists(path):
+            stored = array("Q")
+            with open(path, "rb") as f:
+                stored.frombytes(f.read())
+            self._hashes.update(stored)
+
+    def __len__(self):
+        return len(self._hashes)
+
+    def __contains__(self, review_id):
+        return _id_hash(review_id) in self._hashes
+
+    def add_many(self, review_ids):
+        """Record new IDs and append them to the index file."""
+        new = array("Q")
+        for review_id in review_ids:
+            h = _id_hash(review_id)
+            if h not in self._hashes:
+                self._hashes.add(h)
+                new.append(h)
+        if new:
+            with open(self.path, "ab") as f:
+                f.write(new.tobytes())
+        return len(new)
+
+
+def load_watermark(path):
+    """Return the newest {'reviewId', 'at'} seen on a previous run, or None."""
+    if not os.path.exists(path):
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_watermark(path, review):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"reviewId": review.get("reviewId"), "at": review.get("at")}, f)
+
+
+def append_json_array(path, items):
+    """Append `items` to a JSON array file without reading it back.
+
+    Rewrites only the closing bracket, so the cost is O(len(items)) and the
+    file stays a valid JSON list for the cleaner.
+    """
+    if not items:
+        return
+    body = ",\n".join(json.dumps(item, ensure_ascii=False, indent=2) for item in items)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("[\n" + body + "\n]")
+        return
+
+    with open(path, "rb+") as f:
+        # Walk back over trailing whitespace to the closing bracket
+        pos = f.seek(0, os.SEEK_END) - 1
+        f.seek(pos)
+        while f.read(1).isspace():
+            pos -= 1
+            f.seek(pos)
+        f.seek(pos)
+        if f.read(1) != b"]":
+            raise ValueError(f"{path} is not a JSON array")
+
+        # Is the existing array empty?
+        prev = pos - 1
+        f.seek(prev)
+        while prev > 0 and f.read(1).isspace():
+            prev -= 1
+            f.seek(prev)
+        f.seek(prev)
+        separator = "\n" if f.read(1) == b"[" else ",\n"
+
+        f.seek(pos)
+        f.truncate()
+        f.write((separator + body + "\n]").encode("utf-8"))
@@ -0,0 +1,98 @@
+import glob
+import json
+import os
+import shutil
+
+SHARD_PATTERN = "part-{:05d}.ndjson"
+DEFAULT_SHARD_BYTES = 64 * 1024 * 1024
+
+
+class ShardWriter:
+    """Write reviews as newline-delimited JSON into size-bounded shards.
+
+    Shards live in `<out_dir>/<app_name>/part-NNNNN.ndjson`. A new shard is
+    started once the current one reaches `max_bytes`. With `append=True`
+    reopening a directory continues the last shard, so incremental runs
+    simply append. Otherwise the app's reviews are written from scratch into
+    a staging directory that replaces the old shards on `close()`; `abort()`
+    (or leaving the `with` block on an exception) discards it and keeps the
+    previous shards.
+    """
+
+    def __init__(self, out_dir, app_name, max_bytes=DEFAULT_SHARD_BYTES, append=False):
+        self.shard_dir = os.path.join(out_dir, app_name)
+        self.max_bytes = max_bytes
+        self._staging = None if append else os.path.join(out_dir, f".{app_name}.staging")
+        if self._staging is not None:
+            shutil.rmtree(self._staging, ignore_errors=True)  # left over from an aborted run
+        self._write_dir = self._staging or self.shard_dir
+        os.makedirs(self._write_dir, exist_ok=True)
+
+        existing = list_shards(self._write_dir)
+        self._index = len(existing) - 1 if existing else 0
+        self._file = None
+        self._size = 0
+        self._open()
+
+    def _open(self):
+        if self._file is not None:
+            self._file.close()
+        path = os.path.join(self._write_dir, SHARD_PATTERN.format(self._index))
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+
+    def write_many(self, records):
+        """Serialise one page of records and flush it to disk."""
+        for record in records:
+            if self._size >= self.max_bytes:
+                self._index += 1
+                self._open()
+            line = (json.dumps(record, ensure_ascii=False, default=str) + "\n").encode("utf-8")
+            self._file.write(line)
+            self._size += len(line)
+        self._file.flush()
+
+    def close(self):
+        """Finish writing; a from-scratch write now replaces the old shards."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._staging is not None:
+            old = self._staging + ".old"
+            shutil.rmtree(old, ignore_errors=True)
+            if os.path.exists(self.shard_dir):
+                os.rename(self.shard_dir, old)
+            os.rename(self._staging, self.shard_dir)
+            shutil.rmtree(old, ignore_errors=True)
+            self._staging = None
+
+    def abort(self):
+        """Stop writing; a from-scratch write is discarded and the old shards stay."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self._staging is not None:
+            shutil.rmtree(self._staging, ignore_errors=True)
+            self._staging = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def list_shards(shard_dir):
+    return sorted(glob.glob(os.path.join(shard_dir, "part-*.ndjson")))
+
+
+def iter_shard_records(shard_dir):
+    """Yield review dicts from every shard in order, one line at a time."""
+    for path in list_shards(shard_dir):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
@@ -1,9 +1,17 @@
+import argparse
 import json
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from google_play_scraper import Sort, reviews
 
+from src.scraper.incremental import SeenIndex, append_json_array, load_watermark, save_watermark
+from src.scraper.ndjson_shards import DEFAULT_SHARD_BYTES, ShardWriter
+from src.scraper.rate_limiter import AdaptiveTokenBucket
+
+RAW_DIR = "data/raw"
+
 # Correct Google Play package names
 apps = {
     "cbe": "com.combanketh.mobilebanking",
@@ -11,59 +19,208 @@ apps = {
     "dashen": "com.dashen.dashensuperapp"
 }
 
-def scrape_reviews(app_name, app_package, total_reviews=500):
+def _fetch_page(fetch, app_package, token, limiter, max_retries):
+    """Fetch one page, going through the shared limiter when one is given."""
+    for attempt in range(max_retries + 1):
+        if limiter is not None:
+            limiter.acquire()
+        try:
+            result = fetch(
+                app_package,
+                lang="en",
+                country="et",  # Ethiopia
+                sort=Sort.NEWEST,
+                count=200,
+                continuation_token=token
+            )
+        except Exception as e:
+            if limiter is None or attempt == max_retries:
+                raise
+            limiter.record_error()
+            print(f"⚠️ {app_package}: {e} (retry {attempt + 1}/{max_retries})")
+            continue
+        if limiter is not None:
+            limiter.record_success()
+        return result
+
+def scrape_reviews(app_name, app_package, total_reviews=500, fetch=reviews,
+                   limiter=None, pause=1.5, max_retries=3, out_dir=RAW_DIR,
+                   incremental=False, fmt="json", shard_bytes=DEFAULT_SHARD_BYTES):
+    """Scrape up to `total_reviews` reviews for one app and save them.
+
+    Without a `limiter` pages are spaced by a fixed `pause`; with one, the
+    shared AdaptiveTokenBucket decides when the next request may go out and
+    failed requests are retried up to `max_retries` times. `fetch` defaults to
+    google_play_scraper.reviews and can be swapped for a local fake.
+
+    Every run records the IDs it saved in the app's SeenIndex and its newest
+    review as the watermark; a full scrape starts both afresh. With
+    `incremental=True` only reviews missing from the index are kept and
+    appended to the existing output; paging stops at the first page with
+    nothing new or once the previous run's watermark review shows up.
+
+    `fmt="json"` writes `<app>_reviews.json` once at the end. `fmt="ndjson"`
+    streams every page straight into size-bounded shards under `<app>/`, so
+    memory use does not grow with the number of reviews.
+    """
     all_reviews = []
     token = None
-    last_count = 0  # Track previous review count
+    fetched = 0
+    newest = None
+
+    Path(out_dir).mkdir(parents=True, exist_ok=True)
+    if fmt == "ndjson":
+        writer = ShardWriter(out_dir, app_name, shard_bytes, append=incremental)
+        out_path = writer.shard_dir
+    elif fmt == "json":
+        writer = None
+        out_path = os.path.join(out_dir, f"{app_name}_reviews.json")
+    else:
+        raise ValueError(f"Unknown output format: {fmt}")
+
+    seen_path = os.path.join(out_dir, f"{app_name}_seen.idx")
+    watermark_path = os.path.join(out_dir, f"{app_name}_watermark.json")
+    if incremental:
+        seen = SeenIndex(seen_path)
+        watermark = load_watermark(watermark_path)
+        batch_ids = set()
+    else:
+        # A full scrape replaces the output, so its index is rebuilt beside
+        # the old one and only swapped in once the scrape succeeded
+        building_path = seen_path + ".tmp"
+        if os.path.exists(building_path):
+            os.remove(building_path)
+        seen = SeenIndex(building_path)
 
     print(f"📲 Scraping {total_reviews} reviews for {app_name.upper()}...")
 
-    while len(all_reviews) < total_reviews:
-        print(f"⏳ Fetched {len(all_reviews)} so far...")
-
-        batch, token = reviews(
-            app_package,
-            lang="en",
-            country="et",  # Ethiopia
-            sort=Sort.NEWEST,
-            count=200,
-            continuation_token=token
-        )
-
-        for review in batch:
-            if isinstance(review.get("at"), (str, type(None))):
-                review["at"] = review.get("at")
+    try:
+        while fetched < total_reviews:
+            print(f"⏳ Fetched {fetched} so far...")
+
+            batch, token = _fetch_page(fetch, app_package, token, limiter, max_retries)
+
+            for review in batch:
+                if isinstance(review.get("at"), (str, type(None))):
+                    review["at"] = review.get("at")
+                else:
+                    review["at"] = review.get("at").strftime("%Y-%m-%d")
+
+            if incremental:
+                reached_watermark = watermark is not None and any(
+                    r.get("reviewId") == watermark["reviewId"] for r in batch)
+                batch = [r for r in batch
+                         if r.get("reviewId") not in seen and r.get("reviewId") not in batch_ids]
+                batch_ids.update(r.get("reviewId") for r in batch)
+
+            # Break if no new reviews are being added (loop or limit hit)
+            if not batch:
+                print("No new reviews fetched. Ending early.")
+                break
+
+            batch = batch[:total_reviews - fetched]
+            fetched += len(batch)
+            if newest is None:
+                newest = batch[0]  # Sort.NEWEST: first review of the run
+
+            if writer is not None:
+                writer.write_many(batch)
+                seen.add_many(r.get("reviewId") for r in batch)
             else:
-                review["at"] = review.get("at").strftime("%Y-%m-%d")
+                all_reviews.extend(batch)
 
-        all_reviews.extend(batch)
+            # Break if there's no continuation token (last page)
+            if not token:
+                print("Reached last page.")
+                break
 
-        # Break if no new reviews are being added (loop or limit hit)
-        if len(all_reviews) == last_count or not batch:
-            print("No new reviews fetched. Ending early.")
-            break
+            if incremental and reached_watermark:
+                print("Reached previous run's newest review.")
+                break
 
-        last_count = len(all_reviews)
+            if limiter is None:
+                time.sleep(pause)  #Pause to avoid rate-limiting
+    except BaseException:
+        # A failed full scrape keeps the previous shards and index
+        if writer is not None:
+            writer.abort()
+        if not incremental and os.path.exists(building_path):
+            os.remove(building_path)
+        raise
+    if writer is not None:
+        writer.close()
 
-        # Break if there's no continuation token (last page)
-        if not token:
-            print("Reached last page.")
-            break
+    if writer is None:
+        if incremental:
+            append_json_array(out_path, all_reviews)
+            seen.add_many(r.get("reviewId") for r in all_reviews)
+        else:
+            with open(out_path, "w", encoding="utf-8") as f:
+                json.dump(all_reviews, f, ensure_ascii=False, indent=2)
+            seen.add_many(r.get("reviewId") for r in all_reviews)
 
-        time.sleep(1.5)  #Pause to avoid rate-limiting
+    if not incremental:
+        if os.path.exists(building_path):
+            os.replace(building_path, seen_path)
+        elif os.path.exists(seen_path):
+            os.remove(seen_path)
+    if newest is not None:
+        save_watermark(watermark_path, newest)
+    if incremental:
+        print(f"Appended {fetched} new reviews to {out_path} ({len(seen)} known)")
+    else:
+        print(f"Saved {fetched} reviews to {out_path}")
+    return out_path
 
-    # Trim and save
-    all_reviews = all_reviews[:total_reviews]
-    Path("data/raw").mkdir(parents=True, exist_ok=True)
-    out_path = os.path.join("data/raw", f"{app_name}_reviews.json")
+def scrape_all(app_packages=None, total_reviews=500, max_workers=4, fetch=reviews,
+               limiter=None, out_dir=RAW_DIR, incremental=False, fmt="json"):
+    """Scrape several apps in parallel behind one shared rate limiter.
 
-    with open(out_path, "w", encoding="utf-8") as f:
-        json.dump(all_reviews, f, ensure_ascii=False, indent=2)
+    Returns a dict of app name → saved file path. An app that keeps failing
+    after its retries is reported and skipped; the others still complete.
+    """
+    app_packages = apps if app_packages is None else app_packages
+    limiter = AdaptiveTokenBucket() if limiter is None else limiter
 
-    print(f"Saved {len(all_reviews)} reviews to {out_path}")
+    saved = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        futures = {
+            pool.submit(scrape_reviews, name, package, total_reviews,
+                        fetch=fetch, limiter=limiter, out_dir=out_dir,
+                        incremental=incremental, fmt=fmt): name
+            for name, package in app_packages.items()
+        }
+        for future in as_completed(futures):
+            name = futures[future]
+            try:
+                saved[name] = future.result()
+            except Exception as e:
+                print(f"❌ Failed to scrape {name.upper()}: {e}")
+
+    print(f"Scraped {len(saved)}/{len(app_packages)} apps "
+          f"(final rate {limiter.rate:.2f} req/s)")
+    return saved
 
-#Run only Dashen for now, or uncomment others as needed
 if __name__ == "__main__":
-    # scrape_reviews("cbe", apps["cbe"])
-    # scrape_reviews("boa", apps["boa"])
-    scrape_reviews("dashen", apps["dashen"])
+    parser = argparse.ArgumentParser(description="Scrape Google Play reviews")
+    parser.add_argument("apps", nargs="*", default=list(apps),
+                        help=f"apps to scrape, any of {', '.join(apps)} (default: all)")
+    parser.add_argument("--total", type=int, default=500, help="reviews per app")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="parallel apps; 1 keeps the old sequential loop")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only fetch reviews newer than the last run and append them")
+    parser.add_argument("--format", choices=["json", "ndjson"], default="json",
+                        help="ndjson streams pages into size-bounded shards")
+    args = parser.parse_args()
+    unknown = set(args.apps) - set(apps)
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(sorted(unknown))}")
+
+    if args.workers > 1:
+        scrape_all({name: apps[name] for name in args.apps}, args.total, args.workers,
+                   incremental=args.incremental, fmt=args.format)
+    else:
+        for name in args.apps:
+            scrape_reviews(name, apps[name], args.total, incremental=args.incremental,
+                           fmt=args.format)
@@ -0,0 +1,57 @@
+import threading
+import time
+
+
+class AdaptiveTokenBucket:
+    """Thread-safe token bucket shared by all scraping workers.
+
+    Tokens refill at `rate` per second up to `capacity`. Every successful
+    request nudges the rate up by `increase`, every error multiplies it by
+    `backoff` (additive increase / multiplicative decrease), so the scraper
+    speeds up while Google Play is happy and slows down as soon as it isn't.
+    """
+
+    def __init__(self, rate=1 / 1.5, capacity=2, min_rate=0.1, max_rate=5.0,
+                 increase=0.05, backoff=0.5, clock=time.monotonic, sleep=time.sleep):
+        if not 0 < min_rate <= rate <= max_rate:
+            raise ValueError("Expected 0 < min_rate <= rate <= max_rate")
+        if not 0 < backoff < 1:
+            raise ValueError("backoff must be between 0 and 1")
+
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.backoff = backoff
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = float(capacity)
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+        self._last = now
+
+    def acquire(self):
+        """Block until a token is available, then consume it."""
+        while True:
+            with self._lock:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self._sleep(wait)
+
+    def record_success(self):
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def record_error(self):
+        with self._lock:
+            self.rate = max(self.min_rate, self.rate * self.backoff)
+            # Drop any burst credit so the slowdown takes effect immediately
+            self._tokens = min(self._tokens, 0.0)
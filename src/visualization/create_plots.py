@@ -1,134 +1,379 @@
+import argparse
+import hashlib
+import inspect
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 from wordcloud import WordCloud
-import numpy as np
-from collections import Counter
 import os
 
-# Set style for better-looking plots
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+from src.analysis.aggregate_store import AggregateStore
+from src.pipeline.columnar import read_stage, stage_path
 
 # Create output directory
 output_dir = 'reports/figures'
-os.makedirs(output_dir, exist_ok=True)
 
-# Load the data
-df = pd.read_csv('data/processed/reviews_with_themes.csv')
+# Fingerprint of every rendered figure, used to skip unchanged ones
+MANIFEST_NAME = '.fingerprints.json'
 
-# Debug: Check data structure
-print("Data shape:", df.shape)
-print("Columns:", df.columns.tolist())
-print("Sentiment labels:", df['sentiment_label'].unique())
-print("Bank names:", df['bank'].unique())
-
-# Convert date to datetime
-df['date'] = pd.to_datetime(df['date'])
+# Load only the columns the plots use
+PLOT_COLUMNS = ['bank', 'date', 'rating', 'sentiment_label', 'sentiment_score',
+                'identified_theme(s)', 'keywords']
 
 # Bank name mapping for better labels
 bank_names = {
     'CBE': 'Commercial Bank of Ethiopia',
-    'BOA': 'Bank of Abyssinia', 
+    'BOA': 'Bank of Abyssinia',
     'Dashen': 'Dashen Bank'
 }
-df['bank_name'] = df['bank'].map(bank_names)
-
-# 1. Sentiment Distribution by Bank
-plt.figure(figsize=(12, 6))
-# Ensure sentiment_label is properly formatted
-df['sentiment_label'] = df['sentiment_label'].astype(str)
-sentiment_counts = df.groupby(['bank_name', 'sentiment_label']).size().unstack(fill_value=0)
-# Convert to numeric if needed
-sentiment_counts = sentiment_counts.astype(float)
-sentiment_counts.plot(kind='bar', stacked=True)
-plt.title('Sentiment Distribution by Bank', fontsize=16, fontweight='bold')
-plt.xlabel('Bank', fontsize=12)
-plt.ylabel('Number of Reviews', fontsize=12)
-plt.legend(title='Sentiment', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig(f'{output_dir}/sentiment_by_bank.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 2. Rating Distribution by Bank
-plt.figure(figsize=(12, 6))
-sns.boxplot(data=df, x='bank_name', y='rating', palette='Set3')
-plt.title('Rating Distribution by Bank', fontsize=16, fontweight='bold')
-plt.xlabel('Bank', fontsize=12)
-plt.ylabel('Rating (1-5 stars)', fontsize=12)
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig(f'{output_dir}/rating_distribution.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 3. Theme Analysis
-plt.figure(figsize=(14, 8))
-theme_counts = df['identified_theme(s)'].value_counts().head(10)
-theme_counts.plot(kind='barh')
-plt.title('Most Common Themes Across All Banks', fontsize=16, fontweight='bold')
-plt.xlabel('Number of Reviews', fontsize=12)
-plt.ylabel('Theme', fontsize=12)
-plt.tight_layout()
-plt.savefig(f'{output_dir}/theme_analysis.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 4. Sentiment Trends Over Time
-plt.figure(figsize=(14, 6))
-df['month'] = df['date'].dt.to_period('M')
-monthly_sentiment = df.groupby(['month', 'sentiment_label']).size().unstack(fill_value=0)
-monthly_sentiment.plot(kind='line', marker='o')
-plt.title('Sentiment Trends Over Time', fontsize=16, fontweight='bold')
-plt.xlabel('Month', fontsize=12)
-plt.ylabel('Number of Reviews', fontsize=12)
-plt.legend(title='Sentiment', bbox_to_anchor=(1.05, 1), loc='upper left')
-plt.xticks(rotation=45)
-plt.tight_layout()
-plt.savefig(f'{output_dir}/sentiment_trends.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-# 5. Keyword Cloud for each bank
-for bank in df['bank'].unique():
-    bank_data = df[df['bank'] == bank]
-    
-    # Extract keywords from the keywords column
-    all_keywords = []
-    for keywords_str in bank_data['keywords'].dropna():
-        if isinstance(keywords_str, str):
-            # Convert string representation of list to actual list
-            keywords = eval(keywords_str) if keywords_str.startswith('[') else keywords_str.split(', ')
-            all_keywords.extend(keywords)
-    
-    if all_keywords:
-        # Create word cloud
-        wordcloud = WordCloud(width=800, height=400, background_color='white', 
-                            max_words=50, colormap='viridis').generate(' '.join(all_keywords))
-        
-        plt.figure(figsize=(10, 6))
-        plt.imshow(wordcloud, interpolation='bilinear')
-        plt.axis('off')
-        plt.title(f'Most Common Keywords - {bank_names[bank]}', fontsize=16, fontweight='bold')
-        plt.tight_layout()
-        plt.savefig(f'{output_dir}/keywords_cloud_{bank.lower()}.png', dpi=300, bbox_inches='tight')
-        plt.close()
-
-# 6. Average Sentiment Score by Bank
-plt.figure(figsize=(10, 6))
-avg_sentiment = df.groupby('bank_name')['sentiment_score'].mean().sort_values(ascending=True)
-avg_sentiment.plot(kind='barh', color='skyblue')
-plt.title('Average Sentiment Score by Bank', fontsize=16, fontweight='bold')
-plt.xlabel('Average Sentiment Score', fontsize=12)
-plt.ylabel('Bank', fontsize=12)
-plt.tight_layout()
-plt.savefig(f'{output_dir}/avg_sentiment_by_bank.png', dpi=300, bbox_inches='tight')
-plt.close()
-
-print("All visualizations created successfully!")
-print(f" Plots saved in: {output_dir}")
-print("\nGenerated plots:")
-print("1. sentiment_by_bank.png - Sentiment distribution by bank")
-print("2. rating_distribution.png - Rating distribution by bank") 
-print("3. theme_analysis.png - Most common themes")
-print("4. sentiment_trends.png - Sentiment trends over time")
-print("5. keywords_cloud_[bank].png - Keyword clouds for each bank")
-print("6. avg_sentiment_by_bank.png - Average sentiment scores") 
\ No newline at end of file
+
+# A word cloud shows at most this many keywords, so only these are passed on
+WORDCLOUD_WORDS = 50
+
+# Rendering options; part of every figure's fingerprint
+PLOT_OPTIONS = {'dpi': 300, 'style': 'seaborn-v0_8', 'palette': 'husl'}
+
+# name -> draw function; each draws one figure from its input data
+FIGURES = {}
+
+
+def figure(name):
+    """Register a draw function under `name`."""
+    def register(draw):
+        FIGURES[name] = draw
+        return draw
+    return register
+
+
+@figure('sentiment_by_bank')
+def draw_sentiment_by_bank(sentiment_counts):
+    # 1. Sentiment Distribution by Bank
+    plt.figure(figsize=(12, 6))
+    sentiment_counts.plot(kind='bar', stacked=True)
+    plt.title('Sentiment Distribution by Bank', fontsize=16, fontweight='bold')
+    plt.xlabel('Bank', fontsize=12)
+    plt.ylabel('Number of Reviews', fontsize=12)
+    plt.legend(title='Sentiment', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+def _weighted_quantile(values, counts, q):
+    """numpy-style (linear) quantile of `values` repeated `counts` times."""
+    n = counts.sum()
+    position = q * (n - 1)
+    cumulative = np.cumsum(counts)
+    below = values[np.searchsorted(cumulative, np.floor(position), side='right')]
+    above = values[np.searchsorted(cumulative, np.ceil(position), side='right')]
+    return below + (above - below) * (position - np.floor(position))
+
+
+def rating_box_stats(rating_histogram):
+    """Box-plot statistics (as matplotlib's boxplot computes them) from rating counts per bank."""
+    stats = []
+    for bank_name, counts in rating_histogram.iterrows():
+        counts = counts[counts > 0]
+        values = counts.index.to_numpy(dtype=float)
+        counts = counts.to_numpy()
+        q1, med, q3 = (_weighted_quantile(values, counts, q) for q in (0.25, 0.5, 0.75))
+        iqr = q3 - q1
+        inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+        stats.append({
+            'label': bank_name, 'q1': q1, 'med': med, 'q3': q3,
+            'whislo': inside.min(), 'whishi': inside.max(),
+            'fliers': values[(values < inside.min()) | (values > inside.max())],
+        })
+    return stats
+
+
+@figure('rating_distribution')
+def draw_rating_distribution(rating_histogram):
+    # 2. Rating Distribution by Bank, drawn from per-bank rating counts
+    fig, ax = plt.subplots(figsize=(12, 6))
+    boxes = ax.bxp(rating_box_stats(rating_histogram), patch_artist=True)
+    for patch, color in zip(boxes['boxes'], sns.color_palette('Set3', len(rating_histogram))):
+        patch.set_facecolor(color)
+    plt.title('Rating Distribution by Bank', fontsize=16, fontweight='bold')
+    plt.xlabel('Bank', fontsize=12)
+    plt.ylabel('Rating (1-5 stars)', fontsize=12)
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+@figure('theme_analysis')
+def draw_theme_analysis(theme_counts):
+    # 3. Theme Analysis
+    plt.figure(figsize=(14, 8))
+    theme_counts.plot(kind='barh')
+    plt.title('Most Common Themes Across All Banks', fontsize=16, fontweight='bold')
+    plt.xlabel('Number of Reviews', fontsize=12)
+    plt.ylabel('Theme', fontsize=12)
+    plt.tight_layout()
+
+
+@figure('sentiment_trends')
+def draw_sentiment_trends(monthly_sentiment):
+    # 4. Sentiment Trends Over Time
+    plt.figure(figsize=(14, 6))
+    monthly_sentiment.plot(kind='line', marker='o')
+    plt.title('Sentiment Trends Over Time', fontsize=16, fontweight='bold')
+    plt.xlabel('Month', fontsize=12)
+    plt.ylabel('Number of Reviews', fontsize=12)
+    plt.legend(title='Sentiment', bbox_to_anchor=(1.05, 1), loc='upper left')
+    plt.xticks(rotation=45)
+    plt.tight_layout()
+
+
+@figure('keywords_cloud')
+def draw_keywords_cloud(data):
+    # 5. Keyword Cloud for one bank, sized by keyword frequency
+    wordcloud = WordCloud(width=800, height=400, background_color='white',
+                          max_words=WORDCLOUD_WORDS, colormap='viridis'
+                          ).generate_from_frequencies(data['frequencies'])
+
+    plt.figure(figsize=(10, 6))
+    plt.imshow(wordcloud, interpolation='bilinear')
+    plt.axis('off')
+    plt.title(f"Most Common Keywords - {data['bank_name']}", fontsize=16, fontweight='bold')
+    plt.tight_layout()
+
+
+@figure('avg_sentiment_by_bank')
+def draw_avg_sentiment_by_bank(avg_sentiment):
+    # 6. Average Sentiment Score by Bank
+    plt.figure(figsize=(10, 6))
+    avg_sentiment.plot(kind='barh', color='skyblue')
+    plt.title('Average Sentiment Score by Bank', fontsize=16, fontweight='bold')
+    plt.xlabel('Average Sentiment Score', fontsize=12)
+    plt.ylabel('Bank', fontsize=12)
+    plt.tight_layout()
+
+
+def plot_inputs(df):
+    """The compact tables every figure is drawn from, computed from a reviews frame.
+
+    Their size depends on the number of banks, months and distinct
+    keywords, not on the number of reviews.
+    """
+    df = df.copy()
+    # Convert date to datetime
+    df['date'] = pd.to_datetime(df['date'])
+    df['bank_name'] = df['bank'].map(bank_names)
+    # Ensure sentiment_label is properly formatted
+    df['sentiment_label'] = df['sentiment_label'].astype(str)
+
+    # Keyword counts per bank, most common first (ties alphabetical, as in the store)
+    keywords = df[['bank', 'keywords']].explode('keywords').dropna(subset=['keywords'])
+    counts = (keywords.groupby(['bank', 'keywords'], observed=True).size().rename('n').reset_index()
+              .sort_values(['n', 'keywords'], ascending=[False, True]))
+    frequencies = {}
+    for bank, keyword, n in counts.groupby('bank', observed=True).head(WORDCLOUD_WORDS).itertuples(index=False):
+        frequencies.setdefault(str(bank), {})[keyword] = int(n)
+
+    return {
+        'sentiment_counts': df.groupby(['bank_name', 'sentiment_label'], observed=True).size().unstack(fill_value=0),
+        'rating_histogram': df.groupby(['bank_name', 'rating'], observed=True).size().unstack(fill_value=0),
+        'theme_counts': df['identified_theme(s)'].value_counts().head(10),
+        'monthly_sentiment': df.groupby([df['date'].dt.to_period('M').rename('month'), 'sentiment_label'])
+                               .size().unstack(fill_value=0),
+        'keyword_frequencies': frequencies,
+        'avg_sentiment': df.groupby('bank_name', observed=True)['sentiment_score'].mean(),
+    }
+
+
+def plot_inputs_from_store(store, days=None, until=None):
+    """Same tables as plot_inputs, read from an AggregateStore (optionally a rolling window)."""
+    summary = store.summary(days, until)
+    summary['bank_name'] = summary['bank'].map(bank_names)
+    per_bank = summary.groupby('bank_name')[['score_sum', 'score_count']].sum()
+
+    histogram = store.rating_histogram(days, until)
+    histogram['bank_name'] = histogram['bank'].map(bank_names)
+
+    monthly = store.monthly_sentiment(days, until)
+    monthly = monthly.groupby(['month', 'sentiment_label'])['review_count'].sum().unstack(fill_value=0)
+    monthly.index = pd.PeriodIndex(monthly.index, freq='M', name='month')
+
+    theme_counts = store.theme_totals(days, until, top_n=10)
+    theme_counts.index.name = 'identified_theme(s)'
+    return {
+        'sentiment_counts': summary.pivot_table(index='bank_name', columns='sentiment_label',
+                                                values='review_count', aggfunc='sum', fill_value=0),
+        'rating_histogram': histogram.pivot_table(index='bank_name', columns='rating',
+                                                  values='review_count', aggfunc='sum', fill_value=0),
+        'theme_counts': theme_counts,
+        'monthly_sentiment': monthly,
+        'keyword_frequencies': store.keyword_frequencies(days, until, top_n=WORDCLOUD_WORDS),
+        'avg_sentiment': per_bank['score_sum'] / per_bank['score_count'],
+    }
+
+
+def figure_jobs(inputs):
+    """[(output file, figure name, input data)] for every figure."""
+    jobs = [
+        ('sentiment_by_bank.png', 'sentiment_by_bank', inputs['sentiment_counts'].astype(float)),
+        ('rating_distribution.png', 'rating_distribution', inputs['rating_histogram']),
+        ('theme_analysis.png', 'theme_analysis', inputs['theme_counts']),
+        ('sentiment_trends.png', 'sentiment_trends', inputs['monthly_sentiment']),
+    ]
+    for bank, frequencies in inputs['keyword_frequencies'].items():
+        if frequencies:
+            jobs.append((f'keywords_cloud_{bank.lower()}.png', 'keywords_cloud',
+                         {'bank_name': bank_names[bank], 'frequencies': frequencies}))
+    jobs.append(('avg_sentiment_by_bank.png', 'avg_sentiment_by_bank',
+                 inputs['avg_sentiment'].sort_values(ascending=True)))
+    return jobs
+
+
+def _digest(data):
+    if isinstance(data, (pd.DataFrame, pd.Series)):
+        return data.to_json(orient='split', date_format='iso', default_handler=str)
+    return json.dumps(data, sort_keys=True, default=str, ensure_ascii=False)
+
+
+def _names(code):
+    """Global names used by a code object and the functions/comprehensions nested in it."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _names(const)
+    return names
+
+
+def _function_source(func):
+    return inspect.getsource(func)
+
+
+def _draw_code(draw):
+    """Source of a draw function plus the helpers and constants of this module it uses."""
+    parts, seen, todo = [], set(), [draw]
+    while todo:
+        func = todo.pop()
+        parts.append(_function_source(func))
+        for name in sorted(_names(func.__code__) - seen):
+            seen.add(name)
+            value = globals().get(name)
+            if inspect.isfunction(value) and value.__module__ == __name__:
+                todo.append(value)
+            elif isinstance(value, (int, float, str, tuple)):
+                parts.append(f"{name} = {value!r}")
+    return '\n'.join(parts)
+
+
+def fingerprint(name, data, options=PLOT_OPTIONS):
+    """Hash of a figure's input data, rendering options and draw code (with its helpers)."""
+    h = hashlib.sha1()
+    for part in (name, _draw_code(FIGURES[name]),
+                 json.dumps(options, sort_keys=True), _digest(data)):
+        h.update(part.encode('utf-8'))
+        h.update(b'\0')
+    return h.hexdigest()
+
+
+def _init_renderer(options):
+    # Off-screen rendering in every worker
+    plt.switch_backend('Agg')
+    # Set style for better-looking plots
+    plt.style.use(options['style'])
+    sns.set_palette(options['palette'])
+
+
+def render(name, data, path, options=PLOT_OPTIONS):
+    """Draw one figure and save it to `path`; return the seconds it took."""
+    start = time.perf_counter()
+    FIGURES[name](data)
+    plt.savefig(path, dpi=options['dpi'], bbox_inches='tight')
+    plt.close('all')
+    return time.perf_counter() - start
+
+
+def _load_manifest(path):
+    if os.path.exists(path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    return {}
+
+
+def render_figures(jobs, out_dir=output_dir, options=PLOT_OPTIONS, max_workers=None, force=False):
+    """Render the jobs whose fingerprint changed, in parallel; return {file: seconds or None}.
+
+    None marks a figure that was up to date and skipped.
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    manifest_path = os.path.join(out_dir, MANIFEST_NAME)
+    manifest = _load_manifest(manifest_path)
+
+    timings, pending = {}, []
+    for filename, name, data in jobs:
+        key = fingerprint(name, data, options)
+        path = os.path.join(out_dir, filename)
+        if not force and manifest.get(filename) == key and os.path.exists(path):
+            timings[filename] = None
+        else:
+            pending.append((filename, name, data, path, key))
+
+    if pending:
+        max_workers = max_workers or min(len(pending), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_renderer,
+                                 initargs=(options,)) as executor:
+            futures = [(filename, key, executor.submit(render, name, data, path, options))
+                       for filename, name, data, path, key in pending]
+            for filename, key, future in futures:
+                timings[filename] = future.result()
+                manifest[filename] = key
+
+        with open(manifest_path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+    return timings
+
+
+def main(input_path=None, out_dir=output_dir, max_workers=None, force=False,
+         store_path=None, days=None):
+    start = time.perf_counter()
+    if store_path:
+        with AggregateStore(store_path) as store:
+            inputs = plot_inputs_from_store(store, days)
+    else:
+        df = read_stage(input_path or stage_path('reviews_with_themes'), columns=PLOT_COLUMNS)
+
+        # Debug: Check data structure
+        print("Data shape:", df.shape)
+        print("Columns:", df.columns.tolist())
+        print("Sentiment labels:", df['sentiment_label'].unique())
+        print("Bank names:", df['bank'].unique())
+        inputs = plot_inputs(df)
+
+    timings = render_figures(figure_jobs(inputs), out_dir, max_workers=max_workers, force=force)
+    for filename, seconds in timings.items():
+        status = "unchanged, skipped" if seconds is None else f"{seconds:.2f}s"
+        print(f"  {filename}: {status}")
+    redrawn = sum(seconds is not None for seconds in timings.values())
+    print(f"Redrew {redrawn} of {len(timings)} figures in {time.perf_counter() - start:.2f}s")
+
+    print("All visualizations created successfully!")
+    print(f" Plots saved in: {out_dir}")
+    print("\nGenerated plots:")
+    print("1. sentiment_by_bank.png - Sentiment distribution by bank")
+    print("2. rating_distribution.png - Rating distribution by bank")
+    print("3. theme_analysis.png - Most common themes")
+    print("4. sentiment_trends.png - Sentiment trends over time")
+    print("5. keywords_cloud_[bank].png - Keyword clouds for each bank")
+    print("6. avg_sentiment_by_bank.png - Average sentiment scores")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render the report figures")
+    parser.add_argument("--input", help="reviews_with_themes stage file")
+    parser.add_argument("--out-dir", default=output_dir)
+    parser.add_argument("--workers", type=int, help="render processes (default: one per CPU)")
+    parser.add_argument("--force", action="store_true", help="redraw every figure")
+    parser.add_argument("--store", help="plot from this AggregateStore instead of --input")
+    parser.add_argument("--days", type=int, help="with --store: only the last N days")
+    args = parser.parse_args()
+    main(args.input, args.out_dir, args.workers, args.force, args.store, args.days)
@@ -0,0 +1,72 @@
+import pandas as pd
+import pytest
+
+from src.analysis.aggregate_store import STORE_COLUMNS, AggregateStore
+from src.analysis.generate_insights import generate_insights, insights_from_store
+from src.database.load_to_oracle import CSV_PATH
+from src.pipeline.columnar import read_stage
+
+
+@pytest.fixture(scope="module")
+def reviews():
+    return read_stage(CSV_PATH, columns=STORE_COLUMNS)
+
+
+def test_deltas_add_up_to_a_full_load(tmp_path, reviews):
+    with AggregateStore(str(tmp_path / "full.sqlite")) as full:
+        full.add(reviews)
+        expected = full.summary()
+        expected_keywords = full.top_keywords(top_n=5)
+
+    half = len(reviews) // 2
+    with AggregateStore(str(tmp_path / "delta.sqlite")) as store:
+        store.add(reviews.iloc[:half], batch="a")
+        store.add(reviews.iloc[half:], batch="b")
+        assert store.add(reviews.iloc[half:], batch="b") == 0  # already applied
+        pd.testing.assert_frame_equal(store.summary(), expected)
+        assert store.top_keywords(top_n=5) == expected_keywords
+
+
+def test_overlapping_adds_count_each_review_once(tmp_path, reviews):
+    with AggregateStore(str(tmp_path / "full.sqlite")) as full:
+        full.add(reviews)
+        expected = full.summary()
+
+    with AggregateStore(str(tmp_path / "overlap.sqlite")) as store:
+        assert store.add(reviews.iloc[:900]) == 900
+        assert store.add(reviews) == len(reviews) - 900
+        assert store.add(reviews) == 0
+        pd.testing.assert_frame_equal(store.summary(), expected)
+
+    with_ids = reviews.assign(review_id=[f"id{i}" for i in range(len(reviews))])
+    with AggregateStore(str(tmp_path / "ids.sqlite")) as store:
+        store.add(with_ids.iloc[:500])
+        assert store.add(with_ids.iloc[250:]) == len(reviews) - 500
+
+
+def test_rolling_window(tmp_path, reviews):
+    with AggregateStore(str(tmp_path / "store.sqlite")) as store:
+        store.add(reviews)
+        latest = store.latest_day()
+        days = pd.to_datetime(reviews["date"]).dt.date
+        in_window = reviews[(days > latest - pd.Timedelta(days=7)) & (days <= latest)]
+
+        summary = store.summary(days=7)
+        assert summary["review_count"].sum() == len(in_window)
+        assert store.rating_histogram(days=7)["review_count"].sum() == len(in_window)
+        assert store.monthly_sentiment()["review_count"].sum() == len(reviews)
+
+
+def test_insights_from_store_match_full_scan(tmp_path, reviews):
+    with AggregateStore(str(tmp_path / "store.sqlite")) as store:
+        store.add(reviews)
+        from_store = insights_from_store(store)
+    full = generate_insights(reviews)
+
+    assert from_store["total_reviews"] == full["total_reviews"]
+    assert from_store["average_ratings"].to_dict() == full["average_ratings"].to_dict()
+    for bank, analysis in full["bank_analyses"].items():
+        result = from_store["bank_analyses"][bank]
+        assert result["rating"] == pytest.approx(analysis["rating"])
+        assert result["positive_pct"] == pytest.approx(analysis["positive_pct"])
+        assert [c for _, c in result["top_drivers"]] == [c for _, c in analysis["top_drivers"]]
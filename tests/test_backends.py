@@ -0,0 +1,167 @@
+import sqlite3
+import threading
+
+import oracledb
+import pandas as pd
+import pytest
+
+from src.database.backends import (
+    MAX_VARCHAR_BIND, OraclePoolBackend, SQLiteBackend, StorageBackend)
+from src.database.load_to_oracle import BANK_MAPPING, load_reviews, prepare_reviews, review_keys
+
+
+def _stage(tmp_path, rows):
+    path = str(tmp_path / "reviews_with_themes.csv")
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+ROWS = [
+    {"review": "good app", "rating": 5, "date": "2025-06-01", "bank": "CBE", "source": "Google Play",
+     "sentiment_label": "POSITIVE", "sentiment_score": 0.99, "identified_theme(s)": "Other"},
+    {"review": "good app", "rating": 5, "date": "2025-06-01", "bank": "CBE", "source": "Google Play",
+     "sentiment_label": "POSITIVE", "sentiment_score": 0.99, "identified_theme(s)": "Other"},
+    {"review": "slow", "rating": 1, "date": "2025-06-02", "bank": "Dashen", "source": "Google Play",
+     "sentiment_label": "NEGATIVE", "sentiment_score": None, "identified_theme(s)": "Transaction Performance"},
+]
+
+
+def test_review_keys_are_stable_and_keep_duplicates_apart():
+    df = pd.DataFrame(ROWS)
+    keys = review_keys(df)
+    assert keys.is_unique
+    assert keys.tolist() == review_keys(df.copy()).tolist()
+
+    df["review_id"] = ["gp:1", None, "gp:3"]
+    keys = review_keys(df)
+    assert keys[0] == "gp:1" and keys[2] == "gp:3"
+    assert len(keys[1]) == 40
+
+
+def test_prepare_reviews_maps_bank_codes_and_nan():
+    rows = prepare_reviews(pd.DataFrame(ROWS), {"cbe": 1, "boa": 2, "dashen": 3})
+    assert [r[1] for r in rows] == [1, 1, 3]
+    assert rows[2][6] is None
+
+
+def test_incomplete_backend_fails_on_construction():
+    class NoReviews(StorageBackend):
+        def ensure_schema(self):
+            pass
+
+        def upsert_banks(self, banks):
+            return {}
+
+    with pytest.raises(TypeError):
+        NoReviews()
+
+
+def test_sqlite_load_is_idempotent(tmp_path):
+    path = _stage(tmp_path, ROWS)
+    db = str(tmp_path / "reviews.sqlite")
+
+    with SQLiteBackend(db) as backend:
+        assert load_reviews(backend, path, chunk_size=2) == 3
+    with SQLiteBackend(db) as backend:
+        load_reviews(backend, path, chunk_size=2)
+
+    updated = [dict(r, sentiment_label="NEUTRAL") if r["review"] == "slow" else r for r in ROWS]
+    with SQLiteBackend(db) as backend:
+        load_reviews(backend, _stage(tmp_path, updated))
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT COUNT(*) FROM banks").fetchone()[0] == len(BANK_MAPPING)
+    assert connection.execute("SELECT COUNT(*) FROM reviews").fetchone()[0] == 3
+    assert connection.execute(
+        "SELECT sentiment_label FROM reviews WHERE review_text = 'slow'").fetchone()[0] == "NEUTRAL"
+    assert connection.execute("SELECT COUNT(*) FROM review_themes").fetchone()[0] == 3
+    connection.close()
+
+
+def test_repeated_review_id_keeps_the_last_row(tmp_path):
+    rows = [dict(ROWS[0], review_id="gp:1", **{"identified_theme(s)": "Other, Other"}),
+            dict(ROWS[2], review_id="gp:2"),
+            dict(ROWS[0], review_id="gp:1", rating=4)]
+    db = str(tmp_path / "reviews.sqlite")
+    with SQLiteBackend(db) as backend:
+        assert load_reviews(backend, _stage(tmp_path, rows)) == 2
+
+    connection = sqlite3.connect(db)
+    assert connection.execute("SELECT rating FROM reviews WHERE review_id = 'gp:1'").fetchone()[0] == 4
+    assert connection.execute("SELECT COUNT(*) FROM review_themes").fetchone()[0] == 2
+    connection.close()
+
+
+class FakeCursor:
+    """Stand-in for an oracledb cursor: MERGE rows land in the pool's table."""
+
+    def __init__(self, pool):
+        self.pool = pool
+        self.input_sizes = None
+
+    def setinputsizes(self, *sizes):
+        self.input_sizes = sizes
+
+    def executemany(self, sql, rows):
+        with self.pool.lock:
+            if "MERGE INTO reviews" in sql:
+                assert self.input_sizes is not None and len(self.input_sizes) == len(rows[0])
+                self.pool.batches.append((self.input_sizes, len(rows)))
+                self.pool.reviews.update((row[0], row) for row in rows)
+            elif sql.startswith("DELETE FROM review_themes"):
+                self.pool.themes -= {pair for pair in self.pool.themes if (pair[0],) in rows}
+            else:
+                self.pool.themes.update(rows)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakeConnection:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def cursor(self):
+        return FakeCursor(self.pool)
+
+    def commit(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+
+class FakePool:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reviews, self.batches, self.themes = {}, [], set()
+
+    def acquire(self):
+        return FakeConnection(self)
+
+    def close(self):
+        pass
+
+
+def test_pool_backend_loads_chunks_with_declared_sizes():
+    pool = FakePool()
+    backend = OraclePoolBackend(workers=3, pool=pool)
+    long_text = "x" * (MAX_VARCHAR_BIND + 1)
+    rows = [(f"id{i}", 1, long_text if i == 7 else f"review {i}", 5, None, "POSITIVE", 0.9, "Other", "Google Play")
+            for i in range(10)]
+
+    assert backend.upsert_reviews(rows, chunk_size=3) == 10
+    assert backend.upsert_reviews(rows, chunk_size=3) == 10
+    assert len(pool.reviews) == 10
+    assert len(pool.batches) == 8
+    assert len(pool.themes) == 10
+
+    text_types = [sizes[2] for sizes, _ in pool.batches]
+    assert text_types.count(oracledb.DB_TYPE_CLOB) == 2  # the chunk holding the long review, twice
+    assert set(text_types) - {oracledb.DB_TYPE_CLOB} == {8}  # len("review 0")
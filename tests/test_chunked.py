@@ -0,0 +1,111 @@
+import json
+import os
+import subprocess
+import sys
+
+import pandas as pd
+
+from src.analysis.aggregate_store import AggregateStore
+from src.analysis.heavy_hitters import KeywordHeavyHitters
+from src.analyzer.keyword_models import StreamingKeywordExtractor
+from src.analyzer.sentiment_analysis import SentimentEngine
+from src.database.backends import SQLiteBackend
+from src.pipeline.chunked import ChunkProcessor
+from src.pipeline.columnar import StageWriter, read_stage
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+WORDS = ["app", "login", "slow", "crash", "transfer", "great", "update", "otp", "balance", "fee"]
+
+
+def stub_classifier(texts, **kwargs):
+    return [{'label': 'NEGATIVE' if 'crash' in t else 'POSITIVE', 'score': 0.9} for t in texts]
+
+
+def stub_preprocess(texts):
+    return [t.lower() for t in texts]
+
+
+def make_chunk(start, size, length=40):
+    rows = range(start, start + size)
+    return pd.DataFrame({
+        'review_id': [f"r{i}" for i in rows],
+        'review': [" ".join(WORDS[(i * 7 + k) % len(WORDS)] for k in range(length)) + f" #{i % 50}"
+                   for i in rows],
+        'rating': [i % 5 + 1 for i in rows],
+        'date': [f"2024-0{i % 9 + 1}-1{i % 10}" for i in rows],
+        'bank': [["CBE", "BOA", "Dashen"][i % 3] for i in rows],
+        'source': "Google Play",
+    })
+
+
+def processor(**sinks):
+    return ChunkProcessor(SentimentEngine(classifier=stub_classifier),
+                          preprocess=stub_preprocess, **sinks)
+
+
+def test_chunks_reach_every_sink(tmp_path):
+    out = str(tmp_path / "themed.csv")
+    hitters = KeywordHeavyHitters(capacity=50)
+    with AggregateStore(str(tmp_path / "agg.sqlite")) as store, \
+            SQLiteBackend(str(tmp_path / "reviews.sqlite")) as backend, StageWriter(out) as writer:
+        stats = processor(store=store, hitters=hitters, backend=backend, writer=writer).run(
+            make_chunk(i, min(100, 250 - i)) for i in range(0, 250, 100))
+        assert store.summary()['review_count'].sum() == 250
+        assert backend.connection.execute("SELECT COUNT(*) FROM reviews").fetchone()[0] == 250
+
+    assert (stats['rows'], stats['chunks']) == (250, 3)
+    assert stats['peak_rss_mb'] > 0
+    themed = read_stage(out)
+    assert len(themed) == 250
+    assert {'sentiment_label', 'keywords', 'identified_theme(s)'} <= set(themed.columns)
+    assert sum(s.total for s in hitters.sketches.values()) == themed['keywords'].map(len).sum()
+
+
+def test_rerunning_the_same_input_leaves_aggregates_unchanged(tmp_path):
+    keywords, hitters = StreamingKeywordExtractor(n_features=2 ** 12), KeywordHeavyHitters(capacity=50)
+    snapshots = []
+    with AggregateStore(str(tmp_path / "agg.sqlite")) as store:
+        for _ in range(2):
+            processor(keywords=keywords, store=store, hitters=hitters).run(
+                make_chunk(i, 50) for i in range(0, 150, 50))
+            snapshots.append((store.summary().to_dict(), store.keyword_frequencies(),
+                              keywords.n_docs, keywords.doc_freq.sum(),
+                              {key: s.to_dict() for key, s in hitters.sketches.items()}))
+    assert snapshots[0] == snapshots[1]
+    assert sum(snapshots[0][0]['review_count'].values()) == keywords.n_docs == 150
+
+
+MEASURE = """
+import json, sys
+sys.path.insert(0, {root!r})
+from tests.test_chunked import make_chunk, processor
+from src.analysis.aggregate_store import AggregateStore
+from src.analysis.heavy_hitters import KeywordHeavyHitters
+from src.pipeline.chunked import peak_rss_mb
+
+rows, chunk_size = {rows}, {chunk_size}
+make_chunk(0, chunk_size)  # warm up imports before the baseline reading
+with AggregateStore({store!r}) as store:
+    proc = processor(store=store, hitters=KeywordHeavyHitters(capacity=200))
+    proc.process(make_chunk(0, chunk_size))
+    baseline = peak_rss_mb()
+    stats = proc.run(make_chunk(i, chunk_size) for i in range(chunk_size, rows, chunk_size))
+print(json.dumps({{'baseline': baseline, 'peak': stats['peak_rss_mb']}}))
+"""
+
+
+def measure(tmp_path, rows, chunk_size):
+    script = MEASURE.format(root=ROOT, rows=rows, chunk_size=chunk_size,
+                            store=str(tmp_path / f"agg_{rows}.sqlite"))
+    out = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                         check=True, cwd=ROOT).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_peak_memory_does_not_grow_with_input_size(tmp_path):
+    small = measure(tmp_path, 4_000, 1_000)
+    large = measure(tmp_path, 32_000, 1_000)
+    # 8x the reviews, same chunk size: the peak stays where the first chunk put it
+    assert large['peak'] - large['baseline'] < 10
+    assert large['peak'] - small['peak'] < 10
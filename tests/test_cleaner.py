@@ -30,3 +30,25 @@ def test_date_format():
     df = pd.read_csv(path)
     # Quick check: date strings are 10 chars long (YYYY-MM-DD)
     assert df["date"].str.len().eq(10).all(), "Date format is incorrect"
+
+def test_clean_review_data_from_raw(tmp_path):
+    import json
+    from src.preprocessor.cleaner import clean_review_data
+
+    raw = [
+        {"content": "  Great app ", "score": 5, "at": "2025-06-18"},
+        {"content": "Slow", "score": 2, "at": "2025-06-17 08:15:00"},
+        {"content": "No date", "score": 3, "at": None},
+        {"content": "Odd date", "score": 4, "at": "June 3, 2025"},
+        {"score": 1, "at": "2025-01-01"},
+        {"content": "No rating", "at": "2025-01-02"},
+    ]
+    for filename in ["cbe_reviews.json", "boa_reviews.json"]:
+        with open(os.path.join(tmp_path, filename), "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+
+    df = clean_review_data(str(tmp_path), os.path.join(tmp_path, "cleaned.csv"), max_workers=2)
+    cbe = df[df["bank"] == "CBE"]
+    assert cbe["review"].tolist() == ["Great app", "Slow", "Odd date", ""]
+    assert cbe["date"].tolist() == ["2025-06-18", "2025-06-17", "2025-06-03", "2025-01-01"]
+    assert len(df) == 8 and set(df["bank"]) == {"CBE", "BOA"}
@@ -0,0 +1,29 @@
+import os
+
+import pyarrow.parquet as pq
+
+from src.pipeline.columnar import SCHEMA, read_stage, write_stage
+
+THEMES_CSV = "data/processed/reviews_with_themes.csv"
+
+def test_parquet_round_trip_keeps_types(tmp_path):
+    df = read_stage(THEMES_CSV)
+    path = os.path.join(tmp_path, "reviews_with_themes.parquet")
+    write_stage(df, path)
+
+    stored = pq.read_schema(path)
+    for name in ["bank", "sentiment_label", "keywords", "date", "rating"]:
+        assert stored.field(name).type == SCHEMA.field(name).type, f"Wrong type for {name}"
+
+    back = read_stage(path)
+    assert len(back) == len(df)
+    assert str(back["bank"].dtype) == "category"
+    assert back["keywords"].tolist() == df["keywords"].tolist(), "Keywords should be real lists"
+
+def test_projection_reads_only_requested_columns(tmp_path):
+    path = os.path.join(tmp_path, "reviews.parquet")
+    write_stage(read_stage(THEMES_CSV), path)
+    for source in [THEMES_CSV, path]:
+        df = read_stage(source, columns=["bank", "keywords"])
+        assert list(df.columns) == ["bank", "keywords"]
+        assert all(isinstance(k, list) for k in df["keywords"])
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+from matplotlib import cbook
+
+from src.analysis.aggregate_store import AggregateStore
+from src.visualization import create_plots
+from src.visualization.create_plots import (PLOT_OPTIONS, figure_jobs, fingerprint, plot_inputs,
+                                            plot_inputs_from_store, rating_box_stats, render_figures)
+
+OPTIONS = dict(PLOT_OPTIONS, dpi=20)
+SOURCE = create_plots._function_source
+
+
+def reviews():
+    return pd.DataFrame({
+        'bank': ['CBE', 'CBE', 'BOA', 'Dashen'],
+        'date': ['2025-05-01', '2025-06-02', '2025-06-03', '2025-06-04'],
+        'rating': [5, 4, 1, 3],
+        'sentiment_label': ['POSITIVE', 'POSITIVE', 'NEGATIVE', 'NEGATIVE'],
+        'sentiment_score': [0.9, 0.8, 0.95, 0.6],
+        'identified_theme(s)': ['Other', 'Customer Support', 'Other', 'Other'],
+        'keywords': [['good', 'app'], ['fast'], ['slow'], ['crash']],
+    })
+
+
+def test_only_changed_figures_are_redrawn(tmp_path):
+    out = str(tmp_path)
+    jobs = figure_jobs(plot_inputs(reviews()))
+    first = render_figures(jobs, out, OPTIONS, max_workers=2)
+    assert all(seconds is not None for seconds in first.values())
+    assert all(os.path.exists(os.path.join(out, f)) for f in first)
+
+    assert all(seconds is None for seconds in render_figures(jobs, out, OPTIONS).values())
+
+    changed = reviews()
+    changed.at[2, 'keywords'] = ['slow', 'login']
+    timings = render_figures(figure_jobs(plot_inputs(changed)), out, OPTIONS)
+    assert [f for f, seconds in timings.items() if seconds is not None] == ['keywords_cloud_boa.png']
+
+
+def test_fingerprint_covers_options():
+    name, data = figure_jobs(plot_inputs(reviews()))[0][1:]
+    assert fingerprint(name, data, OPTIONS) == fingerprint(name, data, dict(OPTIONS))
+    assert fingerprint(name, data, OPTIONS) != fingerprint(name, data, dict(OPTIONS, dpi=30))
+
+
+def test_fingerprint_covers_helpers_and_constants(monkeypatch):
+    jobs = {job[1]: job[2] for job in figure_jobs(plot_inputs(reviews()))}
+    before = {name: fingerprint(name, jobs[name], OPTIONS)
+              for name in ('rating_distribution', 'keywords_cloud', 'theme_analysis')}
+
+    monkeypatch.setattr(create_plots, 'WORDCLOUD_WORDS', 20)
+    monkeypatch.setattr(create_plots, '_function_source', lambda f: (
+        "changed" if f is create_plots._weighted_quantile else SOURCE(f)))
+    after = {name: fingerprint(name, jobs[name], OPTIONS) for name in before}
+    assert after['rating_distribution'] != before['rating_distribution']
+    assert after['keywords_cloud'] != before['keywords_cloud']
+    assert after['theme_analysis'] == before['theme_analysis']
+
+
+def test_box_stats_from_histogram_match_matplotlib():
+    rng = np.random.default_rng(0)
+    ratings = pd.Series(rng.choice([1, 2, 3, 4, 5], 997, p=[0.3, 0.05, 0.05, 0.1, 0.5]))
+    histogram = ratings.value_counts().sort_index().to_frame('Bank').T
+
+    (stats,) = rating_box_stats(histogram)
+    (expected,) = cbook.boxplot_stats(ratings.to_numpy())
+    for key in ['q1', 'med', 'q3', 'whislo', 'whishi']:
+        assert stats[key] == expected[key]
+    assert set(stats['fliers']) == set(expected['fliers'])
+
+
+def test_store_inputs_match_frame_inputs(tmp_path):
+    df = reviews()
+    with AggregateStore(str(tmp_path / "store.sqlite")) as store:
+        store.add(df)
+        from_store = plot_inputs_from_store(store)
+    from_frame = plot_inputs(df)
+
+    assert from_store['keyword_frequencies'] == from_frame['keyword_frequencies']
+    assert from_store['rating_histogram'].to_dict() == from_frame['rating_histogram'].to_dict()
+    assert from_store['monthly_sentiment'].to_dict() == from_frame['monthly_sentiment'].to_dict()
+    assert from_store['avg_sentiment'].round(9).to_dict() == from_frame['avg_sentiment'].round(9).to_dict()
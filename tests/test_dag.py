@@ -0,0 +1,99 @@
+import threading
+
+import pytest
+
+from src.pipeline.dag import Pipeline, Stage, code_modules
+from src.pipeline.stages import build_pipeline
+
+
+def build(tmp_path, calls, barrier=None, fail=()):
+    raw, mid = tmp_path / "raw.txt", tmp_path / "mid.txt"
+    left, right = tmp_path / "left.txt", tmp_path / "right.txt"
+
+    def step(name, src, dst):
+        def run():
+            calls.append(name)
+            if name in fail:
+                raise RuntimeError("boom")
+            if barrier is not None and name in ("left", "right"):
+                barrier.wait(timeout=5)  # both branches must be running at once
+            dst.write_text(src.read_text().upper())
+        return run
+
+    return Pipeline([
+        Stage("mid", step("mid", raw, mid), inputs=[str(raw)], outputs=[str(mid)]),
+        Stage("left", step("left", mid, left), inputs=[str(mid)], outputs=[str(left)]),
+        Stage("right", step("right", mid, right), inputs=[str(mid)], outputs=[str(right)],
+              params={"n": 1}),
+    ], state_path=str(tmp_path / "state.json")), raw
+
+
+def test_runs_in_order_then_skips_up_to_date_stages(tmp_path):
+    calls = []
+    pipeline, raw = build(tmp_path, calls, barrier=threading.Barrier(2))
+    raw.write_text("a")
+
+    results = pipeline.run(max_workers=2)
+    assert calls[0] == "mid" and sorted(calls[1:]) == ["left", "right"]
+    assert {name: status for name, (status, _) in results.items()} == {
+        "mid": "ran", "left": "ran", "right": "ran"}
+
+    calls.clear()
+    pipeline, _ = build(tmp_path, calls)
+    assert all(status == "skipped" for status, _ in pipeline.run().values())
+    assert calls == []
+
+    raw.write_text("b")
+    pipeline.run()
+    assert calls[0] == "mid" and sorted(calls[1:]) == ["left", "right"]
+
+
+def test_unchanged_upstream_output_keeps_downstream_skipped(tmp_path):
+    calls = []
+    pipeline, raw = build(tmp_path, calls)
+    raw.write_text("a")
+    pipeline.run()
+
+    calls.clear()
+    pipeline.run(force=True, targets=["mid"])
+    pipeline.run()
+    assert calls == ["mid"]
+
+
+def test_failure_blocks_downstream_only(tmp_path):
+    calls = []
+    pipeline, raw = build(tmp_path, calls, fail=("mid",))
+    raw.write_text("a")
+    results = pipeline.run()
+    assert results["mid"][0] == "failed"
+    assert results["left"][0] == results["right"][0] == "blocked"
+
+
+def test_review_pipeline_graph():
+    deps = build_pipeline().dependencies()
+    assert deps["clean"] == {"scrape"}
+    assert deps["themes"] == {"sentiment"}
+    assert deps["insights"] == deps["plots"] == deps["load"] == {"themes"}
+    with pytest.raises(KeyError):
+        build_pipeline()._selected(["nope"], deps)
+
+
+def test_stage_code_follows_imports():
+    stages = build_pipeline().stages
+    assert {"src.analyzer.sentiment_cache", "src.pipeline.columnar"} <= set(code_modules(stages["sentiment"]))
+    assert {"src.analysis.aggregate_store", "src.pipeline.stages"} <= set(code_modules(stages["insights"]))
+    assert "src.analyzer.theme_matcher" in code_modules(stages["themes"])
+
+
+def test_oracle_load_failure_fails_the_stage(tmp_path, monkeypatch):
+    from src.database import load_to_oracle
+
+    monkeypatch.setattr(load_to_oracle, "DB_DSN", "localhost:1/NOPE")
+    pipeline = build_pipeline("oracle", state_path=str(tmp_path / "state.json"))
+    upstream = ["scrape", "clean", "sentiment", "themes"]
+    assert pipeline.run(targets=["load"], skip=upstream)["load"][0] == "failed"
+    assert pipeline.run(targets=["load"], skip=upstream)["load"][0] == "failed"
+
+    monkeypatch.setattr(load_to_oracle, "DB_DSN", "otherhost:1521/XEPDB1")
+    moved = build_pipeline("oracle", state_path=str(tmp_path / "state.json"))
+    assert moved.fingerprint(moved.stages["load"]) != pipeline.fingerprint(pipeline.stages["load"])
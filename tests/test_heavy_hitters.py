@@ -0,0 +1,74 @@
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+
+from src.analysis.heavy_hitters import KeywordHeavyHitters, SpaceSaving
+
+
+def zipf_stream(n=50_000, vocabulary=5_000, seed=0):
+    rng = np.random.default_rng(seed)
+    return [f"w{i}" for i in np.minimum(rng.zipf(1.3, n), vocabulary)]
+
+
+def assert_within_bounds(sketch, exact):
+    for item, true_count in exact.items():
+        if true_count > sketch.error_bound:
+            assert item in sketch.counts  # heavy items are never dropped
+    for item, estimate in sketch.counts.items():
+        assert exact[item] - sketch.slack <= estimate <= exact[item] + sketch.error_bound
+        assert estimate - sketch.errors[item] <= exact[item]
+
+
+def test_space_saving_matches_exact_counts_within_bound():
+    stream = zipf_stream()
+    exact = Counter(stream)
+    sketch = SpaceSaving.for_error(0.005)
+    sketch.update_many(stream)
+
+    assert sketch.capacity == 200
+    assert sketch.total == len(stream)
+    assert sketch.error_bound <= len(stream) / 200
+    assert_within_bounds(sketch, exact)
+    expected = [item for item, _ in exact.most_common(5)]
+    assert [item for item, _ in sketch.top(5)] == expected
+    guaranteed = [item for item, _ in sketch.guaranteed(5)]
+    assert guaranteed and guaranteed == expected[:len(guaranteed)]
+
+
+def test_merged_shards_keep_the_bound():
+    stream = zipf_stream(seed=1)
+    shards = [SpaceSaving(200) for _ in range(4)]
+    for i, item in enumerate(stream):
+        shards[i % 4].update(item)
+
+    merged = shards[0]
+    for shard in shards[1:]:
+        merged = merged.merge(shard)
+
+    exact = Counter(stream)
+    assert merged.total == len(stream) == sum(merged.counts.values())
+    assert merged.error_bound <= 2 * len(stream) / 200
+    assert_within_bounds(merged, exact)
+    assert [item for item, _ in merged.top(3)] == [item for item, _ in exact.most_common(3)]
+
+
+def test_keyword_heavy_hitters_persist_and_merge(tmp_path):
+    df = pd.DataFrame({
+        'bank': ['CBE', 'CBE', 'BOA', 'CBE'],
+        'sentiment_label': ['POSITIVE', 'POSITIVE', 'NEGATIVE', 'NEGATIVE'],
+        'keywords': [['good', 'app'], ['good'], ['slow'], ['crash', 'app']],
+    })
+    hitters = KeywordHeavyHitters(capacity=10)
+    hitters.update(df.iloc[:2])
+    other = KeywordHeavyHitters(capacity=10)
+    other.update(df.iloc[2:])
+
+    path = str(tmp_path / "sketch.json")
+    hitters.merge(other).save(path)
+    loaded = KeywordHeavyHitters.load(path)
+
+    assert loaded.top('CBE', 'POSITIVE') == [('good', 2), ('app', 1)]
+    assert loaded.top('CBE', 'NEGATIVE') == [('app', 1), ('crash', 1)]
+    assert loaded.top('BOA', 'NEGATIVE') == [('slow', 1)]
+    assert loaded.top('Dashen', 'POSITIVE') == []
@@ -0,0 +1,69 @@
+import json
+import os
+
+from src.scraper.incremental import SeenIndex, append_json_array
+from src.scraper.playstore_scraper import scrape_reviews
+
+
+def make_fake_store(review_ids, page_size=3):
+    """reviews()-compatible fake over a newest-first list of IDs; counts calls."""
+    calls = []
+
+    def fake_reviews(app_package, continuation_token=None, **kwargs):
+        calls.append(continuation_token)
+        start = continuation_token or 0
+        page = [{"reviewId": rid, "content": f"review {rid}", "score": 4, "at": "2025-06-01"}
+                for rid in review_ids[start:start + page_size]]
+        end = start + page_size
+        return page, (end if end < len(review_ids) else None)
+
+    return fake_reviews, calls
+
+def test_append_json_array(tmp_path):
+    path = os.path.join(tmp_path, "reviews.json")
+    append_json_array(path, [{"a": 1}])
+    append_json_array(path, [{"a": 2}, {"a": 3}])
+    with open(path, encoding="utf-8") as f:
+        assert [r["a"] for r in json.load(f)] == [1, 2, 3]
+
+def test_seen_index_persists(tmp_path):
+    path = os.path.join(tmp_path, "app_seen.idx")
+    index = SeenIndex(path)
+    assert index.add_many(["x", "y", "x"]) == 2, "Duplicates should be ignored"
+    reloaded = SeenIndex(path)
+    assert "x" in reloaded and "y" in reloaded and "z" not in reloaded
+    assert os.path.getsize(path) == 16, "Expected 8 bytes per stored ID"
+
+def test_incremental_scrape_only_fetches_new(tmp_path):
+    history = [f"r{i}" for i in range(12, 0, -1)]  # newest first
+    fetch, calls = make_fake_store(history)
+    scrape_reviews("app", "com.fake", 100, fetch=fetch, pause=0,
+                   out_dir=str(tmp_path), incremental=True)
+    assert len(calls) == 4, "First run should page through the whole history"
+
+    fetch, calls = make_fake_store(["r14", "r13"] + history)
+    scrape_reviews("app", "com.fake", 100, fetch=fetch, pause=0,
+                   out_dir=str(tmp_path), incremental=True)
+    assert len(calls) == 1, "Second run should stop once it reaches known reviews"
+
+    with open(os.path.join(tmp_path, "app_reviews.json"), encoding="utf-8") as f:
+        ids = [r["reviewId"] for r in json.load(f)]
+    assert len(ids) == len(set(ids)) == 14, "Reviews should be appended without duplicates"
+    with open(os.path.join(tmp_path, "app_watermark.json"), encoding="utf-8") as f:
+        assert json.load(f)["reviewId"] == "r14"
+
+def test_full_scrape_then_incremental(tmp_path):
+    history = [f"r{i}" for i in range(9, 0, -1)]
+    for fmt in ("json", "ndjson"):
+        out_dir = str(tmp_path / fmt)
+        fetch, _ = make_fake_store(history)
+        scrape_reviews("app", "com.fake", 100, fetch=fetch, pause=0, out_dir=out_dir, fmt=fmt)
+        fetch, calls = make_fake_store(["r10"] + history)
+        scrape_reviews("app", "com.fake", 100, fetch=fetch, pause=0, out_dir=out_dir, fmt=fmt,
+                       incremental=True)
+        assert len(calls) == 1, "The full scrape's watermark should stop paging"
+        assert len(SeenIndex(os.path.join(out_dir, "app_seen.idx"))) == 10
+
+    with open(os.path.join(tmp_path, "json", "app_reviews.json"), encoding="utf-8") as f:
+        ids = [r["reviewId"] for r in json.load(f)]
+    assert len(ids) == len(set(ids)) == 10
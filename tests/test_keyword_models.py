@@ -0,0 +1,67 @@
+import os
+
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from src.analyzer.keyword_models import (
+    FittedKeywordExtractor, StreamingKeywordExtractor)
+from src.analyzer.thematic_analysis import extract_keywords, extract_keywords_incremental
+from src.pipeline.columnar import read_stage
+
+THEMES_CSV = "data/processed/reviews_with_themes.csv"
+
+def load_processed():
+    return read_stage(THEMES_CSV, columns=["processed_review"])["processed_review"].fillna("").tolist()
+
+def test_saved_vocabulary_reproduces_refit(tmp_path):
+    texts = load_processed()
+    path = os.path.join(tmp_path, "vocab.json")
+    FittedKeywordExtractor.fit(texts).save(path)
+    loaded = FittedKeywordExtractor.load(path)
+    assert loaded.keywords(texts, chunk_size=200) == extract_keywords(texts)
+
+def test_hashing_single_chunk_matches_uncapped_tfidf():
+    texts = load_processed()
+    vectorizer = TfidfVectorizer(ngram_range=(1, 2))
+    X = vectorizer.fit_transform(texts).tocsr()
+    vocab = vectorizer.vocabulary_
+    got = StreamingKeywordExtractor().keywords(texts, chunk_size=len(texts))
+
+    # Compare the scores of the chosen terms, since ties may pick different terms
+    same = 0
+    for i, keywords in enumerate(got):
+        row = X.getrow(i)
+        best = sorted(row.data, reverse=True)[:3]
+        chosen = sorted((row[0, vocab[k]] for k in keywords), reverse=True)
+        same += all(abs(a - b) < 1e-9 for a, b in zip(best, chosen)) and len(best) == len(chosen)
+    assert same / len(texts) > 0.99, "Hash collisions should be rare"
+
+def test_hashing_state_accumulates_and_persists(tmp_path):
+    texts = load_processed()
+    path = os.path.join(tmp_path, "state.npz")
+    extractor = StreamingKeywordExtractor(n_features=2 ** 16)
+    extractor.keywords(texts[:700], chunk_size=256)
+    extractor.save(path)
+
+    resumed = StreamingKeywordExtractor.load(path)
+    assert resumed.n_docs == 700 and resumed.n_features == 2 ** 16
+    keywords = resumed.keywords(texts[700:], chunk_size=256)
+    assert resumed.n_docs == len(texts)
+    analyzer = TfidfVectorizer(ngram_range=(1, 2)).build_analyzer()
+    assert all(set(k) <= set(analyzer(t)) for k, t in zip(keywords, texts[700:])), \
+        "Keywords must come from the review text"
+
+def test_hashing_rerun_on_same_reviews_keeps_idf(tmp_path):
+    texts = load_processed()[:500]
+    keys = [f"r{i}" for i in range(len(texts))]
+    path = os.path.join(tmp_path, "state.npz")
+    first = extract_keywords_incremental(texts, 'hashing', path, chunk_size=128, keys=keys)
+    state = StreamingKeywordExtractor.load(path)
+
+    second = extract_keywords_incremental(texts, 'hashing', path, chunk_size=128, keys=keys)
+    rerun = StreamingKeywordExtractor.load(path)
+    assert rerun.n_docs == state.n_docs == len(texts)
+    assert (rerun.doc_freq == state.doc_freq).all()
+
+    extract_keywords_incremental(texts[:50], 'hashing', path, keys=[f"new{i}" for i in range(50)])
+    assert StreamingKeywordExtractor.load(path).n_docs == len(texts) + 50
+    assert len(second) == len(first)
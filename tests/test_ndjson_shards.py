@@ -0,0 +1,58 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.preprocessor.cleaner import clean_shards
+from src.scraper.ndjson_shards import ShardWriter, iter_shard_records, list_shards
+from src.scraper.playstore_scraper import scrape_reviews
+
+
+def fake_reviews(app_package, continuation_token=None, **kwargs):
+    page = continuation_token or 0
+    batch = [{"reviewId": f"{page}-{i}", "content": f" review {page}-{i} ",
+              "score": 3, "at": "2025-06-0%d" % (page + 1)} for i in range(50)]
+    return batch, (page + 1 if page < 3 else None)
+
+def test_shards_rotate_and_read_back(tmp_path):
+    with ShardWriter(str(tmp_path), "app", max_bytes=1024) as writer:
+        writer.write_many({"reviewId": str(i), "content": "x" * 40} for i in range(100))
+    shard_dir = os.path.join(tmp_path, "app")
+    assert len(list_shards(shard_dir)) > 1, "Expected several size-bounded shards"
+    assert [r["reviewId"] for r in iter_shard_records(shard_dir)] == [str(i) for i in range(100)]
+
+def test_ndjson_scrape_then_clean(tmp_path):
+    raw_dir = os.path.join(tmp_path, "raw")
+    scrape_reviews("cbe", "com.fake", 180, fetch=fake_reviews, pause=0,
+                   out_dir=raw_dir, fmt="ndjson", shard_bytes=4096)
+    output_csv = os.path.join(tmp_path, "cleaned.csv")
+    total = clean_shards(raw_dir, output_csv, chunk_size=64)
+
+    df = pd.read_csv(output_csv)
+    assert total == len(df) == 180
+    assert (df["bank"] == "CBE").all()
+    assert df["review"].str.startswith("review").all(), "Review text should be stripped"
+
+def test_full_rescrape_replaces_shards(tmp_path):
+    raw_dir = os.path.join(tmp_path, "raw")
+    for _ in range(2):
+        scrape_reviews("cbe", "com.fake", 180, fetch=fake_reviews, pause=0,
+                       out_dir=raw_dir, fmt="ndjson", shard_bytes=4096)
+    assert len(list(iter_shard_records(os.path.join(raw_dir, "cbe")))) == 180
+
+def test_failed_full_rescrape_keeps_previous_shards(tmp_path):
+    raw_dir = os.path.join(tmp_path, "raw")
+    scrape_reviews("cbe", "com.fake", 180, fetch=fake_reviews, pause=0,
+                   out_dir=raw_dir, fmt="ndjson", shard_bytes=4096)
+
+    def failing_reviews(app_package, continuation_token=None, **kwargs):
+        if continuation_token:
+            raise ConnectionError("network down")
+        return fake_reviews(app_package, continuation_token, **kwargs)
+
+    with pytest.raises(ConnectionError):
+        scrape_reviews("cbe", "com.fake", 180, fetch=failing_reviews, pause=0,
+                       out_dir=raw_dir, fmt="ndjson", shard_bytes=4096)
+    assert len(list(iter_shard_records(os.path.join(raw_dir, "cbe")))) == 180
+    assert sorted(os.listdir(raw_dir)) == ["cbe", "cbe_seen.idx", "cbe_watermark.json"], \
+        "Staging files should be cleaned up"
@@ -0,0 +1,50 @@
+import pytest
+
+from src.database.backends import SQLiteBackend, split_themes
+from src.database.load_to_oracle import CSV_PATH, load_reviews
+from src.database.queries import average_ratings, monthly_theme_counts, sentiment_mix, top_themes
+from src.pipeline.columnar import read_stage
+
+
+@pytest.fixture(scope="module")
+def loaded(tmp_path_factory):
+    db = str(tmp_path_factory.mktemp("db") / "reviews.sqlite")
+    with SQLiteBackend(db) as backend:
+        load_reviews(backend, CSV_PATH)
+    backend = SQLiteBackend(db)
+    yield backend.connection, read_stage(CSV_PATH)
+    backend.close()
+
+
+def test_average_ratings_match_pandas(loaded):
+    connection, df = loaded
+    result = average_ratings(connection).set_index("bank_name")
+    expected = df.groupby("bank", observed=True)["rating"].agg(["mean", "count"])
+    names = {"CBE": "Commercial Bank of Ethiopia", "BOA": "Bank of Abyssinia", "Dashen": "Dashen Bank"}
+    for code, stats in expected.iterrows():
+        row = result.loc[names[code]]
+        assert row["review_count"] == stats["count"]
+        assert row["avg_rating"] == pytest.approx(stats["mean"])
+
+
+def test_sentiment_mix_sums_to_100(loaded):
+    mix = sentiment_mix(loaded[0])
+    assert mix.groupby("bank_name")["pct"].sum().tolist() == pytest.approx([100.0] * 3)
+
+
+def test_top_themes_match_exploded_counts(loaded):
+    connection, df = loaded
+    result = top_themes(connection, limit=2)
+    assert result.groupby("bank_name").size().max() <= 2
+
+    themes = df[df["bank"] == "CBE"]["identified_theme(s)"].map(split_themes).explode()
+    expected = themes.value_counts()
+    cbe = result[result["bank_name"] == "Commercial Bank of Ethiopia"]
+    assert cbe["review_count"].tolist() == expected.head(2).tolist()
+
+
+def test_monthly_theme_counts_cover_every_theme_row(loaded):
+    connection, df = loaded
+    monthly = monthly_theme_counts(connection)
+    assert monthly["review_month"].str.match(r"^\d{4}-\d{2}$").all()
+    assert monthly["review_count"].sum() == df["identified_theme(s)"].map(split_themes).map(len).sum()
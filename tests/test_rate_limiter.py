@@ -0,0 +1,58 @@
+import json
+import os
+
+from src.scraper.playstore_scraper import scrape_all
+from src.scraper.rate_limiter import AdaptiveTokenBucket
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+def test_bucket_waits_for_refill():
+    clock = FakeClock()
+    bucket = AdaptiveTokenBucket(rate=2.0, capacity=1, clock=clock, sleep=clock.sleep)
+    bucket.acquire()  # burst token
+    bucket.acquire()  # has to wait for one refill at 2 tokens/s
+    assert abs(clock.now - 0.5) < 1e-9, "Second acquire should wait 1/rate seconds"
+
+def test_bucket_adapts_rate():
+    bucket = AdaptiveTokenBucket(rate=1.0, min_rate=0.1, max_rate=1.2, increase=0.1)
+    bucket.record_success()
+    bucket.record_success()
+    bucket.record_success()
+    assert bucket.rate == 1.2, "Rate should grow on success up to max_rate"
+    bucket.record_error()
+    assert abs(bucket.rate - 0.6) < 1e-9, "Rate should halve on error"
+    for _ in range(10):
+        bucket.record_error()
+    assert bucket.rate == 0.1, "Rate should not drop below min_rate"
+
+def test_scrape_all_with_fake_fetch(tmp_path):
+    calls = {"n": 0}
+
+    def flaky_reviews(app_package, continuation_token=None, **kwargs):
+        calls["n"] += 1
+        if calls["n"] == 1:
+            raise ConnectionError("rate limited")
+        page = continuation_token or 0
+        batch = [{"reviewId": f"{app_package}-{page}-{i}", "content": "ok",
+                  "score": 4, "at": "2025-06-01"} for i in range(3)]
+        return batch, (page + 1 if page < 1 else None)
+
+    limiter = AdaptiveTokenBucket(rate=100.0, capacity=10, max_rate=200.0)
+    packages = {"a": "com.fake.a", "b": "com.fake.b"}
+    saved = scrape_all(packages, total_reviews=10, max_workers=2,
+                       fetch=flaky_reviews, limiter=limiter, out_dir=str(tmp_path))
+
+    assert set(saved) == {"a", "b"}, "Every app should be saved"
+    for name in packages:
+        with open(os.path.join(tmp_path, f"{name}_reviews.json"), encoding="utf-8") as f:
+            assert len(json.load(f)) == 6, "Expected two pages of three reviews"
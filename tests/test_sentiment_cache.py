@@ -0,0 +1,49 @@
+import os
+
+from src.analyzer.sentiment_analysis import SentimentEngine
+from src.analyzer.sentiment_cache import SentimentCache
+
+
+class CountingClassifier:
+    def __init__(self):
+        self.seen = []
+
+    def __call__(self, texts, **kwargs):
+        self.seen.extend(texts)
+        return [{'label': 'POSITIVE', 'score': 0.9} for _ in texts]
+
+def test_rerun_only_scores_new_texts(tmp_path):
+    path = os.path.join(tmp_path, 'sentiment.sqlite')
+    stub = CountingClassifier()
+    engine = SentimentEngine(classifier=stub, cache=SentimentCache(path, 'm'))
+    engine.score(['Good app', 'good  APP', 'slow'])
+    assert sorted(stub.seen) == ['Good app', 'slow'], "Normalized duplicates should be scored once"
+
+    stub.seen.clear()
+    engine = SentimentEngine(classifier=stub, cache=SentimentCache(path, 'm'))
+    labels, _ = engine.score(['slow', 'good app', 'crashes'])
+    assert stub.seen == ['crashes'], "Only the cache miss should reach the model"
+    assert engine.cache_hits == 2 and labels == ['POSITIVE'] * 3
+
+def test_model_revision_is_part_of_key(tmp_path):
+    path = os.path.join(tmp_path, 'sentiment.sqlite')
+    assert SentimentCache(path, 'm', 'v1').key('x') != SentimentCache(path, 'm', 'v2').key('x')
+
+def test_eviction_keeps_newest(tmp_path):
+    cache = SentimentCache(os.path.join(tmp_path, 's.sqlite'), 'm', max_entries=2)
+    cache.put_many([('a', 'POSITIVE', 0.1)])
+    cache._conn.execute("UPDATE sentiment_cache SET last_used = 0")
+    cache.put_many([('b', 'POSITIVE', 0.2), ('c', 'NEGATIVE', 0.3)])
+    assert len(cache) == 2 and set(cache.get_many(['a', 'b', 'c'])) == {'b', 'c'}
+
+def test_eviction_counts_rows_only_when_over_limit(tmp_path, monkeypatch):
+    cache = SentimentCache(os.path.join(tmp_path, 's.sqlite'), 'm', max_entries=3)
+    counts = []
+    monkeypatch.setattr(SentimentCache, '__len__',
+                        lambda self: counts.append(1) or self._conn.execute(
+                            "SELECT COUNT(*) FROM sentiment_cache").fetchone()[0])
+    cache.put_many([('a', 'POSITIVE', 0.1), ('b', 'POSITIVE', 0.2)])
+    cache.put_many([('c', 'POSITIVE', 0.3)])
+    assert counts == []
+    cache.put_many([('d', 'NEGATIVE', 0.4)])
+    assert len(counts) == 1 and cache._rows == 3
@@ -0,0 +1,40 @@
+import pandas as pd
+
+from src.analyzer.sentiment_analysis import SentimentEngine
+
+
+class StubClassifier:
+    """Stands in for the transformers pipeline and records each batch."""
+
+    def __init__(self):
+        self.batches = []
+
+    def __call__(self, texts, **kwargs):
+        self.batches.append(list(texts))
+        return [{'label': 'NEGATIVE' if 'bad' in t else 'POSITIVE', 'score': len(t) / 100}
+                for t in texts]
+
+def test_results_keep_input_order():
+    texts = ['bad', 'a very long and very good review', 'ok', 'bad bad app here']
+    engine = SentimentEngine(batch_size=2, classifier=StubClassifier())
+    labels, scores = engine.score(texts)
+    assert labels == ['NEGATIVE', 'POSITIVE', 'POSITIVE', 'NEGATIVE']
+    assert scores == [len(t) / 100 for t in texts]
+    assert engine.last_throughput > 0
+
+def test_batches_are_length_sorted():
+    stub = StubClassifier()
+    texts = ['x' * n for n in [50, 1, 30, 2, 40, 3]]
+    SentimentEngine(batch_size=2, classifier=stub).score(texts)
+    assert [[len(t) for t in b] for b in stub.batches] == [[1, 2], [3, 30], [40, 50]]
+
+def test_annotate_adds_columns():
+    df = pd.DataFrame({'review': ['good app', 'bad app'], 'bank': ['CBE', 'BOA']})
+    out = SentimentEngine(classifier=StubClassifier()).annotate(df)
+    assert out['sentiment_label'].tolist() == ['POSITIVE', 'NEGATIVE']
+    assert 'sentiment_label' not in df.columns, "Input frame should not be modified"
+
+def test_quantized_mode_is_distinct_and_local_paths_stay_offline(tmp_path):
+    assert SentimentEngine(quantize=True).model_id != SentimentEngine().model_id
+    assert SentimentEngine(model=str(tmp_path)).local_files_only, "Local dirs must not hit the network"
+    assert not SentimentEngine().local_files_only
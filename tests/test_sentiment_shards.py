@@ -0,0 +1,46 @@
+import os
+
+import pandas as pd
+
+from src.analyzer.sentiment_shards import _run_fingerprint, score_sharded
+from src.analyzer.sentiment_analysis import MODEL_NAME
+from src.analyzer.sentiment_cache import SentimentCache
+from src.pipeline.columnar import write_stage
+
+
+class LengthClassifier:
+    """Picklable stub: label by text length."""
+
+    def __call__(self, texts, **kwargs):
+        return [{'label': 'POSITIVE' if len(t) > 3 else 'NEGATIVE', 'score': 0.5} for t in texts]
+
+def test_sharded_scoring_matches_input_order(tmp_path):
+    texts = pd.Series(['good app'] * 7 + ['bad'] * 6)
+    labels, scores = score_sharded(texts, num_workers=2, shard_size=4,
+                                   checkpoint_dir=str(tmp_path),
+                                   engine_kwargs={'classifier': LengthClassifier()})
+    assert labels == ['POSITIVE'] * 7 + ['NEGATIVE'] * 6
+    assert len(scores) == 13
+    assert os.listdir(tmp_path) == [], "Checkpoints are removed after a successful run"
+
+def test_finished_shards_are_not_rescored(tmp_path):
+    texts = pd.Series(['good app', 'fine', 'bad', 'meh', 'great'])
+    run_dir = os.path.join(tmp_path, _run_fingerprint(texts, MODEL_NAME))
+    os.makedirs(run_dir)
+    # Pretend shard 0 finished before a crash
+    write_stage(pd.DataFrame({'sentiment_label': ['CACHED'] * 2, 'sentiment_score': [1.0] * 2}),
+                os.path.join(run_dir, 'shard-00000.parquet'))
+
+    labels, _ = score_sharded(texts, num_workers=2, shard_size=2,
+                              checkpoint_dir=str(tmp_path),
+                              engine_kwargs={'classifier': LengthClassifier()},
+                              keep_checkpoints=True)
+    assert labels == ['CACHED', 'CACHED', 'NEGATIVE', 'NEGATIVE', 'POSITIVE']
+    assert len(os.listdir(run_dir)) == 3
+
+def test_workers_share_the_sentiment_cache(tmp_path):
+    cache_path = os.path.join(tmp_path, 'sentiment.sqlite')
+    texts = pd.Series(['good app', 'fine', 'bad', 'meh', 'great'])
+    score_sharded(texts, num_workers=2, shard_size=2, checkpoint_dir=str(tmp_path / 'ckpt'),
+                  engine_kwargs={'classifier': LengthClassifier()}, cache_path=cache_path)
+    assert len(SentimentCache(cache_path, MODEL_NAME)) == 5
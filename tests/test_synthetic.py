@@ -0,0 +1,47 @@
+import pytest
+
+from benchmarks import bench_pipeline
+from benchmarks.bench_pipeline import compare, save_baseline
+from benchmarks.synthetic import SyntheticCorpus
+from src.preprocessor.cleaner import iter_clean_chunks
+
+
+def test_corpus_is_deterministic_and_cleans(tmp_path):
+    corpus = SyntheticCorpus(seed=3)
+    first = list(corpus.records('boa', 500))
+    assert first == list(SyntheticCorpus(seed=3).records('boa', 500))
+    assert first != list(SyntheticCorpus(seed=4).records('boa', 500))
+
+    counts = corpus.write_shards(str(tmp_path), 5000)
+    assert counts == {'cbe': 1700, 'boa': 1700, 'dashen': 1600}
+    cleaned = [df for df in iter_clean_chunks(str(tmp_path), 2000)]
+    reviews = sum(len(df) for df in cleaned)
+    assert reviews == 5000
+    lengths = [len(r) for df in cleaned for r in df['review']]
+    assert max(lengths) <= 500 and sorted(lengths)[reviews // 2] < 60
+    duplicates = reviews - len({r for df in cleaned for r in df['review']})
+    assert 0.1 < duplicates / reviews < 0.4
+
+    corpus.write_shards(str(tmp_path), 300)
+    assert sum(len(df) for df in iter_clean_chunks(str(tmp_path), 2000)) == 300
+
+
+def test_compare_flags_slower_or_larger_runs():
+    baseline = {'clean@10': {'rows_per_s': 1000.0, 'peak_rss_mb': 100.0}}
+    assert compare({'clean@10': {'rows_per_s': 900.0, 'peak_rss_mb': 110.0}}, baseline) == []
+    assert len(compare({'clean@10': {'rows_per_s': 500.0, 'peak_rss_mb': 200.0}}, baseline)) == 2
+    assert compare({'themes@10': {'rows_per_s': 1.0, 'peak_rss_mb': 1e6}}, baseline) == []
+
+
+def test_compare_without_a_matching_baseline_fails(tmp_path, monkeypatch):
+    path = str(tmp_path / "baseline.json")
+    results = {'clean@10': {'rows_per_s': 1000.0, 'peak_rss_mb': 100.0}}
+    monkeypatch.setattr(bench_pipeline, 'run_suite', lambda *args: results)
+    monkeypatch.setattr('sys.argv', ['bench_pipeline', '--sizes', '10', '--baseline', path])
+    with pytest.raises(SystemExit, match="No baseline"):
+        bench_pipeline.main()
+
+    config = {'stub_model': True, 'stub_nlp': False, 'seed': 0, 'format': 'csv'}
+    save_baseline(config, results, path)
+    with pytest.raises(SystemExit, match="recorded with"):
+        bench_pipeline.main()
@@ -0,0 +1,30 @@
+import pandas as pd
+
+from src.analyzer.sentiment_analysis import SentimentEngine
+from src.analyzer.text_dedup import CollapsedTexts, normalize_review
+
+
+def test_normalize_review_folds_noise():
+    assert normalize_review("Nice app!!") == normalize_review("  nice   APP. ") == "nice app"
+    assert normalize_review("👍👍👍") == normalize_review("👍🏽") == "👍"
+    assert normalize_review("not good 👎") != normalize_review("good 👍")
+
+def test_collapse_and_expand_round_trip():
+    texts = ["good", "Good!", "slow app", "GOOD", "slow  app", "crash"]
+    collapsed = CollapsedTexts(texts)
+    assert collapsed.unique == ["good", "slow app", "crash"]
+    assert collapsed.expand([t.upper() for t in collapsed.unique]) == \
+        ["GOOD", "GOOD", "SLOW APP", "GOOD", "SLOW APP", "CRASH"]
+    assert collapsed.ratio == 0.5
+
+def test_sentiment_runs_once_per_unique_text():
+    seen = []
+
+    def classifier(texts, **kwargs):
+        seen.extend(texts)
+        return [{"label": "POSITIVE", "score": 0.9} for _ in texts]
+
+    df = pd.DataFrame({"review": ["nice app", "Nice app!", "👍", "👍👍", "bad"]})
+    out = SentimentEngine(classifier=classifier).annotate(df)
+    assert sorted(seen) == sorted(["nice app", "👍", "bad"])
+    assert out["sentiment_label"].tolist() == ["POSITIVE"] * 5
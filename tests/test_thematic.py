@@ -0,0 +1,59 @@
+import pandas as pd
+import spacy
+from spacy.language import Language
+
+from src.analyzer.keyword_models import StreamingKeywordExtractor
+from src.analyzer.thematic_analysis import iter_preprocessed, run_thematic_analysis
+from src.pipeline.columnar import write_stage
+
+
+@Language.component('lower_lemma')
+def lower_lemma(doc):
+    for token in doc:
+        token.lemma_ = token.lower_
+    return doc
+
+def make_nlp():
+    # Stand-in for en_core_web_sm: same tokenizer and stop words, trivial lemmas
+    nlp = spacy.blank('en')
+    nlp.add_pipe('lower_lemma')
+    return nlp
+
+def test_iter_preprocessed_streams_in_order():
+    texts = ['The App is CRASHING at login', 'Very good 100%', '', 'fast transfer']
+    out = iter_preprocessed(texts, make_nlp(), batch_size=2)
+    assert not isinstance(out, list), "Expected a lazy generator"
+    assert list(out) == ['app crashing login', 'good', '', 'fast transfer']
+
+def test_iter_preprocessed_multiprocess():
+    texts = [f'review number {i} is slow' for i in range(50)]
+    assert list(iter_preprocessed(texts, make_nlp(), batch_size=8, n_process=2)) == \
+        ['review number slow'] * 50
+
+def test_hashing_keywords_count_reviews_without_ids(tmp_path):
+    input_path, state = str(tmp_path / "sentiment.csv"), str(tmp_path / "state.npz")
+    write_stage(pd.DataFrame({
+        'review_id': [None, None, None, 'gp:4'],
+        'review': ['slow login', 'great app', 'slow login', 'fees too high'],
+        'date': ['2025-06-01'] * 4,
+        'bank': ['CBE', 'CBE', 'CBE', 'BOA'],
+    }), input_path)
+    for _ in range(2):
+        run_thematic_analysis(input_path, str(tmp_path / "themes.csv"), nlp=make_nlp(),
+                              keyword_mode='hashing', keyword_state=state)
+        assert StreamingKeywordExtractor.load(state).n_docs == 4
+
+def test_top_keywords_sparse_matches_dense_ranking():
+    import numpy as np
+    import scipy.sparse as sp
+    from src.analyzer.keyword_models import top_keywords_sparse
+
+    X = sp.random(300, 40, density=0.1, format='csr', random_state=0)
+    X.data = np.round(X.data, 1)  # plenty of ties
+    names = np.array([f't{i}' for i in range(40)])
+    expected = []
+    for i in range(X.shape[0]):
+        row = X[i].toarray().ravel()
+        top = row.argsort(kind='stable')[-3:][::-1]
+        expected.append([names[j] for j in top if row[j] > 0])
+    assert top_keywords_sparse(X, names) == expected
@@ -0,0 +1,34 @@
+import re
+
+import yaml
+
+from src.analyzer.theme_matcher import ThemeMatcher
+from src.pipeline.columnar import read_stage
+
+THEMES_CSV = "data/processed/reviews_with_themes.csv"
+
+def regex_themes(themes, keywords):
+    """The original assign_themes matching, as a reference."""
+    hits = set()
+    for theme, kw_list in themes.items():
+        for kw in kw_list:
+            if any(re.search(rf'\b{re.escape(kw)}\b', k) for k in keywords):
+                hits.add(theme)
+    return hits
+
+def test_yaml_themes_match_regex_reference():
+    matcher = ThemeMatcher.from_yaml()
+    with open("data/processed/themes_mapping.yml", encoding="utf-8") as f:
+        themes = yaml.safe_load(f)
+
+    keyword_lists = read_stage(THEMES_CSV, columns=["keywords"])["keywords"].tolist()
+    for keywords, assigned in zip(keyword_lists, matcher.assign_many(keyword_lists)):
+        expected = regex_themes(themes, keywords)
+        assert set(assigned.split(", ")) == (expected or {"Other"}), keywords
+
+def test_phrases_and_whole_words():
+    matcher = ThemeMatcher({"Support": ["customer service"], "Speed": ["slow"]})
+    assert matcher.assign(["bad customer service"]) == "Support"
+    assert matcher.assign(["customer", "service"]) == "Other", "Phrases must be contiguous"
+    assert matcher.assign(["slowly"]) == "Other", "Only whole words match"
+    assert matcher.assign(["app slow", "customer service"]) == "Support, Speed"